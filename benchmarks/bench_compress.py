@@ -0,0 +1,92 @@
+"""Benchmark for compressed report outputs.
+
+Writes the report of a synthetic project (see ``synth.py``) once
+uncompressed and once through each streaming compressor of
+``txt2llm.compress``, and compares wall time, output size and peak
+memory as traced by ``tracemalloc``, which slows every run down by a
+similar factor. The layout is scanned before the timed runs, so the
+times cover reading, rendering, compressing and writing.
+
+Usage:
+    python benchmarks/bench_compress.py [--preset NAME] [--root DIR]
+        [--levels N [N ...]]
+"""
+
+import argparse
+import dataclasses
+import logging
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from synth import PRESETS, generate
+
+from txt2llm import compress
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+
+_SUFFIXES = ("", ".gz", ".xz", ".bz2")
+
+
+def run(config: ProjectConfig, level: int | None) -> tuple[float, int]:
+    """Writes one report and returns its wall time and peak memory."""
+    builder = TextProjectBuilder(config)
+    builder._scan()
+    tracemalloc.start()
+    start = time.perf_counter()
+    with compress.open_text(config.output_path, level) as fp:
+        builder.write_report(fp)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    """Runs the compression benchmark and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=PRESETS, default="medium")
+    parser.add_argument("--root", type=Path)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = (args.root or Path(tmp) / "project").resolve()
+        generate(root, PRESETS[args.preset])
+        out_dir = Path(tmp) / "out"
+        out_dir.mkdir()
+        config = ProjectConfig(
+            project_root=root,
+            output_path=out_dir / "report.txt",
+            ignored_dirs={".git", "__pycache__", ".venv", "node_modules"},
+            include_exts={".py", ".md", ".js", ".json", ".txt"},
+        )
+
+        plain_size = None
+        print(
+            f"{'codec':>8} {'level':>5} {'seconds':>9} {'MiB':>9} "
+            f"{'ratio':>7} {'peak MiB':>9}"
+        )
+        for suffix in _SUFFIXES:
+            levels = args.levels if suffix else [None]
+            for level in levels:
+                output = out_dir / f"report.txt{suffix}"
+                elapsed, peak = run(
+                    dataclasses.replace(config, output_path=output),
+                    level,
+                )
+                size = output.stat().st_size
+                plain_size = plain_size or size
+                output.unlink()
+                codec = compress.codec_for(output) or "none"
+                print(
+                    f"{codec:>8} {level or '-':>5} {elapsed:9.3f} "
+                    f"{size / 2**20:9.1f} {plain_size / size:6.1f}x "
+                    f"{peak / 2**20:9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark for text decoding and encoding detection.
+
+Decodes in-memory corpora the way `utils.read_text_file` does, once
+with the lossy ``str(data, "utf-8", "ignore")`` decode the reader used
+before encoding detection and once with `encoding.sniff` and
+`encoding.decode`. Both include the null-byte check of the first block.
+For ASCII and UTF-8 content the detecting decode takes its strict UTF-8
+fast path and must cost no more than the lossy one; the legacy corpora
+show the cost of detection when it is needed.
+
+Usage:
+    python benchmarks/bench_decode.py [--mib N] [--repeat N]
+"""
+
+import argparse
+import time
+
+from txt2llm import encoding
+
+_LINES = {
+    "ascii": ("def handler(event):\n", "ascii"),
+    "utf-8": ("# Größe des Puffers: 中文注释\nsize = 4096\n", "utf-8"),
+    "gbk": ("# 这是一个测试文件，用于检查编码。\nx = 1\n", "gbk"),
+    "shift_jis": ("# これはテストファイルです。\nx = 1\n", "shift_jis"),
+    "cp1252": ("# Überprüfung der Größe\nx = 'café'\n", "cp1252"),
+}
+
+
+def lossy(data: bytes) -> str:
+    """Decodes data like the reader did before encoding detection."""
+    if data.find(b"\x00", 0, encoding.SNIFF_SIZE) != -1:
+        return ""
+    return str(data, "utf-8", "ignore")
+
+
+def detecting(data: bytes) -> str:
+    """Decodes data like the reader does now."""
+    binary, codec = encoding.sniff(data)
+    if binary:
+        return ""
+    return encoding.decode(data, codec)[0]
+
+
+def best_times(data: bytes, repeat: int) -> tuple[float, float]:
+    """Returns the best wall times of the lossy and detecting decodes.
+
+    The two decodes alternate, so that drifting clock speeds and cache
+    states affect both alike.
+    """
+    best = [float("inf"), float("inf")]
+    for _ in range(repeat):
+        for i, decode in enumerate((lossy, detecting)):
+            start = time.perf_counter()
+            decode(data)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best[0], best[1]
+
+
+def main() -> None:
+    """Runs the decoding benchmark and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mib", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=9)
+    args = parser.parse_args()
+
+    print(
+        f"{'corpus':<10} {'lossy MB/s':>11} {'detect MB/s':>12} "
+        f"{'ratio':>6}  encoding"
+    )
+    for name, (line, codec) in _LINES.items():
+        encoded = line.encode(codec)
+        data = encoded * (args.mib * 1024 * 1024 // len(encoded))
+        old, new = best_times(data, args.repeat)
+        detected = encoding.decode(data, encoding.sniff(data)[1])[1]
+        print(
+            f"{name:<10} {len(data) / old / 1e6:>11.0f} "
+            f"{len(data) / new / 1e6:>12.0f} {new / old:>6.2f}  {detected}"
+        )
+
+
+if __name__ == "__main__":
+    main()
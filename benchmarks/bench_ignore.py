@@ -0,0 +1,100 @@
+"""Benchmark for the ignore pattern matcher.
+
+Compares the compiled `RuleSet` of ``txt2llm.ignore``, which combines
+all patterns of an ignore file into one regular expression, with the
+naive approach of calling ``fnmatch.fnmatch`` once per pattern for
+every path. Both are run over the same synthetic relative paths.
+
+The two approaches do not have identical semantics (``fnmatch`` lets
+``*`` cross ``/`` and knows no anchoring or directory-only rules), so
+the patterns are chosen to be basename or extension globs, for which
+the matched counts are reported side by side.
+
+Usage:
+    python benchmarks/bench_ignore.py [--paths N] [--patterns N]
+"""
+
+import argparse
+import fnmatch
+import random
+import time
+
+from txt2llm.ignore import RuleSet, parse_pattern
+
+_BASE_PATTERNS = [
+    "*.min.js", "*.map", "*.pyc", "*.o", "*.so", "*.log", "*.tmp",
+    "*.egg-info", "*.lock", "*.bak", "*~", ".DS_Store", "Thumbs.db",
+    "*.class", "*.jar", "*.whl", "coverage.xml", "*.swp", "*.orig",
+    "*.sqlite3",
+]
+_EXTENSIONS = [
+    ".py", ".js", ".min.js", ".md", ".json", ".log", ".c", ".h", ".pyc",
+    ".txt", ".map", ".ts",
+]
+
+
+def make_paths(count: int, seed: int = 0) -> list[str]:
+    """Generates synthetic relative file paths."""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        depth = rng.randint(1, 6)
+        dirs = [f"d{rng.randint(0, 30)}" for _ in range(depth)]
+        ext = rng.choice(_EXTENSIONS)
+        paths.append("/".join(dirs + [f"file{i}{ext}"]))
+    return paths
+
+
+def make_patterns(count: int) -> list[str]:
+    """Returns ``count`` basename glob patterns."""
+    patterns = list(_BASE_PATTERNS)
+    i = 0
+    while len(patterns) < count:
+        patterns.append(f"*.gen{i}")
+        i += 1
+    return patterns[:count]
+
+
+def naive_match(paths: list[str], patterns: list[str]) -> int:
+    """Counts ignored paths with one ``fnmatch`` call per pattern."""
+    ignored = 0
+    for path in paths:
+        name = path.rsplit("/", 1)[-1]
+        if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            ignored += 1
+    return ignored
+
+
+def compiled_match(paths: list[str], patterns: list[str]) -> int:
+    """Counts ignored paths with a compiled rule set."""
+    rule_set = RuleSet("", [parse_pattern(p) for p in patterns])
+    return sum(1 for path in paths if rule_set.match(path, False))
+
+
+def main() -> None:
+    """Runs the matcher benchmark and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--patterns", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = make_paths(args.paths)
+    patterns = make_patterns(args.patterns)
+    results = {}
+    for name, func in (("fnmatch", naive_match), ("compiled", compiled_match)):
+        start = time.perf_counter()
+        ignored = func(paths, patterns)
+        elapsed = time.perf_counter() - start
+        results[name] = ignored
+        rate = len(paths) / elapsed
+        print(
+            f"{name:>8}: {elapsed:8.3f}s  {rate:12,.0f} paths/s  "
+            f"{ignored} ignored"
+        )
+
+    if results["fnmatch"] != results["compiled"]:
+        raise SystemExit("Matchers disagree on the ignored path count.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark for outline mode.
+
+Writes the report of a real source tree, by default the Python standard
+library, once with full file contents and once in outline mode with
+each number of jobs given, and compares wall time, report size and
+estimated tokens. Synthetic projects (see ``synth.py``) are not used:
+their files are not real code, so their outlines would be meaningless.
+The layout is scanned before the timed runs, so the times cover reading,
+outlining, rendering and writing.
+
+Usage:
+    python benchmarks/bench_outline.py [--path DIR] [--jobs N [N ...]]
+"""
+
+import argparse
+import dataclasses
+import logging
+import sysconfig
+import tempfile
+import time
+from pathlib import Path
+
+from txt2llm import outline
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+from txt2llm.tokens import HeuristicTokenizer
+
+_INCLUDE_EXTS = {
+    ".py", ".c", ".h", ".cpp", ".java", ".js", ".ts", ".go", ".rs"
+}
+
+
+def run(config: ProjectConfig) -> tuple[float, int, int]:
+    """Writes one report and returns its wall time, size and tokens."""
+    builder = TextProjectBuilder(config)
+    builder._scan()
+    start = time.perf_counter()
+    with open(config.output_path, "w", encoding="utf-8") as fp:
+        builder.write_report(fp)
+    elapsed = time.perf_counter() - start
+    text = config.output_path.read_text(encoding="utf-8")
+    config.output_path.unlink()
+    return elapsed, len(text.encode()), HeuristicTokenizer().count(text)
+
+
+def main() -> None:
+    """Runs the outline benchmark and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--path", type=Path, default=Path(sysconfig.get_paths()["stdlib"])
+    )
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = ProjectConfig(
+            project_root=args.path.resolve(),
+            output_path=Path(tmp) / "report.txt",
+            ignored_dirs={".git", "__pycache__", "site-packages", "test"},
+            include_exts=_INCLUDE_EXTS,
+        )
+        outline_exts = frozenset(filter(outline.has_outline, _INCLUDE_EXTS))
+
+        full_size = None
+        print(
+            f"{'mode':>8} {'jobs':>4} {'seconds':>9} {'MiB':>9} "
+            f"{'tokens':>11} {'ratio':>7}"
+        )
+        for mode in ("full", "outline"):
+            for jobs in args.jobs if mode == "outline" else [1]:
+                elapsed, size, token_count = run(
+                    dataclasses.replace(
+                        config,
+                        jobs=jobs,
+                        outline_exts=(
+                            outline_exts if mode == "outline" else frozenset()
+                        ),
+                    )
+                )
+                full_size = full_size or size
+                print(
+                    f"{mode:>8} {jobs:>4} {elapsed:9.3f} "
+                    f"{size / 2**20:9.1f} {token_count:>11,} "
+                    f"{full_size / size:6.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark for threaded file reading.
+
+Compares the sequential report path with the thread-pool read-ahead
+enabled by ``--jobs``. Per-file latency, as seen on network filesystems
+and cold caches, can be simulated with ``--latency-ms``; it is added in
+front of every file read.
+
+Usage:
+    python benchmarks/bench_read.py [--files N] [--latency-ms MS]
+        [--jobs N [N ...]]
+"""
+
+import argparse
+import dataclasses
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+
+
+def make_project(root: Path, files: int, file_bytes: int) -> None:
+    """Creates a synthetic project of equally sized source files."""
+    body = ("value = 'x' * 40\n" * (file_bytes // 17 + 1))[:file_bytes]
+    for i in range(files):
+        d = root / f"pkg{i % 50}"
+        d.mkdir(exist_ok=True)
+        (d / f"module{i}.py").write_text(body)
+
+
+def main() -> None:
+    """Runs the read benchmark and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--file-bytes", type=int, default=8192)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    read_file_content = TextProjectBuilder._read_file_content
+
+    def slow_read(self, file_path, *args_):
+        time.sleep(args.latency_ms / 1000)
+        return read_file_content(self, file_path, *args_)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, args.files, args.file_bytes)
+        config = ProjectConfig(
+            project_root=root,
+            output_path=root / "out.txt",
+            ignored_dirs=set(),
+            include_exts={".py"},
+        )
+
+        baseline = None
+        with mock.patch.object(
+            TextProjectBuilder, "_read_file_content", slow_read
+        ):
+            for jobs in args.jobs:
+                builder = TextProjectBuilder(
+                    dataclasses.replace(config, jobs=jobs)
+                )
+                builder._scan()
+                start = time.perf_counter()
+                report = builder.generate_report()
+                elapsed = time.perf_counter() - start
+                if baseline is None:
+                    baseline = (report, elapsed)
+                elif report != baseline[0]:
+                    raise SystemExit(f"Output differs with --jobs {jobs}.")
+                print(
+                    f"jobs={jobs:<3} {elapsed:8.3f}s  "
+                    f"{args.files / elapsed:10.0f} files/s  "
+                    f"x{baseline[1] / elapsed:.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
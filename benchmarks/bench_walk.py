@@ -0,0 +1,166 @@
+"""Benchmark for the project walker.
+
+Compares the single-pass, pruned ``os.scandir`` walker used by
+``TextProjectBuilder`` with the previous implementation, which walked
+the project twice (``Path.rglob`` for the file list and recursive
+``Path.iterdir`` for the tree) and filtered ignored directories only
+after descending into them.
+
+Filesystem calls are counted by wrapping ``os.scandir``, ``os.listdir``,
+``os.stat`` and ``os.lstat``. Type lookups that ``DirEntry`` serves from
+the directory listing itself are free on most Linux filesystems and are
+therefore not counted.
+
+With ``--git``, the synthetic project is also committed to a git index
+(with the large subtrees in ``.gitignore``) and the ``--source=git``
+enumeration is timed as well.
+
+Usage:
+    python benchmarks/bench_walk.py [--files N] [--ignored-files N] [--git]
+"""
+
+import argparse
+import collections
+import contextlib
+import dataclasses
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+
+_COUNTED = ("scandir", "listdir", "stat", "lstat")
+
+
+@contextlib.contextmanager
+def count_fs_calls() -> Iterator[collections.Counter]:
+    """Counts calls to the wrapped ``os`` filesystem functions."""
+    counter = collections.Counter()
+    originals = {name: getattr(os, name) for name in _COUNTED}
+
+    def wrap(name: str, func: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            counter[name] += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for name, func in originals.items():
+        setattr(os, name, wrap(name, func))
+    try:
+        yield counter
+    finally:
+        for name, func in originals.items():
+            setattr(os, name, func)
+
+
+def make_project(root: Path, files: int, ignored_files: int) -> None:
+    """Creates a synthetic project with large ignored subtrees."""
+    for i in range(files):
+        d = root / "src" / f"pkg{i % 20}" / f"mod{i % 7}"
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"file{i}.py").write_text("x = 1\n")
+    for ignored in (".venv", "node_modules", ".git"):
+        for i in range(ignored_files):
+            d = root / ignored / f"lib{i % 50}" / f"sub{i % 9}"
+            d.mkdir(parents=True, exist_ok=True)
+            (d / f"dep{i}.py").write_text("y = 2\n")
+
+
+def legacy_walk(config: ProjectConfig) -> tuple[list[Path], int]:
+    """Runs the previous two-pass walk and returns its results."""
+    found_files = []
+    for path in config.project_root.rglob("*"):
+        if not path.is_file():
+            continue
+        if any(
+            part in config.ignored_dirs
+            for part in path.relative_to(config.project_root).parts
+        ):
+            continue
+        if path.suffix in config.include_exts:
+            found_files.append(path.relative_to(config.project_root))
+
+    tree_lines = 0
+
+    def recurse_tree(directory: Path):
+        nonlocal tree_lines
+        contents = sorted(
+            [
+                p
+                for p in directory.iterdir()
+                if p.name not in config.ignored_dirs
+            ],
+            key=lambda p: (p.is_file(), p.name.lower()),
+        )
+        for path in contents:
+            tree_lines += 1
+            if path.is_dir():
+                recurse_tree(path)
+
+    recurse_tree(config.project_root)
+    return sorted(found_files), tree_lines
+
+
+def current_walk(config: ProjectConfig) -> tuple[list[Path], int]:
+    """Runs the shared single-pass walk and returns its results."""
+    builder = TextProjectBuilder(config)
+    files = builder._find_files()
+    tree = builder._generate_tree()
+    return files, tree.count("\n")
+
+
+def git_walk(config: ProjectConfig) -> tuple[list[Path], int]:
+    """Runs the git index enumeration and returns its results."""
+    return current_walk(dataclasses.replace(config, source="git"))
+
+
+def main() -> None:
+    """Runs the walker benchmark and prints a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--ignored-files", type=int, default=20000)
+    parser.add_argument("--git", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root, args.files, args.ignored_files)
+        config = ProjectConfig(
+            project_root=root,
+            output_path=root / "out.txt",
+            ignored_dirs={".git", "__pycache__", ".venv", "node_modules"},
+            include_exts={".py"},
+        )
+
+        walks = [("legacy", legacy_walk), ("current", current_walk)]
+        if args.git:
+            (root / ".gitignore").write_text(".venv/\nnode_modules/\n")
+            subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+            subprocess.run(["git", "add", "src"], cwd=root, check=True)
+            walks.append(("git", git_walk))
+
+        results = {}
+        for name, walk in walks:
+            with count_fs_calls() as counter:
+                start = time.perf_counter()
+                files, tree_lines = walk(config)
+                elapsed = time.perf_counter() - start
+            results[name] = (files, tree_lines)
+            calls = sum(counter.values())
+            detail = ", ".join(f"{k}={counter[k]}" for k in _COUNTED)
+            print(
+                f"{name:>8}: {elapsed:8.3f}s  {calls:8d} fs calls ({detail})"
+            )
+
+        if results["legacy"] != results["current"]:
+            raise SystemExit("Walk results differ between implementations.")
+        if args.git and results["git"][0] != results["current"][0]:
+            raise SystemExit("The git source found different files.")
+
+
+if __name__ == "__main__":
+    main()
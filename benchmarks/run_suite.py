@@ -0,0 +1,244 @@
+"""Benchmark suite for txt2llm.
+
+Generates (or reuses) a synthetic project with ``synth.py`` and times
+the main stages of report generation on it:
+
+- ``find_files``: `TextProjectBuilder._find_files`, including the scan.
+- ``generate_tree``: `TextProjectBuilder._generate_tree`, including the
+  scan.
+- ``read_files``: `TextProjectBuilder._read_file_content` over every
+  included file.
+- ``main``: the end-to-end command line, writing a report without the
+  persistent cache.
+
+Every case runs in a fresh interpreter, so its peak RSS is its own and
+no case warms another's in-process state. The page cache is not
+dropped; run the suite twice and use the second run for warm-cache
+numbers. Results are printed and written as JSON with the wall time,
+peak RSS and files per second of each case. With ``--compare``, the
+results are checked against an earlier JSON file and the suite exits
+with status 1 if any case got slower by more than ``--threshold``.
+
+Usage:
+    python benchmarks/run_suite.py [--preset NAME] [--root DIR]
+        [--set FIELD=VALUE ...] [--cases NAME ...] [--repeat N]
+        [--output FILE] [--compare FILE] [--threshold RATIO]
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+
+from synth import PRESETS, Shape, generate
+
+CASES = ("find_files", "generate_tree", "read_files", "main")
+
+# The included extensions; ``.bin`` is listed so that binary detection
+# is part of the timed work.
+INCLUDE_EXTS = {".py", ".md", ".js", ".json", ".txt", ".bin"}
+IGNORED_DIRS = {".git", "__pycache__", ".venv", "node_modules"}
+
+
+def _peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+def run_case(case: str, root: Path) -> dict:
+    """Runs one benchmark case in the current process.
+
+    Args:
+        case: The name of the case, one of `CASES`.
+        root: The synthetic project directory.
+
+    Returns:
+        The measurements of the case.
+    """
+    from txt2llm.config import ProjectConfig
+    from txt2llm.core import TextProjectBuilder
+    from txt2llm.main import main
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "report.txt"
+        config = ProjectConfig(
+            project_root=root,
+            output_path=output,
+            ignored_dirs=IGNORED_DIRS,
+            include_exts=INCLUDE_EXTS,
+        )
+        builder = TextProjectBuilder(config)
+        nbytes = 0
+        start = time.perf_counter()
+        if case == "find_files":
+            files = len(builder._find_files())
+            elapsed = time.perf_counter() - start
+        elif case == "generate_tree":
+            files = builder._generate_tree().count("\n") + 1
+            elapsed = time.perf_counter() - start
+        elif case == "read_files":
+            paths = builder._find_files()
+            start = time.perf_counter()
+            for path in paths:
+                nbytes += len(builder._read_file_content(path)[0])
+            elapsed = time.perf_counter() - start
+            files = len(paths)
+        elif case == "main":
+            argv = [
+                "txt2llm", "--path", str(root), "--output", str(output),
+                "--no-cache",
+            ]
+            with mock.patch.object(sys, "argv", argv):
+                main()
+            elapsed = time.perf_counter() - start
+            # Counted after the timer stops, from the builder's own scan.
+            files = len(builder._find_files())
+            nbytes = output.stat().st_size
+        else:
+            raise ValueError(f"Unknown case: {case}")
+    return {
+        "case": case,
+        "wall_s": elapsed,
+        "peak_rss_mb": _peak_rss_mb(),
+        "files": files,
+        "files_per_s": files / elapsed if elapsed else None,
+        "bytes": nbytes,
+    }
+
+
+def _run_isolated(case: str, root: Path) -> dict:
+    """Runs one case in a fresh interpreter and returns its results."""
+    env = dict(os.environ)
+    src = Path(__file__).resolve().parents[1] / "src"
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(src), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, __file__, "--run-case", case, "--root", str(root)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def _parse_overrides(values: list[str]) -> dict:
+    """Parses ``FIELD=VALUE`` shape overrides."""
+    fields = {f.name for f in dataclasses.fields(Shape)}
+    overrides = {}
+    for value in values:
+        name, _, raw = value.partition("=")
+        if name not in fields:
+            raise SystemExit(f"Unknown shape field: {name}")
+        overrides[name] = int(raw)
+    return overrides
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Compares results with a baseline.
+
+    Args:
+        results: The results of this run.
+        baseline: The results of an earlier run.
+        threshold: The allowed relative slowdown, e.g. 0.2 for 20%.
+
+    Returns:
+        A description of every case that regressed.
+    """
+    before = {r["case"]: r for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        old = before.get(result["case"])
+        if old is None or not old["wall_s"]:
+            continue
+        ratio = result["wall_s"] / old["wall_s"]
+        print(f"{result['case']:>14}: {ratio:6.2f}x of baseline")
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result['case']} took {ratio:.2f}x the baseline time"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Runs the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--preset", choices=PRESETS, default="tiny")
+    parser.add_argument(
+        "--root",
+        type=Path,
+        help="Where to generate the project; reused if it already exists.",
+    )
+    parser.add_argument("--set", action="append", default=[], dest="sets")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--run-case", choices=CASES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.root)))
+        return
+
+    shape = dataclasses.replace(
+        PRESETS[args.preset], **_parse_overrides(args.sets)
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        root = (args.root or Path(tmp) / "project").resolve()
+        start = time.perf_counter()
+        generated = generate(root, shape)
+        action = "Generated" if generated else "Reused"
+        print(f"{action} {root} in {time.perf_counter() - start:.1f}s")
+
+        results = []
+        for case in args.cases:
+            # Keep the fastest run; slower ones measure interference.
+            runs = [_run_isolated(case, root) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["wall_s"])
+            best["peak_rss_mb"] = max(r["peak_rss_mb"] for r in runs)
+            results.append(best)
+            rate = best["files_per_s"] or 0
+            print(
+                f"{case:>14}: {best['wall_s']:8.3f}s  "
+                f"{best['peak_rss_mb']:8.1f} MiB  {rate:12,.0f} files/s"
+            )
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "preset": args.preset,
+        "shape": dataclasses.asdict(shape),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+    if args.compare:
+        regressions = compare(
+            report, json.loads(args.compare.read_text()), args.threshold
+        )
+        if regressions:
+            raise SystemExit("Regressions: " + "; ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Synthetic project generator for the txt2llm benchmarks.
+
+Generates reproducible project trees of a configurable shape: many small
+source files spread over a balanced hierarchy, one deeply nested chain,
+one very wide directory, a few large text files, binary blobs, and large
+``.venv`` and ``node_modules`` subtrees that txt2llm is expected to
+prune. The same shape and seed always produce byte-identical trees.
+
+A ``.synth-shape`` JSON file records the shape a tree was generated
+with, so an existing tree is reused instead of being generated again.
+
+Usage:
+    python benchmarks/synth.py ROOT [--preset NAME]
+"""
+
+import argparse
+import dataclasses
+import json
+import random
+from pathlib import Path
+
+SHAPE_FILE = ".synth-shape"
+
+# Extensions of the generated source files, in rotation.
+_SOURCE_EXTS = (".py", ".md", ".js", ".json", ".txt")
+
+
+@dataclasses.dataclass(frozen=True)
+class Shape:
+    """The shape of a synthetic project.
+
+    Attributes:
+        small_files: The number of small source files.
+        small_file_bytes: The size of each small source file.
+        fanout: The number of subdirectories per directory in the
+            balanced hierarchy holding the small files.
+        files_per_dir: The number of small files per directory.
+        deep_levels: The nesting depth of the deep directory chain.
+        wide_files: The number of files in the single wide directory.
+        large_files: The number of large text files.
+        large_file_mb: The size of each large text file, in MiB.
+        binary_blobs: The number of binary blobs.
+        binary_blob_kb: The size of each binary blob, in KiB.
+        ignored_files: The number of files in each of the ``.venv`` and
+            ``node_modules`` subtrees.
+        seed: The seed of the random content generator.
+    """
+    small_files: int = 100_000
+    small_file_bytes: int = 512
+    fanout: int = 8
+    files_per_dir: int = 50
+    deep_levels: int = 64
+    wide_files: int = 10_000
+    large_files: int = 3
+    large_file_mb: int = 100
+    binary_blobs: int = 100
+    binary_blob_kb: int = 256
+    ignored_files: int = 50_000
+    seed: int = 0
+
+
+PRESETS = {
+    "tiny": Shape(
+        small_files=500,
+        deep_levels=16,
+        wide_files=200,
+        large_files=1,
+        large_file_mb=1,
+        binary_blobs=5,
+        binary_blob_kb=16,
+        ignored_files=500,
+    ),
+    "medium": Shape(
+        small_files=10_000,
+        wide_files=2_000,
+        large_files=2,
+        large_file_mb=10,
+        binary_blobs=20,
+        ignored_files=10_000,
+    ),
+    "full": Shape(),
+}
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """Returns ``size`` characters of line-structured pseudo source."""
+    words = ("value", "return", "self", "data", "index", "result", "=")
+    lines = []
+    total = 0
+    while total < size:
+        line = " ".join(rng.choice(words) for _ in range(rng.randint(2, 9)))
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)[:size]
+
+
+def _balanced_dir(index: int, shape: Shape) -> Path:
+    """Returns the directory of the ``index``-th small file."""
+    dir_index = index // shape.files_per_dir
+    parts = []
+    while True:
+        parts.append(f"d{dir_index % shape.fanout}")
+        dir_index //= shape.fanout
+        if not dir_index:
+            break
+    return Path("src", *reversed(parts))
+
+
+def _write_large_file(path: Path, rng: random.Random, size: int) -> None:
+    """Writes a large text file in chunks of repeated pseudo source."""
+    chunk = (_text(rng, 1024 * 1024 - 1) + "\n").encode("ascii")
+    with path.open("wb") as fp:
+        written = 0
+        while written < size:
+            part = chunk[:size - written]
+            fp.write(part)
+            written += len(part)
+
+
+def generate(root: Path, shape: Shape) -> bool:
+    """Generates a synthetic project, unless it already exists.
+
+    Args:
+        root: The project directory. Created if missing.
+        shape: The shape of the project.
+
+    Returns:
+        True if the tree was generated, False if an existing tree with
+        the same shape was reused.
+    """
+    marker = root / SHAPE_FILE
+    recorded = dataclasses.asdict(shape)
+    if marker.exists() and json.loads(marker.read_text()) == recorded:
+        return False
+    if root.exists() and any(root.iterdir()):
+        raise ValueError(f"{root} is not empty and was not generated.")
+
+    rng = random.Random(shape.seed)
+    small = _text(rng, shape.small_file_bytes)
+    for i in range(shape.small_files):
+        directory = root / _balanced_dir(i, shape)
+        directory.mkdir(parents=True, exist_ok=True)
+        ext = _SOURCE_EXTS[i % len(_SOURCE_EXTS)]
+        (directory / f"file{i}{ext}").write_text(f"# {i}\n{small}\n")
+
+    deep = root / "deep"
+    for level in range(shape.deep_levels):
+        deep /= f"level{level}"
+    deep.mkdir(parents=True, exist_ok=True)
+    (deep / "bottom.py").write_text(small)
+
+    wide = root / "wide"
+    wide.mkdir(exist_ok=True)
+    for i in range(shape.wide_files):
+        (wide / f"entry{i}.py").write_text(small)
+
+    large = root / "data"
+    large.mkdir(exist_ok=True)
+    for i in range(shape.large_files):
+        _write_large_file(
+            large / f"large{i}.txt", rng, shape.large_file_mb * 1024 * 1024
+        )
+
+    blobs = root / "assets"
+    blobs.mkdir(exist_ok=True)
+    for i in range(shape.binary_blobs):
+        (blobs / f"blob{i}.bin").write_bytes(
+            rng.randbytes(shape.binary_blob_kb * 1024)
+        )
+
+    for ignored in (".venv", "node_modules"):
+        for i in range(shape.ignored_files):
+            d = root / ignored / f"lib{i % 100}" / f"sub{i % 7}"
+            d.mkdir(parents=True, exist_ok=True)
+            (d / f"dep{i}.py").write_text(small)
+
+    marker.write_text(json.dumps(recorded, indent=2))
+    return True
+
+
+def main() -> None:
+    """Generates a synthetic project from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--preset", choices=PRESETS, default="tiny")
+    args = parser.parse_args()
+    generated = generate(args.root, PRESETS[args.preset])
+    print(f"{'Generated' if generated else 'Reused'} {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Batch mode module for the txt2llm project.
+
+This module generates the reports of many projects in one invocation.
+Each project is built by a `TextProjectBuilder` in a worker process of a
+``ProcessPoolExecutor``, so projects are processed in parallel across
+cores and the interpreter start-up is paid once per worker rather than
+once per project. A failing project is reported and does not affect
+the others.
+"""
+
+import dataclasses
+import logging
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from . import compress, fs
+from .cache import ReportCache, default_cache_path
+from .config import ProjectConfig
+from .core import TextProjectBuilder
+
+
+@dataclasses.dataclass(frozen=True)
+class BatchTask:
+    """One project to build in batch mode.
+
+    Attributes:
+        config: The project configuration, including its output path.
+        cache_max_bytes: The size limit of the project's persistent
+            cache, or None to build without a cache.
+        write_index: Whether to write a section index next to the
+            report.
+    """
+    config: ProjectConfig
+    cache_max_bytes: int | None = None
+    write_index: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class ProjectResult:
+    """The outcome of building one project.
+
+    Attributes:
+        project_root: The project directory.
+        seconds: The wall-clock time spent on the project.
+        output_path: The written report, or None on failure.
+        files: The number of files listed in the report.
+        output_bytes: The size of the written report, in bytes.
+        error: A description of the failure, or None on success.
+    """
+    project_root: Path
+    seconds: float
+    output_path: Path | None = None
+    files: int = 0
+    output_bytes: int = 0
+    error: str | None = None
+
+
+def read_manifest(path: Path) -> list[Path]:
+    """Reads the project directories listed in a manifest file.
+
+    The manifest lists one directory per line. Blank lines and lines
+    starting with ``#`` are skipped, and relative paths are resolved
+    against the manifest's directory.
+
+    Args:
+        path: The manifest file.
+
+    Returns:
+        The listed directories, in order.
+
+    Raises:
+        OSError: If the manifest cannot be read.
+    """
+    projects = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            projects.append(path.parent / line)
+    return projects
+
+
+def build_project(task: BatchTask) -> ProjectResult:
+    """Writes the report of one project; runs in a worker process.
+
+    Args:
+        task: The project to build.
+
+    Returns:
+        The outcome. Errors are caught and returned, not raised.
+    """
+    config = task.config
+    start = time.perf_counter()
+    cache = builder = None
+    try:
+        root = config.project_root
+        if not root.is_dir() and not (
+            root.is_file() and fs.is_archive(root)
+        ):
+            raise NotADirectoryError(
+                f"Path '{root}' is not a valid directory or archive."
+            )
+        config.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if task.cache_max_bytes is not None and root.is_dir():
+            cache_path = default_cache_path(root)
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                cache = ReportCache(cache_path, config, task.cache_max_bytes)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"Could not open cache {cache_path}: {e}")
+        builder = TextProjectBuilder(config, cache=cache)
+        if task.write_index:
+            builder.write_indexed_report(config.output_path)
+        else:
+            with compress.open_text(config.output_path) as fp:
+                builder.write_report(fp)
+        output_bytes = config.output_path.stat().st_size
+    except Exception as e:
+        logging.error(f"Report for {config.project_root} failed: {e}")
+        return ProjectResult(
+            config.project_root,
+            time.perf_counter() - start,
+            error=f"{type(e).__name__}: {e}",
+        )
+    finally:
+        if builder is not None:
+            builder.close()
+        if cache is not None:
+            cache.close()
+    return ProjectResult(
+        config.project_root,
+        time.perf_counter() - start,
+        config.output_path,
+        builder.file_count or 0,
+        output_bytes,
+    )
+
+
+def run_batch(
+    tasks: list[BatchTask], workers: int | None = None
+) -> list[ProjectResult]:
+    """Builds many projects in a process pool.
+
+    A project whose worker process dies, e.g. from running out of
+    memory, is reported as failed like any other error. Since such a
+    crash breaks the pool, the projects still queued are then reported
+    as failed too.
+
+    Args:
+        tasks: The projects to build.
+        workers: The number of worker processes. Defaults to the number
+            of CPUs.
+
+    Returns:
+        The outcome of each project, in the order of ``tasks``.
+    """
+    results: dict[int, ProjectResult] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(build_project, task): index
+            for index, task in enumerate(tasks)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = ProjectResult(
+                    tasks[index].config.project_root,
+                    0.0,
+                    error=f"{type(e).__name__}: {e}",
+                )
+            results[index] = result
+            done = "failed" if result.error else "done"
+            logging.info(
+                f"[{len(results)}/{len(tasks)}] {result.project_root} "
+                f"{done} in {result.seconds:.2f}s"
+            )
+    return [results[index] for index in range(len(tasks))]
+
+
+def summarize(results: list[ProjectResult], seconds: float) -> str:
+    """Describes the aggregate throughput of a batch run.
+
+    Args:
+        results: The outcome of each project.
+        seconds: The wall-clock time of the whole batch.
+
+    Returns:
+        A one-line summary.
+    """
+    succeeded = [r for r in results if r.error is None]
+    files = sum(r.files for r in succeeded)
+    mib = sum(r.output_bytes for r in succeeded) / (1024 * 1024)
+    seconds = max(seconds, 1e-9)
+    return (
+        f"Built {len(succeeded)} of {len(results)} projects in "
+        f"{seconds:.2f}s: {len(succeeded) / seconds:.2f} projects/s, "
+        f"{files / seconds:,.0f} files/s, {mib / seconds:.1f} MiB/s "
+        f"written."
+    )
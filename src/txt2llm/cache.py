@@ -0,0 +1,518 @@
+"""Persistent cache module for the txt2llm project.
+
+This module stores rendered file sections and the scanned project layout
+in a SQLite database, so that re-running txt2llm over a mostly unchanged
+project only re-reads the files that changed. Sections, and the imports
+extracted for import-graph ordering, are keyed by the relative path
+plus the file's size, modification time and inode. The
+layout (directory tree text and file list) is keyed by the modification
+times of the scanned directories, which change whenever an entry is
+added, removed or renamed, and of the ignore files that were applied.
+
+The whole cache is cleared when the configuration fingerprint changes,
+e.g. because the ignored directories or included extensions differ from
+the previous run. Settings that only choose which files are shown in
+full, or in which order, leave the cached sections valid.
+
+Caches live in the user cache directory by default, see
+`default_cache_path`, so that writing a report to a shared directory
+leaves no database behind there.
+"""
+
+import array
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+from .config import ProjectConfig
+
+# Bumped whenever the rendered section format or the schema changes.
+CACHE_VERSION = 5
+
+# Default upper bound for the stored section text, in bytes.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Config fields that affect neither the rendered file sections nor the
+# scanned layout. Sections are never cached with ``since_diff``.
+_FINGERPRINT_EXCLUDED_FIELDS = frozenset(
+    {
+        "output_path",
+        "jobs",
+        "max_tokens",
+        "since",
+        "since_manifest",
+        "since_diff",
+        "order",
+        "entry_points",
+    }
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    digest TEXT,
+    sketch BLOB NOT NULL,
+    nbytes INTEGER NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    specs TEXT NOT NULL
+);
+"""
+
+
+# A cache hit: section text, token count, content digest and sketch.
+CachedSection = tuple[str, int, str | None, tuple[int, ...]]
+
+
+@dataclasses.dataclass(frozen=True)
+class StatKey:
+    """Identifies one version of a file on disk.
+
+    Attributes:
+        size: The file size in bytes.
+        mtime_ns: The modification time in nanoseconds.
+        inode: The inode number.
+    """
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result) -> "StatKey":
+        """Builds a key from an ``os.stat`` result."""
+        return cls(size=st.st_size, mtime_ns=st.st_mtime_ns, inode=st.st_ino)
+
+
+@dataclasses.dataclass(frozen=True)
+class LayoutSnapshot:
+    """The scanned layout of a project at one point in time.
+
+    Attributes:
+        tree_text: The rendered directory tree.
+        files: The sorted relative paths of the included files.
+        dir_mtimes: Modification times in nanoseconds of every scanned
+            directory and every ignore file read, keyed by POSIX path
+            relative to the project root (the root itself is ``""``).
+    """
+    tree_text: str
+    files: list[Path]
+    dir_mtimes: dict[str, int]
+
+    def is_current(self, project_root: Path) -> bool:
+        """Checks whether no scanned directory or ignore file has changed.
+
+        Args:
+            project_root: The project root the snapshot was taken from.
+
+        Returns:
+            True if every recorded path still has the same
+            modification time, False otherwise.
+        """
+        for rel_dir, mtime_ns in self.dir_mtimes.items():
+            try:
+                st = os.stat(project_root / rel_dir)
+            except OSError:
+                return False
+            if st.st_mtime_ns != mtime_ns:
+                return False
+        return True
+
+
+def default_cache_path(project_root: Path) -> Path:
+    """Returns the default path of a project's cache database.
+
+    The database is kept in ``$XDG_CACHE_HOME/txt2llm``, or
+    ``~/.cache/txt2llm``, and named after the project and a digest of its
+    path, so that projects sharing a name do not share a cache.
+
+    Args:
+        project_root: The resolved path of the project.
+
+    Returns:
+        The path of the cache database.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha256(str(project_root).encode("utf-8")).hexdigest()
+    return Path(base) / "txt2llm" / f"{project_root.name}_{digest[:16]}.db"
+
+
+def config_fingerprint(config: ProjectConfig) -> str:
+    """Computes a digest of the config fields that affect the output.
+
+    Args:
+        config: The project configuration.
+
+    Returns:
+        A hex digest that changes whenever the rendered output could.
+    """
+    fields = {
+        field.name: getattr(config, field.name)
+        for field in dataclasses.fields(config)
+        if field.name not in _FINGERPRINT_EXCLUDED_FIELDS
+    }
+    # A token budget turns on token counting, which sections record.
+    fields["count_tokens"] = (
+        config.count_tokens or config.max_tokens is not None
+    )
+    fields["cache_version"] = CACHE_VERSION
+    encoded = json.dumps(fields, sort_keys=True, default=_json_default)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _json_default(value: object) -> object:
+    """Encodes config values that JSON does not support natively."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+class ReportCache:
+    """An on-disk cache of rendered file sections and project layout.
+
+    The cache is not thread-safe; it is only accessed from the thread
+    that writes the report. Changes are committed, and the cache is
+    trimmed to ``max_bytes`` by evicting the least recently used
+    sections, when `close` is called.
+
+    Attributes:
+        path: The path of the SQLite database file.
+        max_bytes: The upper bound for the stored section text, in bytes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        config: ProjectConfig,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """Opens the cache, clearing it if the configuration has changed.
+
+        Args:
+            path: The path of the SQLite database file.
+            config: The project configuration. The cache is cleared when
+                its `config_fingerprint` differs from the stored one.
+            max_bytes: The upper bound for the stored section text.
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn = sqlite3.connect(path)
+        (schema_version,) = self._conn.execute(
+            "PRAGMA user_version"
+        ).fetchone()
+        if schema_version != CACHE_VERSION:
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS sections; DROP TABLE IF EXISTS meta;"
+                " DROP TABLE IF EXISTS imports;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._hits: list[str] = []
+
+        fingerprint = config_fingerprint(config)
+        if self._get_meta("fingerprint") != fingerprint:
+            logging.info("Configuration changed; clearing the report cache.")
+            self._conn.execute("DELETE FROM sections")
+            self._conn.execute("DELETE FROM imports")
+            self._conn.execute("DELETE FROM meta")
+            self._set_meta("fingerprint", fingerprint)
+        self._run = int(self._get_meta("run") or 0) + 1
+        self._set_meta("run", str(self._run))
+
+    def _get_meta(self, key: str) -> str | None:
+        """Returns a metadata value, or None if it is not set."""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        """Sets a metadata value."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+    def get_section(
+        self, rel_path: str, key: StatKey
+    ) -> CachedSection | None:
+        """Looks up the rendered section of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The current stat key of the file.
+
+        Returns:
+            A tuple of the cached section text, its token count, the
+            file's content digest and its near-duplicate sketch, or None
+            if the section is missing or stale.
+        """
+        row = self._conn.execute(
+            "SELECT text, tokens, digest, sketch FROM sections"
+            " WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+            (rel_path, key.size, key.mtime_ns, key.inode),
+        ).fetchone()
+        if row is None:
+            return None
+        self._hits.append(rel_path)
+        return row[0], row[1], row[2], tuple(array.array("I", row[3]))
+
+    def put_section(
+        self,
+        rel_path: str,
+        key: StatKey,
+        text: str,
+        tokens: int = 0,
+        digest: str | None = None,
+        sketch: tuple[int, ...] = (),
+    ) -> None:
+        """Stores the rendered section of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The stat key of the file version that was rendered.
+            text: The rendered section.
+            tokens: The token count of the rendered section.
+            digest: The file's content digest, if computed.
+            sketch: The file's near-duplicate sketch, if computed.
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sections"
+            " (path, size, mtime_ns, inode, text, tokens, digest, sketch,"
+            " nbytes, used)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                rel_path,
+                key.size,
+                key.mtime_ns,
+                key.inode,
+                text,
+                tokens,
+                digest,
+                array.array("I", sketch).tobytes(),
+                len(text.encode("utf-8")),
+                self._run,
+            ),
+        )
+
+    def get_imports(
+        self, rel_path: str, key: StatKey
+    ) -> tuple[str, ...] | None:
+        """Looks up the extracted imports of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The current stat key of the file.
+
+        Returns:
+            The import specifiers, see `order.extract_imports`, or None
+            if they are missing or stale.
+        """
+        row = self._conn.execute(
+            "SELECT specs FROM imports"
+            " WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+            (rel_path, key.size, key.mtime_ns, key.inode),
+        ).fetchone()
+        return None if row is None else tuple(json.loads(row[0]))
+
+    def put_imports(
+        self, rel_path: str, key: StatKey, specs: tuple[str, ...]
+    ) -> None:
+        """Stores the extracted imports of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The stat key of the file version the imports are from.
+            specs: The import specifiers.
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO imports"
+            " (path, size, mtime_ns, inode, specs) VALUES (?, ?, ?, ?, ?)",
+            (rel_path, key.size, key.mtime_ns, key.inode, json.dumps(specs)),
+        )
+
+    def get_layout(self) -> LayoutSnapshot | None:
+        """Returns the stored layout snapshot, if any."""
+        raw = self._get_meta("layout")
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return LayoutSnapshot(
+            tree_text=data["tree_text"],
+            files=[Path(f) for f in data["files"]],
+            dir_mtimes=data["dir_mtimes"],
+        )
+
+    def put_layout(self, snapshot: LayoutSnapshot) -> None:
+        """Stores the layout snapshot, replacing any previous one."""
+        data = {
+            "tree_text": snapshot.tree_text,
+            "files": [f.as_posix() for f in snapshot.files],
+            "dir_mtimes": snapshot.dir_mtimes,
+        }
+        self._set_meta("layout", json.dumps(data))
+
+    def _evict(self) -> None:
+        """Deletes least recently used sections beyond ``max_bytes``."""
+        deleted = self._conn.execute(
+            "DELETE FROM sections WHERE path IN ("
+            " SELECT path FROM ("
+            "  SELECT path, SUM(nbytes) OVER ("
+            "   ORDER BY used DESC, path"
+            "  ) AS running FROM sections"
+            " ) WHERE running > ?"
+            ")",
+            (self.max_bytes,),
+        ).rowcount
+        if deleted:
+            logging.info(f"Evicted {deleted} sections from the report cache.")
+
+    def close(self) -> None:
+        """Records cache hits, evicts old entries and commits."""
+        self._conn.executemany(
+            "UPDATE sections SET used = ? WHERE path = ?",
+            ((self._run, path) for path in self._hits),
+        )
+        self._evict()
+        self._conn.commit()
+        self._conn.close()
+
+    def __enter__(self) -> "ReportCache":
+        """Returns the cache itself for use in a ``with`` statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Closes the cache when leaving a ``with`` statement."""
+        self.close()
+
+
+class MemoryCache:
+    """An in-process cache of rendered file sections and project layout.
+
+    It has the same lookup interface as `ReportCache` and is used by
+    long-running processes such as watch mode, which keep the rendered
+    project in memory between rebuilds instead of in a database.
+
+    Attributes:
+        misses: The number of section lookups that missed since the last
+            call to `retain`.
+    """
+
+    def __init__(self):
+        """Initializes an empty cache."""
+        self._sections: dict[
+            str, tuple[StatKey, str, int, str | None, tuple[int, ...]]
+        ] = {}
+        self._imports: dict[str, tuple[StatKey, tuple[str, ...]]] = {}
+        self._layout: LayoutSnapshot | None = None
+        self.misses = 0
+
+    def get_section(
+        self, rel_path: str, key: StatKey
+    ) -> CachedSection | None:
+        """Looks up the rendered section of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The current stat key of the file.
+
+        Returns:
+            A tuple of the cached section text, its token count, the
+            file's content digest and its near-duplicate sketch, or None
+            if the section is missing or stale.
+        """
+        entry = self._sections.get(rel_path)
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        return entry[1:]
+
+    def put_section(
+        self,
+        rel_path: str,
+        key: StatKey,
+        text: str,
+        tokens: int = 0,
+        digest: str | None = None,
+        sketch: tuple[int, ...] = (),
+    ) -> None:
+        """Stores the rendered section of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The stat key of the file version that was rendered.
+            text: The rendered section.
+            tokens: The token count of the rendered section.
+            digest: The file's content digest, if computed.
+            sketch: The file's near-duplicate sketch, if computed.
+        """
+        self._sections[rel_path] = (key, text, tokens, digest, sketch)
+
+    def get_imports(
+        self, rel_path: str, key: StatKey
+    ) -> tuple[str, ...] | None:
+        """Looks up the extracted imports of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The current stat key of the file.
+
+        Returns:
+            The import specifiers, or None if they are missing or stale.
+        """
+        entry = self._imports.get(rel_path)
+        if entry is None or entry[0] != key:
+            return None
+        return entry[1]
+
+    def put_imports(
+        self, rel_path: str, key: StatKey, specs: tuple[str, ...]
+    ) -> None:
+        """Stores the extracted imports of a file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            key: The stat key of the file version the imports are from.
+            specs: The import specifiers.
+        """
+        self._imports[rel_path] = (key, specs)
+
+    def get_layout(self) -> LayoutSnapshot | None:
+        """Returns the stored layout snapshot, if any."""
+        return self._layout
+
+    def put_layout(self, snapshot: LayoutSnapshot) -> None:
+        """Stores the layout snapshot, replacing any previous one."""
+        self._layout = snapshot
+
+    def retain(self, rel_paths: set[str]) -> None:
+        """Drops the entries of files that are no longer in the report.
+
+        Args:
+            rel_paths: The POSIX paths of the files to keep.
+        """
+        for rel_path in self._sections.keys() - rel_paths:
+            del self._sections[rel_path]
+        for rel_path in self._imports.keys() - rel_paths:
+            del self._imports[rel_path]
+        self.misses = 0
@@ -0,0 +1,233 @@
+"""Change detection module for the txt2llm project.
+
+This module works out which files of a project changed since a base
+version, for changed-only reports. The base is either a git commit,
+compared by git itself, or a manifest file written by an earlier run,
+which records the size, modification time and content digest of every
+included file. A file whose size and modification time match its
+manifest entry is unchanged without being read; only a file whose
+modification time changed but whose size did not is hashed.
+
+Manifests are JSON objects of the form::
+
+    {"version": 1, "files": {"src/main.py": [size, mtime_ns, digest]}}
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+from . import dedup, git
+
+# Bumped whenever the manifest format changes.
+MANIFEST_VERSION = 1
+
+
+@dataclasses.dataclass(frozen=True)
+class ManifestEntry:
+    """The recorded version of one file.
+
+    Attributes:
+        size: The file size in bytes.
+        mtime_ns: The modification time in nanoseconds.
+        digest: The hex digest of the file's content, see
+            `dedup.new_digest`.
+    """
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+@dataclasses.dataclass(frozen=True)
+class ChangeSet:
+    """The files that changed since a base version.
+
+    Attributes:
+        base: A description of the base, e.g. ``HEAD~3`` or the
+            manifest path, shown in the report.
+        changed: The POSIX paths of changed and added files.
+        removed: The POSIX paths of files that no longer exist, sorted.
+    """
+    base: str
+    changed: frozenset[str]
+    removed: tuple[str, ...]
+
+
+def file_digest(path: Path) -> str:
+    """Returns the hex digest of a file's content.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, dedup.new_digest).hexdigest()
+
+
+def read_manifest(path: Path) -> dict[str, ManifestEntry]:
+    """Reads a manifest.
+
+    Args:
+        path: The manifest file.
+
+    Returns:
+        The recorded file versions by POSIX path.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a manifest of this version.
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data["version"] != MANIFEST_VERSION:
+            raise ValueError(f"version {data['version']}")
+        return {
+            rel_path: ManifestEntry(*entry)
+            for rel_path, entry in data["files"].items()
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"'{path}' is not a valid manifest: {e}") from None
+
+
+def write_manifest(path: Path, entries: dict[str, ManifestEntry]) -> None:
+    """Writes a manifest, replacing any existing file atomically.
+
+    Args:
+        path: The manifest file.
+        entries: The file versions to record, by POSIX path.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    data = {
+        "version": MANIFEST_VERSION,
+        "files": {
+            rel_path: [entry.size, entry.mtime_ns, entry.digest]
+            for rel_path, entry in sorted(entries.items())
+        },
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def snapshot(
+    root: Path,
+    files: list[str],
+    previous: dict[str, ManifestEntry] | None = None,
+) -> dict[str, ManifestEntry]:
+    """Records the current version of files.
+
+    Args:
+        root: The project root.
+        files: The POSIX paths of the files, relative to ``root``.
+        previous: An earlier manifest whose digests are reused for files
+            with the same size and modification time, so only changed
+            files are read.
+
+    Returns:
+        The manifest entries by POSIX path. Files that cannot be read
+        are left out.
+    """
+    previous = previous or {}
+    entries = {}
+    for rel_path in files:
+        full_path = root / rel_path
+        try:
+            st = os.stat(full_path)
+            entry = previous.get(rel_path)
+            if (
+                entry is None
+                or entry.size != st.st_size
+                or entry.mtime_ns != st.st_mtime_ns
+            ):
+                entry = ManifestEntry(
+                    st.st_size, st.st_mtime_ns, file_digest(full_path)
+                )
+        except OSError:
+            continue
+        entries[rel_path] = entry
+    return entries
+
+
+def manifest_changes(
+    root: Path, files: list[str], manifest: dict[str, ManifestEntry]
+) -> tuple[set[str], list[str]]:
+    """Compares files with their recorded versions.
+
+    A file is unchanged if its size and modification time match its
+    entry, or if only its modification time differs and its content
+    still has the recorded digest.
+
+    Args:
+        root: The project root.
+        files: The POSIX paths of the current files, relative to
+            ``root``.
+        manifest: The recorded file versions.
+
+    Returns:
+        A tuple of the changed and added files, and the sorted recorded
+        files that are no longer among ``files``.
+    """
+    changed = set()
+    for rel_path in files:
+        entry = manifest.get(rel_path)
+        try:
+            st = os.stat(root / rel_path)
+            if entry is None or entry.size != st.st_size:
+                changed.add(rel_path)
+            elif entry.mtime_ns != st.st_mtime_ns:
+                if file_digest(root / rel_path) != entry.digest:
+                    changed.add(rel_path)
+        except OSError:
+            changed.add(rel_path)
+    removed = sorted(manifest.keys() - set(files))
+    return changed, removed
+
+
+def detect_changes(
+    root: Path,
+    files: list[str],
+    since: str | None = None,
+    manifest_path: Path | None = None,
+) -> ChangeSet:
+    """Finds the files that changed since a git commit or a manifest.
+
+    Args:
+        root: The project root.
+        files: The POSIX paths of the files in the report.
+        since: A git commit to compare with.
+        manifest_path: A manifest to compare with, used when ``since``
+            is None. A missing manifest counts every file as added, so
+            the first run of a series writing and reading the same
+            manifest includes everything.
+
+    Returns:
+        The change set, limited to ``files`` apart from removed files.
+
+    Raises:
+        GitError: If the git comparison fails.
+        OSError: If the manifest cannot be read.
+        ValueError: If neither base is given or the manifest is invalid.
+    """
+    if since is not None:
+        changed, removed = git.changed_files(root, since)
+        included = set(files)
+        return ChangeSet(
+            since,
+            frozenset(included.intersection(changed)),
+            tuple(sorted(set(removed))),
+        )
+    if manifest_path is None:
+        raise ValueError("A change set needs a git ref or a manifest.")
+    try:
+        manifest = read_manifest(manifest_path)
+    except FileNotFoundError:
+        logging.warning(
+            f"Manifest {manifest_path} not found; all files count as changed."
+        )
+        manifest = {}
+    changed, removed = manifest_changes(root, files, manifest)
+    return ChangeSet(str(manifest_path), frozenset(changed), tuple(removed))
@@ -0,0 +1,406 @@
+"""Content compaction module for the txt2llm project.
+
+This module shrinks file contents before they are rendered by removing
+what an LLM does not need to understand the code: comments, docstrings,
+license headers, trailing whitespace and runs of blank lines. The
+compactor is chosen by the file's language, see
+`utils.get_markdown_lang`:
+
+- Python comments and docstrings are found with `tokenize`;
+- C, C++, Java, JavaScript, TypeScript, Go and Rust comments are found
+  by a lexer that skips string and character literals;
+- shell comments are found by a lexer that follows quoting and
+  here-documents.
+
+Other languages keep their content, but a leading ``#`` or ``;``
+comment block naming a license or copyright is dropped. In every
+language, trailing whitespace is stripped, lines left empty by a
+removed comment are dropped and runs of blank lines are collapsed into
+one. Lines inside the multi-line string literals and here-documents
+that the lexers find are kept as they are, as their whitespace is part
+of a value.
+
+All compactors work line by line in a single pass, carrying the lexer
+state from one line to the next. The lexers are deliberately small:
+code they cannot follow, such as a JavaScript regular expression
+literal containing a quote, at worst keeps a comment, and a Python file
+that does not tokenize only has its whitespace compacted.
+"""
+
+import bisect
+import io
+import re
+import tokenize
+from typing import Iterable, Iterator
+
+# Languages whose comments are found by the C-family lexer.
+_C_FAMILY = {"c", "cpp", "java", "javascript", "typescript", "go", "rust"}
+
+# C-family languages with backquoted raw or template strings.
+_BACKTICK_STRINGS = {"javascript", "typescript", "go"}
+
+# Languages that may start with a ``#`` or ``;`` license comment block.
+_HASH_COMMENTED = {"yaml", "toml", "ini"}
+
+# The starts of comments and literals in C-family code.
+_C_SPECIAL = re.compile(r"//|/\*|[\"'`]")
+
+# The rest of a string literal, up to its closing quote, by quote.
+_C_STRING_END = {
+    quote: re.compile(rf"(?:\\.|[^\\{quote}])*{quote}") for quote in "\"'`"
+}
+
+# A Rust character literal; a quote not starting one is a lifetime.
+_RUST_CHAR = re.compile(r"'(?:\\.[^']*|[^\\'])'")
+
+# The starts of comments, quotes and here-documents in shell code.
+_SHELL_SPECIAL = re.compile(
+    r"#|[\"']|(?<!<)<<-?\s*[\"']?([A-Za-z_]\w*)[\"']?"
+)
+
+# The rest of a shell string, up to its closing quote, by quote.
+_SHELL_STRING_END = {
+    '"': re.compile(r'(?:\\.|[^\\"])*"'),
+    "'": re.compile(r"[^']*'"),
+}
+
+# Characters after which a shell ``#`` starts a comment.
+_SHELL_WORD_BREAKS = " \t;&|()"
+
+# Words marking a leading comment block as a license header.
+_LICENSE_WORDS = re.compile(r"licen[sc]e|copyright|spdx", re.IGNORECASE)
+
+# A Python token position, as (row, column).
+_Position = tuple[int, int]
+
+# The types of the tokens that start and end a Python f-string, from
+# Python 3.12 on; earlier, an f-string is a single string token.
+_FSTRING_START = getattr(tokenize, "FSTRING_START", None)
+_FSTRING_END = getattr(tokenize, "FSTRING_END", None)
+
+
+def compact(text: str, language: str) -> str:
+    """Removes comments, docstrings and redundant whitespace.
+
+    Args:
+        text: The file content.
+        language: The Markdown language identifier of the content, e.g.
+            ``python``.
+
+    Returns:
+        The compacted content. It ends with a newline if ``text`` does.
+    """
+    lines = io.StringIO(text).readlines()
+    if language == "python":
+        marked = _python_lines(lines)
+    elif language in _C_FAMILY:
+        marked = _c_lines(lines, language)
+    elif language == "shell":
+        marked = _shell_lines(lines)
+    elif language in _HASH_COMMENTED:
+        marked = _without_license_header(lines)
+    else:
+        marked = ((line, False, False) for line in lines)
+    compacted = "\n".join(_collapse(marked))
+    if compacted and text.endswith("\n"):
+        compacted += "\n"
+    return compacted
+
+
+def _collapse(marked: Iterable[tuple[str, bool, bool]]) -> Iterator[str]:
+    """Compacts the whitespace of lines.
+
+    Args:
+        marked: Tuples of a line, whether a comment was removed from it
+            and whether it ends inside a string literal.
+
+    Yields:
+        The lines without trailing whitespace, leaving out lines emptied
+        by a removed comment, leading and trailing blank lines, and all
+        but the first of consecutive blank lines. A line ending inside a
+        string literal is only stripped of its line break, and is never
+        left out.
+    """
+    blank = False
+    started = False
+    for line, removed, in_string in marked:
+        if in_string:
+            line = line.rstrip("\r\n")
+        else:
+            line = line.rstrip()
+        if not line and not in_string:
+            if not removed:
+                blank = started
+            continue
+        if blank:
+            yield ""
+            blank = False
+        started = True
+        yield line
+
+
+def _without_license_header(
+    lines: list[str],
+) -> Iterator[tuple[str, bool, bool]]:
+    """Drops a leading comment block that names a license.
+
+    Args:
+        lines: The lines of a file whose comments start with ``#`` or
+            ``;``.
+
+    Yields:
+        Tuples of each kept line, whether it was emptied, and False, as
+        string literals are not followed.
+    """
+    header = 0
+    while header < len(lines) and lines[header].lstrip()[:1] in ("#", ";"):
+        header += 1
+    if not _LICENSE_WORDS.search("".join(lines[:header])):
+        header = 0
+    for index, line in enumerate(lines):
+        yield ("", True, False) if index < header else (line, False, False)
+
+
+def _python_lines(lines: list[str]) -> Iterator[tuple[str, bool, bool]]:
+    """Removes the comments and docstrings of Python code.
+
+    A docstring is a string statement opening a module, class or
+    function body. A docstring that is the whole body of a class or
+    function is replaced by ``...`` so the body is not left empty. A
+    shebang line is kept.
+
+    Args:
+        lines: The lines of the file.
+
+    Yields:
+        Tuples of each line, whether something was removed from it and
+        whether it ends inside a string literal. If the code does not
+        tokenize, the lines are yielded unchanged, and none is known to
+        end inside a string literal.
+    """
+    try:
+        removals, string_rows = _python_removals(lines)
+    except (tokenize.TokenError, SyntaxError):
+        removals, string_rows = [], set()
+    row, col = 1, 0
+    pending = ""
+    removed = False
+    for (start_row, start_col), (end_row, end_col), text in removals:
+        while row < start_row:
+            line = pending + lines[row - 1][col:]
+            yield line, removed, row in string_rows
+            pending, removed = "", False
+            row, col = row + 1, 0
+        pending += lines[row - 1][col:start_col] + text
+        removed = True
+        row, col = end_row, end_col
+    while row <= len(lines):
+        yield pending + lines[row - 1][col:], removed, row in string_rows
+        pending, removed = "", False
+        row, col = row + 1, 0
+
+
+def _python_removals(
+    lines: list[str],
+) -> tuple[list[tuple[_Position, _Position, str]], set[int]]:
+    """Finds the comments and docstrings of Python code.
+
+    Args:
+        lines: The lines of the file.
+
+    Returns:
+        The start, end and replacement text of each removed span, in
+        order, and the rows, counted from 1, that end inside a string
+        literal.
+
+    Raises:
+        tokenize.TokenError: If the code does not tokenize.
+        SyntaxError: If the code is not consistently indented.
+    """
+    removals = []
+    # Whether the next statement may be a docstring, and if so whether
+    # it opens a class or function body.
+    expect_docstring, in_body = True, False
+    # The docstring candidate of the current statement, if any.
+    candidate = None
+    # A docstring whose removal depends on whether the body goes on.
+    docstring = None
+    header_keyword = None
+    statement_start = True
+    string_rows = set()
+    # The start row of the outermost open f-string, from Python 3.12 on.
+    fstring_rows = []
+    for token in tokenize.generate_tokens(iter(lines).__next__):
+        kind = token.type
+        if kind == tokenize.STRING:
+            string_rows.update(range(token.start[0], token.end[0]))
+        elif kind == _FSTRING_START:
+            fstring_rows.append(token.start[0])
+        elif kind == _FSTRING_END:
+            start_row = fstring_rows.pop()
+            if not fstring_rows:
+                string_rows.update(range(start_row, token.end[0]))
+        if kind == tokenize.COMMENT:
+            if token.start != (1, 0) or not token.string.startswith("#!"):
+                removals.append((token.start, token.end, ""))
+            continue
+        if kind == tokenize.NL:
+            continue
+        if docstring is not None:
+            # A docstring followed by a dedent was the whole body.
+            text = "..." if kind == tokenize.DEDENT and in_body else ""
+            # Comments after the docstring may already be recorded.
+            bisect.insort(removals, (docstring.start, docstring.end, text))
+            docstring = None
+        if kind == tokenize.NEWLINE:
+            if candidate is not None:
+                docstring = candidate
+                candidate = None
+            expect_docstring = False
+            statement_start = True
+            continue
+        if kind == tokenize.INDENT:
+            expect_docstring = header_keyword in ("def", "class")
+            in_body = expect_docstring
+            header_keyword = None
+            continue
+        if kind in (tokenize.DEDENT, tokenize.ENDMARKER):
+            continue
+        if statement_start:
+            header_keyword = token.string
+            if header_keyword == "async":
+                header_keyword = "def"
+            candidate = None
+            if expect_docstring and kind == tokenize.STRING:
+                candidate = token
+        else:
+            candidate = None
+        statement_start = False
+    return removals, string_rows
+
+
+def _c_lines(
+    lines: list[str], language: str
+) -> Iterator[tuple[str, bool, bool]]:
+    """Removes the ``//`` and ``/* */`` comments of C-family code.
+
+    Args:
+        lines: The lines of the file.
+        language: The language, which decides whether a single quote
+            can start a lifetime (Rust) instead of a character literal.
+
+    Yields:
+        Tuples of each line, whether a comment was removed from it and
+        whether it ends inside a string literal, e.g. a template string.
+    """
+    # None, "/*" inside a block comment, or the quote of an open string.
+    state = None
+    for line in lines:
+        kept = []
+        removed = False
+        pos = 0
+        while pos < len(line):
+            if state == "/*":
+                end = line.find("*/", pos)
+                removed = True
+                if end == -1:
+                    break
+                pos, state = end + 2, None
+                continue
+            if state is not None:
+                match = _C_STRING_END[state].match(line, pos)
+                if match is None:
+                    kept.append(line[pos:])
+                    # Only raw and template strings and lines ending in
+                    # a backslash continue on the next line.
+                    continued = line.rstrip("\r\n").endswith("\\")
+                    if not continued and state != "`" and language != "rust":
+                        state = None
+                    break
+                kept.append(match.group())
+                pos, state = match.end(), None
+                continue
+            match = _C_SPECIAL.search(line, pos)
+            if match is None:
+                kept.append(line[pos:])
+                break
+            kept.append(line[pos : match.start()])
+            token = match.group()
+            pos = match.end()
+            if token == "//":
+                removed = True
+                break
+            if token == "/*":
+                state = "/*"
+                continue
+            kept.append(token)
+            if token == "`" and language not in _BACKTICK_STRINGS:
+                continue
+            if token == "'" and language == "rust":
+                if not _RUST_CHAR.match(line, match.start()):
+                    continue
+            state = token
+        yield "".join(kept), removed, state not in (None, "/*")
+
+
+def _shell_lines(lines: list[str]) -> Iterator[tuple[str, bool, bool]]:
+    """Removes the comments of shell code.
+
+    A ``#`` starts a comment at the start of a word outside quotes.
+    Here-documents are kept unchanged, as is a shebang line.
+
+    Args:
+        lines: The lines of the file.
+
+    Yields:
+        Tuples of each line, whether a comment was removed from it and
+        whether it ends inside a string or here-document.
+    """
+    # None, or the quote of a string continued from an earlier line.
+    quote = None
+    # The delimiters of pending here-documents, in order.
+    heredocs = []
+    for number, line in enumerate(lines):
+        if heredocs and quote is None:
+            if line.strip() == heredocs[0]:
+                heredocs.pop(0)
+                yield line, False, False
+            else:
+                yield line, False, True
+            continue
+        if number == 0 and line.startswith("#!"):
+            yield line, False, False
+            continue
+        kept = []
+        removed = False
+        pos = 0
+        while pos < len(line):
+            if quote is not None:
+                match = _SHELL_STRING_END[quote].match(line, pos)
+                if match is None:
+                    kept.append(line[pos:])
+                    break
+                kept.append(match.group())
+                pos, quote = match.end(), None
+                continue
+            match = _SHELL_SPECIAL.search(line, pos)
+            if match is None:
+                kept.append(line[pos:])
+                break
+            start = match.start()
+            token = match.group()
+            kept.append(line[pos:start])
+            pos = match.end()
+            if token == "#":
+                if start == 0 or line[start - 1] in _SHELL_WORD_BREAKS:
+                    removed = True
+                    break
+                kept.append(token)
+            elif token in _SHELL_STRING_END:
+                kept.append(token)
+                if not start or line[start - 1] != "\\":
+                    quote = token
+            else:
+                kept.append(token)
+                heredocs.append(match.group(1))
+        yield "".join(kept), removed, quote is not None
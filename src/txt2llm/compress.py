@@ -0,0 +1,96 @@
+"""Compressed output module for the txt2llm project.
+
+This module opens report outputs for writing, through a streaming gzip,
+xz or bz2 compressor when the output name ends in ``.gz``, ``.xz`` or
+``.bz2``. Report chunks are buffered, encoded and compressed as they are
+written, so neither the report nor its compressed form is ever held in
+memory as a whole. Compressed streams report that they cannot seek,
+although `gzip.GzipFile` claims to, as written text cannot be patched
+in place.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+from typing import TextIO
+
+# Compressors by output file suffix.
+CODECS = {".gz": "gzip", ".xz": "xz", ".bz2": "bz2"}
+
+# Compression levels used when none is given. gzip defaults to zlib's
+# own level rather than Python's slower level 9.
+DEFAULT_LEVELS = {"gzip": 6, "xz": 6, "bz2": 9}
+
+# Default buffer size in front of the compressor, in bytes.
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class _CompressedWriter(io.BufferedWriter):
+    """A buffered writer in front of a compressor, which cannot seek."""
+
+    def seekable(self) -> bool:
+        """Returns False: compressed output cannot be rewritten."""
+        return False
+
+
+def codec_for(path: Path) -> str | None:
+    """Returns the codec implied by an output path's suffix.
+
+    Args:
+        path: The output path, e.g. ``report.txt.gz``.
+
+    Returns:
+        The codec name, one of the values of `CODECS`, or None for an
+        uncompressed output.
+    """
+    return CODECS.get(path.suffix.lower())
+
+
+def plain_name(path: Path) -> Path:
+    """Returns an output path without its compression suffix, if any."""
+    return path.with_suffix("") if codec_for(path) else path
+
+
+def open_text(
+    path: Path,
+    level: int | None = None,
+    codec: str | None = None,
+    buffering: int = DEFAULT_BUFFER_SIZE,
+) -> TextIO:
+    """Opens an output file for writing UTF-8 text.
+
+    Args:
+        path: The output path.
+        level: The compression level, from 1 (fastest) to 9 (smallest).
+            Defaults to the codec's entry in `DEFAULT_LEVELS`. Ignored
+            for uncompressed outputs.
+        codec: The codec name, or None to choose it with `codec_for`.
+        buffering: The size of the write buffer, in bytes.
+
+    Returns:
+        A text stream; closing it flushes and closes the compressor. The
+        stream of a compressed output is not seekable.
+
+    Raises:
+        OSError: If the file cannot be opened.
+        ValueError: If the codec is unknown.
+    """
+    codec = codec or codec_for(path)
+    if codec is None:
+        return path.open("w", encoding="utf-8", buffering=buffering)
+    if level is None:
+        level = DEFAULT_LEVELS.get(codec)
+    if codec == "gzip":
+        # A zero mtime keeps the output of an unchanged tree identical.
+        raw = gzip.GzipFile(path, "wb", compresslevel=level, mtime=0)
+    elif codec == "xz":
+        raw = lzma.LZMAFile(path, "wb", preset=level)
+    elif codec == "bz2":
+        raw = bz2.BZ2File(path, "wb", compresslevel=level)
+    else:
+        raise ValueError(f"Unknown compression codec: {codec}")
+    return io.TextIOWrapper(
+        _CompressedWriter(raw, buffering), encoding="utf-8"
+    )
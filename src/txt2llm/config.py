@@ -1,7 +1,7 @@
 """Configuration module for the txt2llm project.
 
 This module defines the configuration settings for the project, including
-paths, ignored directories, and included file extensions.
+paths, ignored directories and patterns, and included file extensions.
 """
 
 import dataclasses
@@ -17,8 +17,92 @@ class ProjectConfig:
         output_path: The absolute path for the output file.
         ignored_dirs: A set of directory names to ignore during file search.
         include_exts: A set of file extensions to include during file search.
+        jobs: The number of threads used to read files ahead of the report
+            writer. A value of 1 reads files sequentially.
+        count_tokens: Whether to show per-file and total token estimates.
+        max_tokens: An optional token budget for the report. Once it is
+            reached, remaining files are listed as omitted. Implies
+            ``count_tokens``.
+        tokenizer: The tokenizer specification, e.g. ``heuristic`` or
+            ``tiktoken:cl100k_base``.
+        source: Where the project files are enumerated from: ``filesystem``
+            walks the project directory, ``git`` lists the files of the git
+            index.
+        git_untracked: With the ``git`` source, whether to also include
+            untracked files that are not ignored by git.
+        ignore_files: The names of the ``.gitignore``-style files read in
+            every directory, in increasing order of precedence. With the
+            ``git`` source, ``.gitignore`` is left to git itself.
+        exclude_patterns: Additional ``.gitignore``-style patterns applied
+            at the project root, e.g. ``*.min.js`` or ``docs/**/generated``.
+        dedup: Whether files identical to an earlier file are replaced by
+            a reference to it.
+        near_dup_threshold: An optional minimum estimated similarity, from
+            0 to 1, above which a file is shown as a diff against an
+            earlier similar file. Implies ``dedup``.
+        max_file_bytes: An optional size limit for included files, in
+            bytes. Larger files are shown as a head and tail excerpt.
+        ext_max_file_bytes: Size limits by file extension, e.g.
+            ``{".json": 1048576}``, which take precedence over
+            ``max_file_bytes``. A limit of None exempts the extension.
+        excerpt_lines: The maximum number of lines shown from each end of
+            a file over its size limit.
+        output_format: The report format: ``markdown``, or ``jsonl`` for
+            one JSON record per line, see the `jsonl` module.
+        compact: Whether file contents are stripped of comments,
+            docstrings, license headers and redundant whitespace, see
+            the `compact` module.
+        since: An optional git commit, e.g. ``HEAD~3``. Only files
+            changed since it are included in full; the others are
+            listed, see the `changes` module.
+        since_manifest: An optional manifest written by an earlier run,
+            used like ``since`` when no commit is given.
+        since_diff: With ``since``, whether changed files are shown as a
+            unified diff against the commit instead of in full.
+        tree_max_depth: An optional depth limit for the directory tree.
+            The contents of deeper directories are summarized.
+        tree_collapse: An optional limit on the entries of a directory
+            listed in the tree. The contents of larger directories are
+            summarized.
+        tree_only_included: Whether the directory tree only shows the
+            included files and the directories containing them.
+        order: The order of the file sections: ``path`` sorts them by
+            path, ``imports`` ranks them by the project's import graph,
+            see the `order` module.
+        entry_points: With the ``imports`` order, the POSIX paths of the
+            files ranked first, followed by the files they import by
+            increasing import distance.
+        outline_exts: The extensions of the files shown as an outline of
+            their docstrings, signatures and constants instead of in
+            full, e.g. ``{".py"}``, see the `outline` module.
     """
     project_root: Path
     output_path: Path
     ignored_dirs: set[str]
     include_exts: set[str]
+    jobs: int = 1
+    count_tokens: bool = False
+    max_tokens: int | None = None
+    tokenizer: str = "heuristic"
+    source: str = "filesystem"
+    git_untracked: bool = False
+    ignore_files: tuple[str, ...] = (".gitignore", ".txt2llmignore")
+    exclude_patterns: tuple[str, ...] = ()
+    dedup: bool = False
+    near_dup_threshold: float | None = None
+    max_file_bytes: int | None = None
+    ext_max_file_bytes: dict[str, int | None] = dataclasses.field(
+        default_factory=dict
+    )
+    excerpt_lines: int = 50
+    output_format: str = "markdown"
+    compact: bool = False
+    since: str | None = None
+    since_manifest: Path | None = None
+    since_diff: bool = False
+    tree_max_depth: int | None = None
+    tree_collapse: int | None = None
+    tree_only_included: bool = False
+    order: str = "path"
+    entry_points: tuple[str, ...] = ()
+    outline_exts: frozenset[str] = frozenset()
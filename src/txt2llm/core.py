@@ -4,136 +4,714 @@ This module contains the main logic for finding files, generating a directory
 tree, reading file contents, and assembling the final report.
 """
 
+import collections
+import contextlib
+import dataclasses
+import difflib
+import functools
+import io
+import itertools
 import logging
+import os
+import time
+try:
+    import fcntl
+except ImportError:  # Not on Windows.
+    fcntl = None
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from pathlib import Path
+from typing import Callable, Iterator, TextIO
 
+from . import (
+    changes,
+    compact,
+    compress,
+    dedup,
+    fs,
+    git,
+    jsonl,
+    order,
+    outline,
+    tokens,
+    utils,
+    walker,
+)
+from .cache import LayoutSnapshot, MemoryCache, ReportCache, StatKey
 from .config import ProjectConfig
-from . import utils
+from .ignore import IgnoreMatcher
+from .index import TREE_KEY, IndexWriter, index_path
+from .shard import ShardWriter, utf8_size
+from .stats import Stats
+
+# Number of file sections each reader thread may prepare ahead of the
+# report writer.
+_READ_AHEAD_PER_JOB = 4
+
+# The smallest number of files whose imports are extracted by a process
+# pool, which costs some tens of milliseconds to start.
+_PARALLEL_IMPORTS_MIN = 256
+
+# The smallest number of files to outline that are parsed by a process
+# pool, see `_PARALLEL_IMPORTS_MIN`.
+_PARALLEL_OUTLINE_MIN = 64
+
+# Number of files read at a time for import extraction, bounding the
+# file contents held in memory, and number of files sent to a worker
+# process at a time.
+_IMPORTS_BATCH_SIZE = 1024
+_IMPORTS_CHUNK_SIZE = 16
+
+# Fixed-width stand-in for the token total in the header. `write_report`
+# overwrites it in place once the total is known.
+_TOKEN_TOTAL_PLACEHOLDER = "`pending`".ljust(24)
+
+# Stands in for `Stats.phase` when no statistics are collected.
+_NO_PHASE = contextlib.nullcontext()
+
+
+@dataclasses.dataclass(frozen=True)
+class FileSection:
+    """A rendered file section of the report.
+
+    Attributes:
+        text: The Markdown section, ending with a newline after the
+            closing fence.
+        tokens: The estimated number of tokens in ``text``, or 0 when
+            token counting is disabled.
+        digest: The hex digest of the file's raw content, or None when
+            deduplication is disabled or the file could not be included.
+        sketch: The file's near-duplicate sketch, or empty when near
+            duplicates are not detected.
+    """
+    text: str
+    tokens: int = 0
+    digest: str | None = None
+    sketch: tuple[int, ...] = ()
 
 
 class TextProjectBuilder:
     """Builds a consolidated text representation of a project.
 
     This class orchestrates the process of scanning a project directory,
-    filtering files, and generating a comprehensive text report.
+    filtering files, and generating a comprehensive text report. The
+    scanned project tree is cached on the instance, so a builder reflects
+    the filesystem as it was at its first scan.
 
     Attributes:
         config: The project configuration object.
+        cache: The optional cache of rendered sections and project
+            layout.
+        tokenizer: The tokenizer used for token accounting, or None when
+            token counting is disabled.
+        total_tokens: The running token count of the report generated so
+            far, or None when token counting is disabled.
+        stats: The optional run statistics being collected.
+        file_count: The number of files listed in the report generated
+            last, or None before a report is generated.
     """
 
-    def __init__(self, config: ProjectConfig):
+    def __init__(
+        self,
+        config: ProjectConfig,
+        cache: ReportCache | MemoryCache | None = None,
+        tokenizer: tokens.Tokenizer | None = None,
+        stats: Stats | None = None,
+    ):
         """Initializes the TextProjectBuilder with a project configuration.
 
         Args:
             config: A ProjectConfig object containing all necessary settings.
+            cache: An optional ReportCache or MemoryCache. When given,
+                unchanged files and an unchanged project layout are
+                served from the cache instead of being read and scanned
+                again.
+            tokenizer: An optional tokenizer overriding the one named by
+                ``config.tokenizer``. Only used when token counting is
+                enabled.
+            stats: Optional run statistics. When given, phase timings,
+                I/O counters and the slowest files are recorded into it.
+
+        Raises:
+            ValueError: If ``config.tokenizer`` is not recognized.
+            ImportError: If the configured tokenizer needs a missing
+                optional package.
         """
         self.config = config
+        self.cache = cache
+        self.tokenizer: tokens.Tokenizer | None = None
+        if config.count_tokens or config.max_tokens is not None:
+            self.tokenizer = tokenizer or tokens.get_tokenizer(
+                config.tokenizer
+            )
+        self.total_tokens: int | None = None
+        self.stats = stats
+        self.file_count: int | None = None
+        self._tree: walker.TreeNode | None = None
+        self._layout: LayoutSnapshot | None = None
+        self._changes: changes.ChangeSet | None = None
+        self._fs: fs.ProjectFS | None = None
+        self._import_order: list[Path] | None = None
+        # The process pool parsing outlines while sections are rendered
+        # by reader threads, see `_iter_file_sections`.
+        self._outline_pool: ProcessPoolExecutor | None = None
+
+    def _phase(self, name: str) -> contextlib.AbstractContextManager:
+        """Returns a context manager timing a phase, if stats are enabled."""
+        if self.stats is None:
+            return _NO_PHASE
+        return self.stats.phase(name)
+
+    def _ignore_matcher(self) -> IgnoreMatcher | None:
+        """Returns the matcher for the configured ignore files and patterns.
+
+        With the ``git`` source, ``.gitignore`` files are skipped because
+        git has already applied them when listing the files.
+
+        Returns:
+            The matcher, or None if there is nothing to match against.
+        """
+        ignore_files = self.config.ignore_files
+        if self.config.source == "git":
+            ignore_files = tuple(f for f in ignore_files if f != ".gitignore")
+        if not ignore_files and not self.config.exclude_patterns:
+            return None
+        return IgnoreMatcher(
+            self.config.project_root,
+            ignore_files,
+            self.config.exclude_patterns,
+            self._project_fs().read_ignore_file,
+        )
+
+    def _project_fs(self) -> fs.ProjectFS:
+        """Returns the filesystem the project is read from.
+
+        The project root is either a directory or an archive, see
+        `fs.open_project`. A tar archive is read once, here, keeping only
+        the members that may be listed in the report or are ignore
+        files, and only the ends of those over their size limit.
+
+        Raises:
+            OSError: If the archive cannot be read.
+            ValueError: If the archive is invalid.
+        """
+        if self._fs is None:
+            self._fs = fs.open_project(
+                self.config.project_root,
+                self._keeps_member,
+                self._member_size_limit,
+                self.stats,
+            )
+        return self._fs
+
+    def close(self) -> None:
+        """Closes the filesystem the project was read from, if opened."""
+        if self._fs is not None:
+            self._fs.close()
+            self._fs = None
+
+    def _keeps_member(self, rel_path: str) -> bool:
+        """Tells whether an archive member may be read for the report."""
+        *dirs, name = rel_path.split("/")
+        if any(part in self.config.ignored_dirs for part in dirs):
+            return False
+        return (
+            name in self.config.ignore_files
+            or Path(name).suffix in self.config.include_exts
+        )
+
+    def _member_size_limit(self, rel_path: str) -> int | None:
+        """Returns the size limit of an archive member, if any.
+
+        Ignore files are always read in full.
+        """
+        name = rel_path.rpartition("/")[2]
+        if name in self.config.ignore_files:
+            return None
+        return self._size_limit(Path(name))
+
+    def _size_limit(self, file_path: Path) -> int | None:
+        """Returns the size limit of a file, if any.
+
+        The limit for the file's extension is used if there is one, else
+        the global limit.
+        """
+        return self.config.ext_max_file_bytes.get(
+            file_path.suffix, self.config.max_file_bytes
+        )
+
+    def _scan(self) -> walker.TreeNode:
+        """Scans the project root into an in-memory tree model.
+
+        The model is built on first use and shared by `_find_files` and
+        `_generate_tree`, so the project is only walked once. With the
+        ``git`` source, the model is built from the git index instead of
+        a directory walk.
+
+        Returns:
+            The root node of the scanned project tree.
+
+        Raises:
+            GitError: If the ``git`` source is used outside a git work
+                tree.
+        """
+        if self._tree is None:
+            with self._phase("scan"):
+                self._tree = self._scan_uncached()
+        return self._tree
+
+    def _scan_uncached(self) -> walker.TreeNode:
+        """Builds the tree model from the configured file source."""
+        if self.config.source == "git":
+            logging.info("Listing project files from the git index...")
+            return walker.build_tree(
+                self.config.project_root.name,
+                git.ls_files(
+                    self.config.project_root, self.config.git_untracked
+                ),
+                self.config.ignored_dirs,
+                self._ignore_matcher(),
+            )
+        logging.info("Scanning project directory...")
+        return self._project_fs().scan(
+            self.config.ignored_dirs, self._ignore_matcher(), self.stats
+        )
+
+    def _uses_layout_cache(self) -> bool:
+        """Checks whether the project layout is served from the cache.
+
+        Only directory walks are cached; listing the git index is
+        already cheaper than validating a cached layout, and archives
+        have no directory modification times to validate it with.
+        """
+        return (
+            self.cache is not None
+            and self.config.source != "git"
+            and self._project_fs().cacheable
+        )
+
+    def _cached_layout(self) -> LayoutSnapshot:
+        """Returns the project layout, reusing the cached one if current.
+
+        The cached layout is reused when none of the previously scanned
+        directories and ignore files has changed, which costs one
+        ``stat`` call per directory instead of a full scan.
+
+        Returns:
+            The layout snapshot of the project.
+        """
+        if self._layout is None:
+            with self._phase("scan"):
+                self._layout = self._load_layout()
+        return self._layout
+
+    def _load_layout(self) -> LayoutSnapshot:
+        """Validates the cached layout, scanning the project if stale."""
+        snapshot = self.cache.get_layout()
+        if snapshot is not None:
+            if self.stats is not None:
+                self.stats.count("paths_statted", len(snapshot.dir_mtimes))
+            if snapshot.is_current(self.config.project_root):
+                logging.info("Reusing cached project layout.")
+                return snapshot
+
+        logging.info("Scanning project directory...")
+        dir_mtimes: dict[str, int] = {}
+        tree = walker.scan_tree(
+            self.config.project_root,
+            self.config.ignored_dirs,
+            dir_mtimes,
+            self._ignore_matcher(),
+            self.stats,
+        )
+        snapshot = LayoutSnapshot(
+            tree_text=self._render_tree(tree),
+            files=walker.collect_files(tree, self.config.include_exts),
+            dir_mtimes=dir_mtimes,
+        )
+        self.cache.put_layout(snapshot)
+        return snapshot
 
     def _find_files(self) -> list[Path]:
         """Finds and filters files based on the project configuration.
 
-        This method recursively scans the project root directory and returns a
-        sorted list of file paths that match the inclusion criteria and are
+        This method collects the files of the scanned project tree that
+        match the inclusion criteria. Ignored directories are pruned
+        during the scan and never entered.
 
         Returns:
             A sorted list of Path objects, relative to the project root.
         """
         logging.info("Starting file search...")
-        found_files = []
-        for path in self.config.project_root.rglob("*"):
-            if not path.is_file():
-                continue
+        if self._uses_layout_cache():
+            sorted_files = list(self._cached_layout().files)
+        else:
+            tree = self._scan()
+            with self._phase("collect_files"):
+                sorted_files = walker.collect_files(
+                    tree, self.config.include_exts
+                )
+        logging.info(f"Found {len(sorted_files)} matching files.")
+        if self.config.order == "imports":
+            return self._ordered_by_imports(sorted_files)
+        return sorted_files
 
-            # Check if any part of the path is in the ignored directories
-            if any(
-                part in self.config.ignored_dirs
-                for part in path.relative_to(self.config.project_root).parts
-            ):
-                continue
+    def _ordered_by_imports(self, found_files: list[Path]) -> list[Path]:
+        """Orders files by the project's import graph.
 
-            # Check if the file extension is in the inclusion list
-            if path.suffix in self.config.include_exts:
-                found_files.append(path)
+        The order is computed on first use, see `order.rank`.
 
-        # Sort the files and make them relative to the project root
-        sorted_files = sorted(
-            [
-                f.relative_to(self.config.project_root)
-                for f in found_files
-            ]
-        )
-        logging.info(f"Found {len(sorted_files)} matching files.")
-        return sorted_files
+        Args:
+            found_files: The relative paths of the report's files.
+
+        Returns:
+            The files, most important first.
+        """
+        if self._import_order is None:
+            logging.info("Ranking files by their imports...")
+            with self._phase("order"):
+                files = [file_path.as_posix() for file_path in found_files]
+                graph = order.build_graph(
+                    files, self._file_imports(found_files)
+                )
+                ranked = order.rank(files, graph, self.config.entry_points)
+            if self.stats is not None:
+                self.stats.count(
+                    "import_edges", sum(map(len, graph.values()))
+                )
+            self._import_order = [Path(rel_path) for rel_path in ranked]
+        return self._import_order
+
+    def _file_imports(
+        self, found_files: list[Path]
+    ) -> dict[str, tuple[str, ...]]:
+        """Extracts the imports of the files in `order.LANGUAGES`.
+
+        Imports are served from the cache for files whose stat key is
+        unchanged. The other files are read in batches, and with
+        ``config.jobs`` greater than 1 and enough files parsed by a
+        process pool, since `ast.parse` holds the GIL. Files over their
+        size limit or that cannot be read have no imports.
+
+        Args:
+            found_files: The relative paths of the report's files.
+
+        Returns:
+            The import specifiers by POSIX path, see
+            `order.extract_imports`.
+        """
+        project_fs = self._project_fs()
+        cache = self.cache if project_fs.cacheable else None
+        imports = {}
+        pending: list[tuple[Path, str, StatKey | None]] = []
+        for file_path in found_files:
+            lang = utils.get_markdown_lang(file_path)
+            if lang not in order.LANGUAGES:
+                continue
+            if self._excerpt_limit(file_path) is not None:
+                continue
+            key = None
+            if cache is not None:
+                try:
+                    key = StatKey.from_stat(project_fs.stat(file_path))
+                except OSError:
+                    continue
+                specs = cache.get_imports(file_path.as_posix(), key)
+                if specs is not None:
+                    imports[file_path.as_posix()] = specs
+                    continue
+            pending.append((file_path, lang, key))
+        if self.stats is not None:
+            self.stats.count("imports_cached", len(imports))
+            self.stats.count("imports_parsed", len(pending))
+
+        with contextlib.ExitStack() as stack:
+            extract = map
+            if (
+                self.config.jobs > 1
+                and len(pending) >= _PARALLEL_IMPORTS_MIN
+            ):
+                pool = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=self.config.jobs)
+                )
+                extract = functools.partial(
+                    pool.map, chunksize=_IMPORTS_CHUNK_SIZE
+                )
+            for start in range(0, len(pending), _IMPORTS_BATCH_SIZE):
+                batch = []
+                texts = []
+                for file_path, lang, key in pending[
+                    start : start + _IMPORTS_BATCH_SIZE
+                ]:
+                    try:
+                        text = project_fs.read_text(file_path)
+                    except (OSError, ValueError):
+                        continue
+                    if text is not None:
+                        batch.append((file_path.as_posix(), lang, key))
+                        texts.append(text[0])
+                langs = [lang for _, lang, _ in batch]
+                found = extract(order.extract_imports, texts, langs)
+                for (rel_path, _, key), specs in zip(batch, found):
+                    imports[rel_path] = specs
+                    if cache is not None:
+                        cache.put_imports(rel_path, key, specs)
+        return imports
 
     def _generate_tree(self) -> str:
         """Generates a string representation of the directory tree.
 
-        This method walks the directory structure, ignoring specified
-        directories, and builds a visual tree using prefix characters.
+        This method renders the scanned project tree, in which ignored
+        directories are already pruned, using prefix characters. Deep or
+        crowded directories are summarized, and entries contributing no
+        files left out, as configured.
 
         Returns:
             A string representing the directory tree.
         """
         logging.info("Generating directory tree...")
-        tree_lines = []
-
-        def recurse_tree(directory: Path, prefix: str = ""):
-            # Get directory contents, filter ignored, and sort
-            try:
-                contents = sorted(
-                    [
-                        p
-                        for p in directory.iterdir()
-                        if p.name not in self.config.ignored_dirs
-                    ],
-                    key=lambda p: (p.is_file(), p.name.lower()),
-                )
-            except OSError as e:
-                logging.warning(f"Could not read directory {directory}: {e}")
-                return
-
-            pointers = ["├── "] * (len(contents) - 1) + ["└── "]
-            for pointer, path in zip(pointers, contents):
-                display_name = f"{path.name}/" if path.is_dir() else path.name
-                tree_lines.append(f"{prefix}{pointer}{display_name}")
-                if path.is_dir():
-                    extension = "│   " if pointer == "├── " else "    "
-                    recurse_tree(path, prefix=prefix + extension)
-
-        tree_lines.append(f"{self.config.project_root.name}/")
-        recurse_tree(self.config.project_root)
-        tree_str = "\n".join(tree_lines)
+        if self._uses_layout_cache():
+            tree_str = self._cached_layout().tree_text
+        else:
+            tree = self._scan()
+            with self._phase("render_tree"):
+                tree_str = self._render_tree(tree)
         logging.info("Directory tree generation complete.")
         return tree_str
 
+    def _render_tree(self, tree: walker.TreeNode) -> str:
+        """Renders the tree model with the configured tree options."""
+        if self.config.tree_only_included:
+            tree = walker.prune_tree(tree, self.config.include_exts)
+        return walker.render_tree(
+            tree, self.config.tree_max_depth, self.config.tree_collapse
+        )
+
+    def _change_base(self) -> str | None:
+        """Returns the configured base of a changed-only report, if any."""
+        if self.config.since is not None:
+            return self.config.since
+        if self.config.since_manifest is not None:
+            return str(self.config.since_manifest)
+        return None
+
+    def _partition(
+        self, found_files: list[Path]
+    ) -> tuple[list[Path], list[Path], tuple[str, ...]]:
+        """Splits the files of a changed-only report.
+
+        The change set is computed on first use, see
+        `changes.detect_changes`. Without a configured base, every file
+        is included in full.
+
+        Args:
+            found_files: The relative paths of the report's files.
+
+        Returns:
+            A tuple of the files included in full, the unchanged files
+            and the POSIX paths of removed files with an included
+            extension.
+
+        Raises:
+            GitError: If the files changed since a git commit cannot be
+                listed.
+            OSError: If the manifest cannot be read.
+            ValueError: If the manifest is invalid.
+        """
+        if self._change_base() is None:
+            return found_files, [], ()
+        if self._changes is None:
+            logging.info(
+                f"Finding files changed since {self._change_base()}..."
+            )
+            with self._phase("changes"):
+                self._changes = changes.detect_changes(
+                    self.config.project_root,
+                    [file_path.as_posix() for file_path in found_files],
+                    self.config.since,
+                    self.config.since_manifest,
+                )
+        changed, unchanged = [], []
+        for file_path in found_files:
+            if file_path.as_posix() in self._changes.changed:
+                changed.append(file_path)
+            else:
+                unchanged.append(file_path)
+        removed = tuple(
+            rel_path
+            for rel_path in self._changes.removed
+            if Path(rel_path).suffix in self.config.include_exts
+        )
+        logging.info(
+            f"{len(changed)} files changed, {len(unchanged)} unchanged and "
+            f"{len(removed)} removed."
+        )
+        if self.stats is not None:
+            self.stats.count("changed_files", len(changed))
+            self.stats.count("unchanged_files", len(unchanged))
+            self.stats.count("removed_files", len(removed))
+        return changed, unchanged, removed
+
+    def _render_change_listing(
+        self, unchanged: list[Path], removed: tuple[str, ...]
+    ) -> str:
+        """Renders the compact listing of unchanged and removed files.
+
+        Args:
+            unchanged: The relative paths of the unchanged files.
+            removed: The POSIX paths of the removed files.
+
+        Returns:
+            The Markdown listing, or an empty string if both are empty.
+        """
+        listings = self._iter_change_listings(unchanged, removed)
+        return "\n".join(listing for _, listing in listings)
+
+    def _iter_change_listings(
+        self, unchanged: list[Path], removed: tuple[str, ...]
+    ) -> Iterator[tuple[str, str]]:
+        """Renders the listings of the unchanged and removed files.
+
+        Args:
+            unchanged: The relative paths of the unchanged files.
+            removed: The POSIX paths of the removed files.
+
+        Yields:
+            Tuples of the title and Markdown text of each non-empty
+            listing.
+        """
+        base = self._change_base()
+        for title, paths in (("Unchanged", unchanged), ("Removed", removed)):
+            if paths:
+                lines = "".join(f"- `{path}`\n" for path in paths)
+                yield (
+                    f"{title} Files",
+                    f"## {title} Files (since `{base}`)\n\n{lines}",
+                )
+
+    def write_manifest(self, path: Path) -> None:
+        """Records the current version of the report's files.
+
+        The manifest can be given as ``since_manifest`` to a later run.
+        Digests are reused from the existing manifest at ``path`` and
+        from ``config.since_manifest`` for files whose size and
+        modification time are unchanged, so only changed files are
+        read.
+
+        Args:
+            path: The manifest file to write.
+
+        Raises:
+            OSError: If the manifest cannot be written.
+        """
+        previous = {}
+        for source in (self.config.since_manifest, path):
+            if source is not None and source.exists():
+                try:
+                    previous.update(changes.read_manifest(source))
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Ignoring manifest {source}: {e}")
+        files = [file_path.as_posix() for file_path in self._find_files()]
+        with self._phase("manifest"):
+            entries = changes.snapshot(
+                self.config.project_root, files, previous
+            )
+            changes.write_manifest(path, entries)
+        logging.info(f"Manifest of {len(entries)} files written to: {path}")
+
+    def _excerpt_limit(self, file_path: Path) -> int | None:
+        """Returns the size limit a file exceeds, if any.
+
+        The limit is given by `_size_limit`. The size is checked with
+        ``stat`` before the file is opened.
+
+        Args:
+            file_path: The relative path of the file.
+
+        Returns:
+            The exceeded limit in bytes, or None if the file is within
+            its limit, has none, or cannot be stat'd.
+        """
+        limit = self._size_limit(file_path)
+        if limit is None:
+            return None
+        try:
+            size = self._project_fs().stat(file_path).st_size
+        except OSError:
+            return None
+        return limit if size > limit else None
+
     def _read_file_content(
         self,
-        file_path: Path
-    ) -> tuple[str, str | None]:
+        file_path: Path,
+        digest: dedup.Digest | None = None,
+        limit: int | None = None,
+    ) -> tuple[str, str | None, str | None]:
         """Reads the content of a file.
 
         Args:
             file_path: The relative path of the file to read.
+            digest: An optional hash object updated with the raw content
+                of a text file as it is read.
+            limit: If given, only a head and tail excerpt of at most this
+                many bytes is read, with a marker line for the elided
+                middle. ``digest`` is then left untouched.
 
         Returns:
-            A tuple containing the file content as a string and an
-            optional warning message (e.g., for binary files).
+            A tuple containing the file content as a string, an optional
+            warning message (e.g., for binary files) and the name of the
+            detected encoding, or None if the content was not read.
         """
         full_path = self.config.project_root / file_path
-        if utils.is_binary_file(full_path):
-            return "", "[SKIP] Binary file"
-
         try:
-            with open(
-                full_path,
-                "r",
-                encoding="utf-8",
-                errors="ignore"
-            ) as f:
-                return f.read(), None
-        except IOError as e:
+            if limit is None:
+                text = self._project_fs().read_text(
+                    file_path, self.stats, digest
+                )
+            else:
+                text = self._read_excerpt(file_path, limit)
+        except (OSError, ValueError) as e:
             logging.warning(f"Could not read file {full_path}: {e}")
-            return "", f"[SKIP] Could not read file: {e}"
+            if self.stats is not None:
+                self.stats.count("unreadable_files")
+            return "", f"[SKIP] Could not read file: {e}", None
+        if text is None:
+            return "", "[SKIP] Binary file", None
+        content, encoding = text
+        return content, None, encoding
+
+    def _read_excerpt(
+        self, file_path: Path, limit: int
+    ) -> tuple[str, str] | None:
+        """Reads the head and tail of a file over its size limit.
+
+        Args:
+            file_path: The relative path of the file.
+            limit: The file's size limit, in bytes.
+
+        Returns:
+            A tuple of the excerpt, with a marker line in place of the
+            elided bytes, and the name of its encoding, or None if the
+            file is likely binary.
+
+        Raises:
+            OSError: If the file cannot be opened or read.
+        """
+        excerpt = self._project_fs().read_excerpt(
+            file_path, limit, self.config.excerpt_lines, self.stats
+        )
+        if excerpt is None:
+            return None
+        head, tail, elided, encoding = excerpt
+        if self.stats is not None:
+            self.stats.count("excerpted_files")
+            self.stats.count("bytes_elided", elided)
+        if head and not head.endswith("\n"):
+            head += "\n"
+        return f"{head}[... {elided:,} bytes elided ...]\n{tail}", encoding
 
     def _build_header(self) -> str:
         """Builds the header section of the report.
@@ -142,7 +720,7 @@ class TextProjectBuilder:
             A string containing the formatted report header.
         """
         header_lines = [
-            f"# Project Overview: {self.config.project_root.name}",
+            f"# Project Overview: {self._project_fs().name}",
             "",
             "---",
             "",
@@ -151,56 +729,978 @@ class TextProjectBuilder:
             f"- Output Path: `{self.config.output_path}`",
             f"- Ignored Directories: `{', '.join(sorted(list(self.config.ignored_dirs)))}`",
             f"- Included Extensions: `{', '.join(sorted(list(self.config.include_exts)))}`",
+        ]
+        if self._change_base() is not None:
+            header_lines.append(f"- Changes Since: `{self._change_base()}`")
+        if self.tokenizer is not None:
+            if self.config.max_tokens is not None:
+                header_lines.append(
+                    f"- Token Budget: `{self.config.max_tokens:,}`"
+                )
+            header_lines.append(
+                f"- Estimated Tokens: {_TOKEN_TOTAL_PLACEHOLDER}"
+            )
+        header_lines += [
             "",
             "---",
             "",
         ]
         return "\n".join(header_lines)
 
-    def generate_report(self) -> str:
-        """Generates the full project overview report.
+    def _render_file_section(self, file_path: Path) -> FileSection:
+        """Reads a file and renders its section of the report.
 
-        This method orchestrates the collection of project information,
-        including the directory tree, file list, and file contents, into
-        a single Markdown-formatted string.
+        When token counting is enabled, the file's content is counted
+        once and its token count is shown in the section heading.
+
+        Args:
+            file_path: The relative path of the file to render.
 
         Returns:
-            A string containing the complete project overview report.
+            The file's rendered section.
+        """
+        if self.config.since_diff and self.config.since is not None:
+            section = self._render_change_diff(file_path)
+            if section is not None:
+                return section
+        limit = self._excerpt_limit(file_path)
+        # Excerpts are never deduplicated: their digest would not cover
+        # the whole file.
+        digest = self._content_digest() if limit is None else None
+        content, warning, encoding = self._read_file_content(
+            file_path, digest, limit
+        )
+        if warning:
+            return self._render_warning_section(file_path, warning)
+
+        lang = utils.get_markdown_lang(file_path)
+        outlined = None
+        if limit is None and file_path.suffix in self.config.outline_exts:
+            outlined = self._outline(lang, content)
+        if outlined is not None:
+            content = outlined
+        elif self.config.compact and limit is None:
+            content = self._compact(lang, content)
+        hexdigest = None if digest is None else digest.hexdigest()
+        if self.config.output_format == "jsonl":
+            section = self._render_record(
+                file_path,
+                lang,
+                content,
+                hexdigest,
+                encoding=encoding,
+                outlined=outlined is not None,
+            )
+        else:
+            section = self._render_content(
+                file_path, lang, content, encoding, outlined is not None
+            )
+        if digest is None:
+            return section
+        sketch = ()
+        if self.config.near_dup_threshold is not None:
+            sketch = dedup.sketch(content)
+        return dataclasses.replace(section, digest=hexdigest, sketch=sketch)
+
+    def _render_change_diff(self, file_path: Path) -> FileSection | None:
+        """Renders a changed file as a diff against the ``since`` commit.
+
+        Args:
+            file_path: The relative path of the file.
+
+        Returns:
+            The diff section, or None if git shows no content changes,
+            e.g. for an untracked file, or the diff fails.
+        """
+        try:
+            diff = git.diff(
+                self.config.project_root,
+                self.config.since,
+                file_path.as_posix(),
+            )
+        except git.GitError as e:
+            logging.warning(f"Could not diff {file_path}: {e}")
+            return None
+        if not diff:
+            return None
+        return self._render_diff(file_path, self.config.since, diff)
+
+    def _compact(self, lang: str, content: str) -> str:
+        """Compacts a file's content, recording the savings in the stats.
+
+        The bytes and tokens saved are counted per language, as
+        ``compact_bytes_saved.<lang>`` and ``compact_tokens_saved.<lang>``.
+        Tokens are estimated with the heuristic tokenizer when token
+        counting is disabled.
+
+        Args:
+            lang: The Markdown language identifier of the file.
+            content: The file's full content.
+
+        Returns:
+            The compacted content, see `compact.compact`.
+        """
+        if self.stats is None:
+            return compact.compact(content, lang)
+        start = time.perf_counter()
+        cpu = time.thread_time()
+        compacted = compact.compact(content, lang)
+        self.stats.add_time(
+            "compact",
+            time.perf_counter() - start,
+            time.thread_time() - cpu,
+        )
+        self._count_savings("compact", lang, content, compacted)
+        return compacted
+
+    def _outline(self, lang: str, content: str) -> str | None:
+        """Outlines a file's content, recording the savings in the stats.
+
+        The outline is parsed by the outline process pool while one is
+        running, and in the calling thread otherwise. The CPU time of the
+        ``outline`` phase is measured where the outline is parsed. The
+        bytes and tokens saved are counted per language, as
+        ``outline_bytes_saved.<lang>`` and
+        ``outline_tokens_saved.<lang>``.
+
+        Args:
+            lang: The Markdown language identifier of the file.
+            content: The file's full content.
+
+        Returns:
+            The outline, see `outline.outline`, or None if the file has
+            none.
+        """
+        start = time.perf_counter()
+        if self._outline_pool is not None:
+            outlined, cpu = self._outline_pool.submit(
+                _timed_outline, content, lang
+            ).result()
+        else:
+            outlined, cpu = _timed_outline(content, lang)
+        if self.stats is None or outlined is None:
+            return outlined
+        self.stats.add_time("outline", time.perf_counter() - start, cpu)
+        self._count_savings("outline", lang, content, outlined)
+        return outlined
+
+    def _count_savings(
+        self, kind: str, lang: str, content: str, reduced: str
+    ) -> None:
+        """Counts the bytes and tokens a content reduction saved.
+
+        Tokens are estimated with the heuristic tokenizer when token
+        counting is disabled.
+
+        Args:
+            kind: The kind of reduction, ``compact`` or ``outline``.
+            lang: The Markdown language identifier of the file.
+            content: The file's full content.
+            reduced: The reduced content.
+        """
+        tokenizer = self.tokenizer or tokens.HeuristicTokenizer()
+        name = lang or "other"
+        self.stats.count(
+            f"{kind}_bytes_saved.{name}",
+            utf8_size(content) - utf8_size(reduced),
+        )
+        self.stats.count(
+            f"{kind}_tokens_saved.{name}",
+            tokenizer.count(content) - tokenizer.count(reduced),
+        )
+
+    def _content_digest(self) -> dedup.Digest | None:
+        """Returns a fresh content hash object if digests are needed.
+
+        Digests are computed for deduplication and for the ``hash`` field
+        of ``jsonl`` records.
+        """
+        if (
+            not self.config.dedup
+            and self.config.near_dup_threshold is None
+            and self.config.output_format != "jsonl"
+        ):
+            return None
+        return dedup.new_digest()
+
+    def _file_size(self, file_path: Path) -> int | None:
+        """Returns the size of a file, or None if it cannot be stat'd."""
+        try:
+            return self._project_fs().stat(file_path).st_size
+        except OSError:
+            return None
+
+    def _render_record(
+        self,
+        file_path: Path,
+        lang: str,
+        content: str,
+        digest: str | None = None,
+        duplicate_of: str | None = None,
+        encoding: str | None = None,
+        outlined: bool = False,
+    ) -> FileSection:
+        """Renders the ``jsonl`` record of a file with content.
+
+        Args:
+            file_path: The relative path of the file.
+            lang: The Markdown language identifier of the content.
+            content: The file content, excerpt, diff or outline.
+            digest: The hex digest of the file's raw content, if any.
+            duplicate_of: The path of the file ``content`` is a diff
+                against, if any.
+            encoding: The name of the file's detected encoding.
+            outlined: Whether ``content`` is the file's outline.
+
+        Returns:
+            The record as a section whose token count is the content's.
+        """
+        content_tokens = None
+        if self.tokenizer is not None:
+            content_tokens = self.tokenizer.count(content)
+        text = jsonl.file_record(
+            file_path,
+            lang,
+            size=self._file_size(file_path),
+            digest=digest,
+            tokens=content_tokens,
+            duplicate_of=duplicate_of,
+            encoding=encoding,
+            outline=outlined,
+            content=content,
+        )
+        return FileSection(text, content_tokens or 0)
+
+    def _render_content(
+        self,
+        file_path: Path,
+        lang: str,
+        content: str,
+        encoding: str | None = None,
+        outlined: bool = False,
+    ) -> FileSection:
+        """Renders a fenced section, counting its tokens if enabled.
+
+        The heading notes the file's encoding unless it is ASCII or
+        UTF-8, e.g. ``(encoding: big5)``, and whether the content is an
+        outline.
+
+        Args:
+            file_path: The relative path of the file.
+            lang: The Markdown language identifier of the fence.
+            content: The fenced content.
+            encoding: The name of the file's detected encoding.
+            outlined: Whether ``content`` is the file's outline.
+
+        Returns:
+            The rendered section.
+        """
+        notes = []
+        if self.tokenizer is not None:
+            content_tokens = self.tokenizer.count(content)
+            notes.append(f"{content_tokens:,} tokens")
+        if encoding not in (None, "ascii", "utf-8"):
+            notes.append(f"encoding: {encoding}")
+        if outlined:
+            notes.append("outline")
+        heading = f"### `{file_path}`"
+        if notes:
+            heading += f" ({', '.join(notes)})"
+        if self.tokenizer is None:
+            return FileSection(f"{heading}\n\n```{lang}\n{content}\n```\n")
+        head = f"{heading}\n\n```{lang}\n"
+        tail = "\n```\n"
+        return FileSection(
+            f"{head}{content}{tail}",
+            content_tokens + self.tokenizer.count(head + tail),
+        )
+
+    def _timed_render_file_section(self, file_path: Path) -> FileSection:
+        """Renders a file section and records its time in the stats."""
+        start = time.perf_counter()
+        cpu = time.thread_time()
+        section = self._render_file_section(file_path)
+        wall = time.perf_counter() - start
+        self.stats.add_time("render_file", wall, time.thread_time() - cpu)
+        self.stats.record_file(file_path.as_posix(), wall, len(section.text))
+        return section
+
+    def _render_warning_section(
+        self,
+        file_path: Path,
+        warning: str,
+        digest: str | None = None,
+        duplicate_of: str | None = None,
+    ) -> FileSection:
+        """Renders the section of a file whose content is not included.
+
+        Args:
+            file_path: The relative path of the file.
+            warning: The reason the content is not included, e.g.
+                ``[SKIP] Binary file``.
+            digest: The hex digest of the file's raw content, if known.
+                Only shown in ``jsonl`` records.
+            duplicate_of: The path of an identical earlier file, if any.
+                Only shown in ``jsonl`` records.
+
+        Returns:
+            The file's rendered section.
+        """
+        if self.config.output_format == "jsonl":
+            _, _, reason = warning.partition("] ")
+            return FileSection(
+                jsonl.file_record(
+                    file_path,
+                    utils.get_markdown_lang(file_path),
+                    size=self._file_size(file_path),
+                    digest=digest,
+                    skipped=reason or warning,
+                    duplicate_of=duplicate_of,
+                )
+            )
+        text = f"### `{file_path}`\n\n```text\n{warning}\n```\n"
+        if self.tokenizer is None:
+            return FileSection(text)
+        return FileSection(text, self.tokenizer.count(text))
+
+    def _iter_file_sections(
+        self, found_files: list[Path]
+    ) -> Iterator[FileSection]:
+        """Renders file sections in order, reading ahead in threads.
+
+        With ``config.jobs`` greater than 1, files are read and decoded by
+        a thread pool while earlier sections are being written. At most
+        ``jobs * _READ_AHEAD_PER_JOB`` sections are in flight at any time,
+        and sections are always yielded in the order of ``found_files``.
+        Sections of unchanged files are served from the cache, if any.
+        Outlines, which are CPU-bound, are parsed by a process pool of
+        ``jobs`` workers if there are at least `_PARALLEL_OUTLINE_MIN`
+        files to outline, see `_outline`.
+
+        Args:
+            found_files: The relative paths of the files to render.
+
+        Yields:
+            The rendered section of each file, in order.
+        """
+        render = self._render_file_section
+        if self.stats is not None:
+            render = self._timed_render_file_section
+
+        jobs = self.config.jobs
+        if jobs <= 1:
+            for file_path in found_files:
+                section, key = self._get_cached_section(file_path)
+                if section is None:
+                    section = render(file_path)
+                    self._put_cached_section(file_path, key, section)
+                yield section
+            return
+
+        window = jobs * _READ_AHEAD_PER_JOB
+        remaining = iter(found_files)
+        pending: collections.deque[
+            tuple[Path, StatKey | None, FileSection | Future[FileSection]]
+        ] = collections.deque()
+        with contextlib.ExitStack() as stack:
+            outline_count = sum(
+                file_path.suffix in self.config.outline_exts
+                for file_path in found_files
+            )
+            if outline_count >= _PARALLEL_OUTLINE_MIN:
+                self._outline_pool = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=jobs)
+                )
+                stack.callback(setattr, self, "_outline_pool", None)
+                # Start the workers before the reader threads: forking a
+                # process with running threads is unsafe.
+                self._outline_pool.submit(int).result()
+            pool = stack.enter_context(
+                ThreadPoolExecutor(
+                    max_workers=jobs,
+                    thread_name_prefix="txt2llm-read",
+                )
+            )
+
+            def submit(file_path: Path) -> None:
+                section, key = self._get_cached_section(file_path)
+                if section is None:
+                    section = pool.submit(render, file_path)
+                pending.append((file_path, key, section))
+
+            try:
+                for file_path in itertools.islice(remaining, window):
+                    submit(file_path)
+                while pending:
+                    file_path, key, section = pending.popleft()
+                    if isinstance(section, Future):
+                        section = section.result()
+                        self._put_cached_section(file_path, key, section)
+                    next_path = next(remaining, None)
+                    if next_path is not None:
+                        submit(next_path)
+                    yield section
+            finally:
+                for _, _, section in pending:
+                    if isinstance(section, Future):
+                        section.cancel()
+
+    def _get_cached_section(
+        self, file_path: Path
+    ) -> tuple[FileSection | None, StatKey | None]:
+        """Looks up the cached section of a file.
+
+        Args:
+            file_path: The relative path of the file.
+
+        Returns:
+            A tuple of the cached section, or None on a cache miss, and
+            the file's current stat key, or None if there is no cache or
+            the file cannot be stat'd.
+        """
+        # Diffs depend on the commit, which the stat key does not cover.
+        if (
+            self.cache is None
+            or self.config.since_diff
+            or not self._project_fs().cacheable
+        ):
+            return None, None
+        try:
+            st = self._project_fs().stat(file_path)
+        except OSError:
+            return None, None
+        key = StatKey.from_stat(st)
+        cached = self.cache.get_section(file_path.as_posix(), key)
+        if self.stats is not None:
+            self.stats.count("files_statted")
+            self.stats.count("cache_hits" if cached else "cache_misses")
+        if cached is None:
+            return None, key
+        return FileSection(*cached), key
+
+    def _put_cached_section(
+        self, file_path: Path, key: StatKey | None, section: FileSection
+    ) -> None:
+        """Stores a freshly rendered section in the cache, if enabled."""
+        if self.cache is not None and key is not None:
+            self.cache.put_section(
+                file_path.as_posix(),
+                key,
+                section.text,
+                section.tokens,
+                section.digest,
+                section.sketch,
+            )
+
+    def _iter_deduplicated_sections(
+        self, found_files: list[Path]
+    ) -> Iterator[FileSection]:
+        """Renders file sections in order, replacing duplicate content.
+
+        With ``config.dedup``, a file whose content is identical to an
+        earlier file is rendered as a reference to that file. With
+        ``config.near_dup_threshold``, a file similar to an earlier file
+        is rendered as a unified diff against it, if the diff is less
+        than half the size of the full section. Replacements that would
+        not be shorter than the section they replace are not made.
+
+        Args:
+            found_files: The relative paths of the files to render.
+
+        Yields:
+            The rendered, possibly replaced, section of each file.
+        """
+        sections = self._iter_file_sections(found_files)
+        if not self.config.dedup and self.config.near_dup_threshold is None:
+            yield from sections
+            return
+        deduplicator = dedup.Deduplicator(self.config.near_dup_threshold)
+        try:
+            for file_path, section in zip(found_files, sections):
+                if section.digest is not None:
+                    section = self._deduplicated(
+                        deduplicator, file_path, section
+                    )
+                yield section
+        finally:
+            sections.close()
+
+    def _deduplicated(
+        self,
+        deduplicator: dedup.Deduplicator,
+        file_path: Path,
+        section: FileSection,
+    ) -> FileSection:
+        """Replaces a section that duplicates an earlier one.
+
+        Args:
+            deduplicator: The index of the files seen so far.
+            file_path: The relative path of the file.
+            section: The file's rendered section.
+
+        Returns:
+            A reference or diff section, or ``section`` itself.
+        """
+        rel_path = file_path.as_posix()
+        original = deduplicator.identical_to(rel_path, section.digest)
+        if original is not None:
+            replacement = self._render_warning_section(
+                file_path,
+                f"[SAME] Identical to `{original}`",
+                section.digest,
+                original,
+            )
+            stat = "duplicates"
+        else:
+            original = deduplicator.similar_to(rel_path, section.sketch)
+            if original is None:
+                return section
+            replacement = self._render_diff_section(
+                file_path, Path(original), len(section.text) // 2
+            )
+            stat = "near_duplicates"
+        if replacement is None or len(replacement.text) >= len(section.text):
+            return section
+        if self.stats is not None:
+            self.stats.count(stat)
+            self.stats.count(
+                "dedup_chars_saved",
+                len(section.text) - len(replacement.text),
+            )
+        return replacement
+
+    def _render_diff_section(
+        self, file_path: Path, original: Path, limit: int
+    ) -> FileSection | None:
+        """Renders a file as a unified diff against a similar file.
+
+        Both files are read, and compacted if enabled, again, so a diff
+        is only computed for the few files found to be near duplicates.
+
+        Args:
+            file_path: The relative path of the file.
+            original: The relative path of the earlier, similar file.
+            limit: The maximum length of the diff, in characters.
+
+        Returns:
+            The diff section, or None if either file can no longer be
+            read, either is shown as an outline, or the diff is longer
+            than ``limit``.
+        """
+        if {file_path.suffix, original.suffix} & self.config.outline_exts:
+            return None
+        old, old_warning, _ = self._read_file_content(original)
+        new, new_warning, encoding = self._read_file_content(file_path)
+        if old_warning or new_warning:
+            return None
+        if self.config.compact:
+            old = compact.compact(old, utils.get_markdown_lang(original))
+            new = compact.compact(new, utils.get_markdown_lang(file_path))
+        diff = "\n".join(
+            difflib.unified_diff(
+                old.splitlines(),
+                new.splitlines(),
+                fromfile=original.as_posix(),
+                tofile=file_path.as_posix(),
+                n=1,
+                lineterm="",
+            )
+        )
+        if len(diff) > limit:
+            return None
+        return self._render_diff(
+            file_path,
+            original.as_posix(),
+            diff,
+            duplicate_of=original.as_posix(),
+            encoding=encoding,
+        )
+
+    def _render_diff(
+        self,
+        file_path: Path,
+        against: str,
+        diff: str,
+        duplicate_of: str | None = None,
+        encoding: str | None = None,
+    ) -> FileSection:
+        """Renders the section of a file shown as a unified diff.
+
+        Args:
+            file_path: The relative path of the file.
+            against: What the diff is against, a path or a commit.
+            diff: The unified diff.
+            duplicate_of: The earlier file the diff is against, if any.
+                Only shown in ``jsonl`` records.
+            encoding: The name of the file's detected encoding, if known.
+
+        Returns:
+            The diff section.
+        """
+        if self.config.output_format == "jsonl":
+            return self._render_record(
+                file_path,
+                "diff",
+                diff,
+                duplicate_of=duplicate_of,
+                encoding=encoding,
+            )
+        text = (
+            f"### `{file_path}` (diff against `{against}`)\n\n"
+            f"```diff\n{diff}\n```\n"
+        )
+        if self.tokenizer is None:
+            return FileSection(text)
+        return FileSection(text, self.tokenizer.count(text))
+
+    def _iter_budgeted_sections(
+        self, found_files: list[Path]
+    ) -> Iterator[tuple[Path, FileSection]]:
+        """Renders file sections in order, applying the token budget.
+
+        Without a token budget this yields every rendered section. With
+        one, the first file whose section would push `total_tokens` over
+        the budget, and every file after it, is listed as omitted without
+        being read. The token count of each yielded section is added to
+        `total_tokens`.
+
+        Args:
+            found_files: The relative paths of the files to render.
+
+        Yields:
+            Tuples of each file's relative path and rendered section.
+        """
+        budget = self.config.max_tokens
+        over_budget = False
+        sections = self._iter_deduplicated_sections(found_files)
+        try:
+            for index, file_path in enumerate(found_files):
+                if not over_budget:
+                    section = next(sections)
+                    if (
+                        budget is not None
+                        and self.total_tokens + section.tokens > budget
+                    ):
+                        logging.info(
+                            f"Token budget of {budget:,} reached; omitting "
+                            f"{len(found_files) - index} files."
+                        )
+                        over_budget = True
+                        sections.close()
+                if over_budget:
+                    section = self._render_warning_section(
+                        file_path, "[SKIP] Token budget exceeded"
+                    )
+                if self.tokenizer is not None:
+                    self.total_tokens += section.tokens
+                yield file_path, section
+        finally:
+            sections.close()
+
+    def _counted(self, chunk: str) -> str:
+        """Adds a chunk to the running token total and returns it."""
+        if self.tokenizer is not None:
+            self.total_tokens += self.tokenizer.count(chunk)
+        return chunk
+
+    def iter_report(self) -> Iterator[str]:
+        """Generates the project overview report section by section.
+
+        Each file is read and rendered only when its section is requested,
+        so at most one file's content is held in memory at a time. The
+        concatenation of all yielded chunks is the complete report.
+
+        When token counting is enabled, `total_tokens` is updated as each
+        chunk is yielded. With a token budget, files beyond it are listed
+        as omitted, see `_iter_budgeted_sections`.
+
+        Yields:
+            Consecutive chunks of the Markdown-formatted report.
+        """
+        for _, chunk in self._iter_report_parts():
+            yield chunk
+
+    def _iter_report_parts(self) -> Iterator[tuple[str | None, str]]:
+        """Generates the report chunks with their index keys.
+
+        Yields:
+            Tuples of an index key and a report chunk, see `iter_report`.
+            The key is the POSIX path of a file section, `TREE_KEY`
+            for the directory tree or summary record, and None for any
+            other chunk.
         """
         logging.info("Starting report generation...")
-        report_parts = []
+        if self.tokenizer is not None:
+            self.total_tokens = 0
+        if self.config.output_format == "jsonl":
+            yield from self._iter_jsonl_report()
+            return
 
         # 1. Add Header
-        report_parts.append(self._build_header())
+        yield None, self._counted(self._build_header() + "\n")
 
         # 2. Add Directory Tree
-        report_parts.append("## Directory Tree")
-        report_parts.append("")
-        report_parts.append("```")
-        report_parts.append(self._generate_tree())
-        report_parts.append("```")
-        report_parts.append("")
+        tree = f"## Directory Tree\n\n```\n{self._generate_tree()}\n```\n"
+        self._counted(tree + "\n")
+        yield TREE_KEY, tree
+        yield None, "\n"
 
         # 3. Add File Contents
-        report_parts.append("## File Contents")
-        report_parts.append("")
+        yield None, self._counted("## File Contents\n\n")
         found_files = self._find_files()
+        self.file_count = len(found_files)
+        included, unchanged, removed = self._partition(found_files)
         if not found_files:
-            report_parts.append("No files found matching the criteria.")
-        else:
-            for file_path in found_files:
-                report_parts.append(f"### `{file_path}`")
-                report_parts.append("")
-                content, warning = self._read_file_content(file_path)
-                if warning:
-                    report_parts.append(f"```text\n{warning}\n```")
-                else:
-                    lang = utils.get_markdown_lang(file_path)
-                    report_parts.append(f"```{lang}")
-                    report_parts.append(content)
-                    report_parts.append("```")
-                report_parts.append("") # Add an extra newline for separation
-
-        final_report = "\n".join(report_parts)
+            yield None, self._counted("No files found matching the criteria.")
+        elif not included:
+            yield None, self._counted(
+                f"No files changed since `{self._change_base()}`.\n"
+            )
+
+        sections = self._iter_budgeted_sections(included)
+        for count, (file_path, section) in enumerate(sections):
+            if count:
+                # Add an extra newline for separation
+                yield None, self._counted("\n")
+            yield file_path.as_posix(), section.text
+
+        listing = self._render_change_listing(unchanged, removed)
+        if listing:
+            yield None, self._counted("\n" + listing)
+
+        if self.total_tokens is not None:
+            logging.info(
+                f"Estimated report size: {self.total_tokens:,} tokens."
+            )
         logging.info("Report generation complete.")
-        return final_report
+
+    def _iter_jsonl_report(self) -> Iterator[tuple[str | None, str]]:
+        """Generates the report in the ``jsonl`` format, record by record.
+
+        See the `jsonl` module for the records. Token counts cover the
+        file contents only, not the JSON framing.
+
+        Yields:
+            Tuples of an index key and one line of JSON per record, see
+            `_iter_report_parts`.
+        """
+        found_files = self._find_files()
+        self.file_count = len(found_files)
+        included, unchanged, removed = self._partition(found_files)
+        records = len(found_files) + len(removed)
+        yield TREE_KEY, jsonl.summary_record(
+            self.config, self._generate_tree(), records
+        )
+        for file_path, section in self._iter_budgeted_sections(included):
+            yield file_path.as_posix(), section.text
+        base = self._change_base()
+        for file_path in unchanged:
+            section = self._render_warning_section(
+                file_path, f"[SAME] Unchanged since `{base}`"
+            )
+            yield file_path.as_posix(), section.text
+        for rel_path in removed:
+            section = self._render_warning_section(
+                Path(rel_path), f"[SKIP] Removed since `{base}`"
+            )
+            yield rel_path, section.text
+        yield None, jsonl.end_record(records, self.total_tokens)
+        logging.info("Report generation complete.")
+
+    def write_report(
+        self, fp: TextIO, section_index: IndexWriter | None = None
+    ) -> None:
+        """Streams the project overview report into a text stream.
+
+        When token counting is enabled and the stream is seekable, the
+        token total in the header is filled in after the last section is
+        written. The filled-in total has the placeholder's length, so it
+        does not move any section. On non-seekable streams, such as pipes
+        and compressed outputs, and on streams in append mode, such as
+        ``sys.stdout`` redirected with ``>>``, it is left as ``pending``
+        and the total is written in a trailer after the last section
+        instead.
+
+        Args:
+            fp: A writable text stream, e.g. an open output file or
+                ``sys.stdout``.
+            section_index: An optional index receiving the UTF-8 byte
+                offset and length of the directory tree and of every file
+                section, relative to the start of the stream.
+        """
+        with self._phase("report"):
+            self._write_report(fp, section_index)
+
+    def _write_report(
+        self, fp: TextIO, section_index: IndexWriter | None = None
+    ) -> None:
+        """Streams the report into a text stream, see `write_report`."""
+        write = fp.write
+        if self.stats is not None:
+            write = self._timed_writer(fp)
+
+        parts = self._iter_report_parts()
+        key, header = next(parts)
+        total_pos = None
+        marker = header.find(_TOKEN_TOTAL_PLACEHOLDER)
+        if marker != -1 and _can_back_patch(fp):
+            write(header[:marker])
+            total_pos = fp.tell()
+            write(header[marker:])
+        else:
+            write(header)
+
+        offset = 0
+        if section_index is not None:
+            offset = utf8_size(header)
+            if key is not None:
+                section_index.add(key, 0, offset)
+        for key, chunk in parts:
+            write(chunk)
+            if section_index is not None:
+                size = utf8_size(chunk)
+                if key is not None:
+                    section_index.add(key, offset, size)
+                offset += size
+
+        if total_pos is not None:
+            fp.seek(total_pos)
+            fp.write(
+                f"`{self.total_tokens:,}`".ljust(len(_TOKEN_TOTAL_PLACEHOLDER))
+            )
+            fp.seek(0, io.SEEK_END)
+        elif marker != -1:
+            write(f"\n---\n\n- Estimated Tokens: `{self.total_tokens:,}`\n")
+
+    def write_indexed_report(self, output_path: Path) -> Path:
+        """Writes the report to a file along with its section index.
+
+        The index is written next to the report, see `index_path`,
+        and lets `txt2llm.index.extract` read single sections back without
+        scanning the report.
+
+        Args:
+            output_path: The uncompressed report file to write.
+
+        Returns:
+            The path of the written index.
+
+        Raises:
+            ValueError: If the output path names a compressed file, whose
+                sections cannot be read by offset.
+        """
+        if compress.codec_for(output_path) is not None:
+            raise ValueError("A section index needs an uncompressed output.")
+        section_index = IndexWriter()
+        with compress.open_text(output_path) as fp:
+            self.write_report(fp, section_index)
+        path = index_path(output_path)
+        section_index.save(path, output_path.stat().st_size)
+        return path
+
+    def _timed_writer(self, fp: TextIO) -> Callable[[str], object]:
+        """Returns a ``write`` function recording into the stats.
+
+        The time spent in ``fp.write`` is charged to the ``write`` phase
+        and the UTF-8 size of every chunk to ``bytes_emitted``.
+        """
+        stats = self.stats
+
+        def write(chunk: str) -> None:
+            start = time.perf_counter()
+            fp.write(chunk)
+            stats.add_time("write", time.perf_counter() - start)
+            stats.count("bytes_emitted", len(chunk.encode("utf-8")))
+
+        return write
+
+    def write_sharded_report(self, writer: ShardWriter) -> list[Path]:
+        """Writes the report as size-limited parts.
+
+        The directory tree and every file section are handed to the
+        writer as separate sections. The writer repeats a compact header
+        and a part-local table of contents in every part, and writes each
+        part as soon as it is full.
+
+        Args:
+            writer: The ShardWriter receiving the sections.
+
+        Returns:
+            The paths of the written parts, in order.
+
+        Raises:
+            ValueError: If the output format is not ``markdown``.
+        """
+        if self.config.output_format != "markdown":
+            raise ValueError("Sharded reports need the markdown format.")
+        with self._phase("report"):
+            parts = self._write_sharded_report(writer)
+        logging.info(f"Report generation complete: {len(parts)} parts.")
+        return parts
+
+    def _write_sharded_report(self, writer: ShardWriter) -> list[Path]:
+        """Writes the report as parts, see `write_sharded_report`."""
+        logging.info("Starting sharded report generation...")
+        if self.tokenizer is not None:
+            self.total_tokens = 0
+
+        writer.add(
+            "Directory Tree",
+            self._counted(
+                f"## Directory Tree\n\n```\n{self._generate_tree()}\n```\n"
+            ),
+        )
+        found_files = self._find_files()
+        self.file_count = len(found_files)
+        included, unchanged, removed = self._partition(found_files)
+        for file_path, section in self._iter_budgeted_sections(included):
+            writer.add(f"`{file_path}`", section.text)
+        for title, listing in self._iter_change_listings(unchanged, removed):
+            writer.add(title, self._counted(listing))
+        return writer.close()
+
+    def generate_report(self) -> str:
+        """Generates the full project overview report.
+
+        This is a convenience wrapper around `write_report` that returns
+        the whole report as a single string. Prefer `write_report` for
+        large projects.
+
+        Returns:
+            A string containing the complete project overview report.
+        """
+        buffer = io.StringIO()
+        self.write_report(buffer)
+        return buffer.getvalue()
+
+
+def _can_back_patch(fp: TextIO) -> bool:
+    """Checks whether text written earlier to a stream can be rewritten.
+
+    The stream must be seekable and not in append mode, where every write
+    goes to the end, as for a file opened with mode ``a`` or a standard
+    stream redirected with ``>>``. The append flag of a file descriptor
+    is only checked where `fcntl` is available.
+    """
+    if not fp.seekable() or "a" in getattr(fp, "mode", ""):
+        return False
+    if fcntl is None:
+        return True
+    try:
+        flags = fcntl.fcntl(fp.fileno(), fcntl.F_GETFL)
+    except (OSError, ValueError):
+        # No file descriptor, e.g. an `io.StringIO`.
+        return True
+    return not flags & os.O_APPEND
+
+
+def _timed_outline(content: str, lang: str) -> tuple[str | None, float]:
+    """Outlines a file's content, see `outline.outline`.
+
+    Returns:
+        The outline, or None, and the CPU time spent in seconds, as
+        measured by the thread or worker process that parsed it.
+    """
+    cpu = time.thread_time()
+    outlined = outline.outline(content, lang)
+    return outlined, time.thread_time() - cpu
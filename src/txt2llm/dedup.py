@@ -0,0 +1,163 @@
+"""Duplicate detection module for the txt2llm project.
+
+This module finds files whose content repeats earlier files of the
+report, such as vendored copies, generated stubs and per-package
+``LICENSE`` files. Exact duplicates are found by a content digest that
+is computed while the file is read. Near duplicates are found by
+comparing bottom-k sketches of the hashed three-line shingles of each
+file, which estimate the Jaccard similarity of two files without
+comparing their contents.
+
+Digests and sketches are plain values stored with each rendered
+section, so cache layers keep them along with the section text.
+"""
+
+import collections
+import hashlib
+import heapq
+import zlib
+from typing import Protocol
+
+# Size of the content digest, in bytes.
+DIGEST_SIZE = 16
+
+# Number of lines hashed together into one shingle.
+SHINGLE_LINES = 3
+
+# Number of smallest shingle hashes kept per file.
+SKETCH_SIZE = 32
+
+# Files with fewer shingles than this are never near duplicates.
+MIN_SKETCH_SIZE = 8
+
+# Number of candidates whose similarity is estimated per file.
+_MAX_CANDIDATES = 4
+
+
+class Digest(Protocol):
+    """A hash object that is fed raw file content, e.g. from hashlib."""
+
+    def update(self, data: bytes, /) -> None:
+        """Adds data to the hash."""
+
+
+def new_digest() -> hashlib.blake2b:
+    """Returns a fresh hash object for a file's content."""
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def sketch(text: str) -> tuple[int, ...]:
+    """Computes the bottom-k sketch of a text.
+
+    Lines are stripped, blank lines dropped, and every run of
+    `SHINGLE_LINES` consecutive lines is hashed with CRC-32, which is
+    stable across processes. The `SKETCH_SIZE` smallest distinct hashes
+    form the sketch.
+
+    Args:
+        text: The file content.
+
+    Returns:
+        The sorted sketch; empty for texts with too few lines.
+    """
+    lines = [line.strip() for line in text.splitlines()]
+    lines = [line for line in lines if line]
+    shingles = {
+        zlib.crc32("\n".join(lines[i:i + SHINGLE_LINES]).encode("utf-8"))
+        for i in range(len(lines) - SHINGLE_LINES + 1)
+    }
+    return tuple(heapq.nsmallest(SKETCH_SIZE, shingles))
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimates the Jaccard similarity of two texts from their sketches.
+
+    Args:
+        a: The sketch of the first text.
+        b: The sketch of the second text.
+
+    Returns:
+        The estimated similarity, from 0.0 to 1.0.
+    """
+    set_a, set_b = set(a), set(b)
+    union = heapq.nsmallest(SKETCH_SIZE, set_a | set_b)
+    if not union:
+        return 0.0
+    shared = sum(1 for value in union if value in set_a and value in set_b)
+    return shared / len(union)
+
+
+class Deduplicator:
+    """Matches files against the files seen earlier in the report.
+
+    Attributes:
+        near_threshold: The minimum estimated similarity for a near
+            duplicate, or None to only detect exact duplicates.
+    """
+
+    def __init__(self, near_threshold: float | None = None):
+        """Initializes an empty deduplicator.
+
+        Args:
+            near_threshold: The minimum estimated similarity for a near
+                duplicate, or None to only detect exact duplicates.
+        """
+        self.near_threshold = near_threshold
+        self._by_digest: dict[str, str] = {}
+        self._paths: list[str] = []
+        self._sketches: list[tuple[int, ...]] = []
+        self._postings: dict[int, list[int]] = collections.defaultdict(list)
+
+    def identical_to(self, rel_path: str, digest: str) -> str | None:
+        """Looks up an earlier file with the same content.
+
+        The file is remembered if its content has not been seen yet.
+
+        Args:
+            rel_path: The POSIX path of the file.
+            digest: The file's content digest.
+
+        Returns:
+            The path of the first file with the same content, or None.
+        """
+        first = self._by_digest.setdefault(digest, rel_path)
+        return None if first == rel_path else first
+
+    def similar_to(
+        self, rel_path: str, file_sketch: tuple[int, ...]
+    ) -> str | None:
+        """Looks up the most similar earlier file.
+
+        The file is remembered as a candidate for later files unless it
+        is itself a near duplicate, so that chains of small edits are
+        always compared against an original.
+
+        Args:
+            rel_path: The POSIX path of the file.
+            file_sketch: The file's sketch, see `sketch`.
+
+        Returns:
+            The path of the most similar earlier file whose estimated
+            similarity reaches `near_threshold`, or None.
+        """
+        if self.near_threshold is None or len(file_sketch) < MIN_SKETCH_SIZE:
+            return None
+        shared = collections.Counter(
+            index
+            for value in file_sketch
+            for index in self._postings.get(value, ())
+        )
+        best, best_score = None, self.near_threshold
+        for index, _ in shared.most_common(_MAX_CANDIDATES):
+            score = similarity(file_sketch, self._sketches[index])
+            if score >= best_score:
+                best, best_score = index, score
+        if best is not None:
+            return self._paths[best]
+
+        index = len(self._paths)
+        self._paths.append(rel_path)
+        self._sketches.append(file_sketch)
+        for value in file_sketch:
+            self._postings[value].append(index)
+        return None
@@ -0,0 +1,268 @@
+"""Text encoding detection module for the txt2llm project.
+
+This module decodes the raw bytes of a file into text and names the
+encoding it used. Almost every source file is ASCII or UTF-8, so the
+bytes are first decoded as strict UTF-8, which runs at the speed of
+CPython's UTF-8 decoder and costs no more than the lossy decode it
+replaces. Only when that fails, or when the file starts with a byte
+order mark or looks like UTF-16, is the encoding detected:
+
+- a UTF-8, UTF-16 or UTF-32 byte order mark selects its codec and is
+  removed from the text;
+- UTF-16 without a byte order mark is recognized by the null bytes of
+  its ASCII characters, which would otherwise mark it as binary;
+- content that is mostly UTF-8 stays UTF-8, with its few invalid bytes
+  replaced;
+- other content is decoded with each of a few common legacy encodings,
+  GB 18030 (a superset of GBK), Big5, Shift JIS and Windows-1252, and
+  the one whose characters are most typical for it wins.
+
+Null bytes in any other file mark it as binary.
+"""
+
+import codecs
+import mmap
+import re
+
+# Number of leading bytes inspected to decide whether a file is binary
+# or UTF-16 without a byte order mark.
+SNIFF_SIZE = 4096
+
+# Number of leading bytes used to guess a legacy encoding.
+_GUESS_SIZE = 64 * 1024
+
+# Byte order marks and their codecs. UTF-32 marks are checked before
+# the UTF-16 marks they start with.
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# How many times more null bytes UTF-16 without a byte order mark has
+# at one parity of offsets than at the other, and the smallest share
+# of its code units that must have one.
+_UTF16_SKEW = 9
+_UTF16_MIN_NULLS = 0.05
+
+# Control characters that do not occur in text.
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0e-\x1f\x7f]")
+
+# The largest share of invalid sequences among the non-ASCII characters
+# of content that is still taken as UTF-8.
+_UTF8_MAX_INVALID = 0.05
+
+# Legacy encodings tried when a file is not UTF-8, in order of
+# preference when they are equally plausible.
+_LEGACY_CODECS = ("gb18030", "big5", "shift_jis", "cp1252")
+
+
+def has_null_byte(buffer: bytes | mmap.mmap) -> bool:
+    """Checks the first block of a buffer for a null byte."""
+    return buffer.find(b"\x00", 0, SNIFF_SIZE) != -1
+
+
+def sniff(data: bytes | mmap.mmap) -> tuple[bool, str | None]:
+    """Checks the start of a file for binary content or a known codec.
+
+    Args:
+        data: The raw content of the file, or its first bytes.
+
+    Returns:
+        A tuple of whether the content is likely binary and the codec
+        selected by a byte order mark or recognized as UTF-16 without
+        one, if any. When neither applies, `decode` detects the codec.
+    """
+    head = data[:4]
+    for bom, codec in _BOMS:
+        if head.startswith(bom):
+            return False, codec
+    if not has_null_byte(data):
+        return False, None
+    codec = _utf16_codec(data[:SNIFF_SIZE])
+    return codec is None, codec
+
+
+def decode(
+    data: bytes | mmap.mmap, codec: str | None = None
+) -> tuple[str, str]:
+    """Decodes the content of a text file, detecting its encoding.
+
+    Args:
+        data: The raw content of the file.
+        codec: The codec returned by `sniff`, if any.
+
+    Returns:
+        A tuple of the text and the name of its encoding, e.g. ``ascii``,
+        ``utf-8``, ``utf-16`` or ``big5``. Bytes invalid in the encoding
+        are decoded as U+FFFD.
+    """
+    if codec is None:
+        try:
+            text = str(data, "utf-8")
+        except UnicodeDecodeError as e:
+            codec = guess_codec(_sample(data, e.start))
+        else:
+            # CPython records whether a string is ASCII, so this is O(1).
+            return text, "ascii" if text.isascii() else "utf-8"
+    return str(data, codec, "replace"), codec
+
+
+def detect(sample: bytes) -> str | None:
+    """Detects the encoding of a file from a sample of its content.
+
+    Args:
+        sample: Bytes from the start of the file, possibly cut in the
+            middle of a character.
+
+    Returns:
+        The codec name, as returned by `decode`, or None if the content
+        is likely binary.
+    """
+    binary, codec = sniff(sample)
+    if binary or codec is not None:
+        return codec
+    try:
+        text = codecs.getincrementaldecoder("utf-8")().decode(sample)
+    except UnicodeDecodeError as e:
+        return guess_codec(_sample(sample, e.start))
+    return "ascii" if text.isascii() else "utf-8"
+
+
+def fixed_width(codec: str | None, head: bytes) -> tuple[str, int] | None:
+    """Describes a UTF-16 or UTF-32 codec, whose newlines are not bytes.
+
+    Args:
+        codec: A codec returned by `sniff`.
+        head: The first bytes of the file, for the byte order mark.
+
+    Returns:
+        A tuple of the codec without byte order mark handling, e.g.
+        ``utf-16-le``, and the size of its code units, or None for codecs
+        in which a newline is a single byte.
+    """
+    if codec is None or not codec.startswith(("utf-16", "utf-32")):
+        return None
+    unit = 2 if codec.startswith("utf-16") else 4
+    if codec in ("utf-16", "utf-32"):
+        little = head[:unit] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF32_LE)
+        codec += "-le" if little else "-be"
+    return codec, unit
+
+
+def _sample(data: bytes | mmap.mmap, error: int) -> bytes:
+    """Returns the bytes around the first invalid UTF-8 sequence.
+
+    The sample starts at a line start, so that it does not start in the
+    middle of a character of a double-byte encoding.
+    """
+    start = max(error - _GUESS_SIZE // 2, 0)
+    if start:
+        start = data.find(b"\n", start, error) + 1 or error
+    return data[start : start + _GUESS_SIZE]
+
+
+def _utf16_codec(sample: bytes) -> str | None:
+    """Recognizes UTF-16 without a byte order mark.
+
+    ASCII characters, which make up most of any source file, have a null
+    high byte in UTF-16, so the null bytes of UTF-16 text are almost all
+    at odd offsets (little-endian) or at even offsets (big-endian). The
+    sample must also decode without errors to text free of control
+    characters, which rules out binary formats with such a pattern,
+    and at least one in twenty code units must be ASCII.
+
+    Args:
+        sample: Bytes from the start of the file.
+
+    Returns:
+        ``utf-16-le`` or ``utf-16-be``, or None if the sample does not
+        look like UTF-16.
+    """
+    even_nulls = sample[0::2].count(0)
+    odd_nulls = sample[1::2].count(0)
+    min_nulls = max(len(sample) // 2 * _UTF16_MIN_NULLS, 2)
+    if odd_nulls >= min_nulls and odd_nulls > _UTF16_SKEW * even_nulls:
+        codec = "utf-16-le"
+    elif even_nulls >= min_nulls and even_nulls > _UTF16_SKEW * odd_nulls:
+        codec = "utf-16-be"
+    else:
+        return None
+    try:
+        text = codecs.getincrementaldecoder(codec)().decode(sample)
+    except UnicodeDecodeError:
+        return None
+    if len(_CONTROL_CHARS.findall(text)) > len(text) // 100:
+        return None
+    return codec
+
+
+def guess_codec(sample: bytes) -> str:
+    """Guesses the encoding of content that is not valid UTF-8.
+
+    Content that is mostly valid UTF-8 with a few invalid bytes is still
+    taken as UTF-8. Otherwise the sample is decoded with each encoding
+    of `_LEGACY_CODECS` that can decode it, and scored by the share of
+    its non-ASCII characters that are typical for that encoding, see
+    `_is_typical`. Most bytes decode as some character in every
+    double-byte encoding, but only the right one yields mostly common
+    characters.
+
+    Args:
+        sample: Bytes of the content, possibly cut in the middle of a
+            character at the end.
+
+    Returns:
+        The best scoring codec, or ``latin-1``, which decodes any bytes,
+        if none of them can decode the sample.
+    """
+    text = str(sample, "utf-8", "replace")
+    others = sum(not char.isascii() for char in text)
+    if text.count("\ufffd") <= others * _UTF8_MAX_INVALID:
+        return "utf-8"
+    best, best_score = "latin-1", -1.0
+    for codec in _LEGACY_CODECS:
+        try:
+            text = codecs.getincrementaldecoder(codec)().decode(sample)
+        except UnicodeDecodeError:
+            continue
+        others = [char for char in text if not char.isascii()]
+        if not others:
+            return codec
+        typical = sum(_is_typical(char, codec) for char in others)
+        if typical / len(others) > best_score:
+            best, best_score = codec, typical / len(others)
+    return best
+
+
+def _is_typical(char: str, codec: str) -> bool:
+    """Tells whether a character is common in text of an encoding.
+
+    Args:
+        char: A non-ASCII character decoded with ``codec``.
+        codec: One of `_LEGACY_CODECS`.
+
+    Returns:
+        Whether the character is in the frequently used part of the
+        encoding: GB 2312 for ``gb18030``, the level 1 characters and
+        symbols for ``big5``, full-width kana and level 1 kanji for
+        ``shift_jis`` and Latin letters and punctuation for ``cp1252``.
+    """
+    point = ord(char)
+    if codec == "gb18030":
+        try:
+            char.encode("gb2312")
+        except UnicodeEncodeError:
+            return False
+        return True
+    if codec == "big5":
+        # Level 1 characters and symbols have lead bytes 0xA1 to 0xC6.
+        return 0xA1 <= char.encode("big5")[0] <= 0xC6
+    if codec == "shift_jis":
+        if 0x3000 <= point <= 0x30FF:
+            return True
+        # Level 1 kanji have lead bytes 0x88 to 0x98.
+        return 0x88 <= char.encode("shift_jis")[0] <= 0x98
+    return char.isalpha() or char in "‘’“”–—"
@@ -0,0 +1,613 @@
+"""Project filesystem module for the txt2llm project.
+
+This module abstracts where the files of a project are read from, so
+that a report can be built from a directory or straight from a tar or
+zip archive without extracting it to disk. Every source implements
+`ProjectFS`, which scans the project into a `walker.TreeNode` model and
+stats and reads files by their path relative to the project root.
+
+Archives are read in a way that suits their format:
+
+- A tar archive, possibly compressed with gzip, bzip2 or xz, has no
+  index and is read in a single sequential pass when it is opened. The
+  raw bytes of the members that may end up in the report, i.e. those
+  with a candidate file name outside ignored directories, and of ignore
+  files are kept in memory; all other members are only listed. Of a
+  member over its size limit, only the head and tail shown in its
+  excerpt are kept.
+- A zip archive has a central directory, so it is listed when opened
+  and its members are decompressed on demand. The archive stays open
+  until the filesystem is closed.
+
+When all members of an archive are below one top-level directory, as in
+most release archives, that directory is the project root.
+"""
+
+import abc
+import dataclasses
+import datetime
+import io
+import logging
+import os
+import posixpath
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Protocol
+
+from . import utils, walker
+from .dedup import Digest
+from .ignore import IgnoreMatcher
+from .stats import Stats
+
+# Size of the blocks in which the skipped middle of a large tar member
+# is read past.
+_TAR_CHUNK_SIZE = 1024 * 1024
+
+# Bytes kept before the tail of a large tar member, as
+# `utils.read_stream_excerpt` reads one extra code unit of up to four
+# bytes there.
+_TAIL_SLACK = 4
+
+# File name suffixes of the supported archives, by archive type.
+TAR_SUFFIXES = (
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+ZIP_SUFFIXES = (".zip",)
+
+
+@dataclasses.dataclass(frozen=True)
+class MemberStat:
+    """The ``stat`` fields of an archive member used by the builder.
+
+    Attributes:
+        st_size: The uncompressed size in bytes.
+        st_mtime_ns: The modification time in nanoseconds.
+    """
+    st_size: int
+    st_mtime_ns: int
+
+
+@dataclasses.dataclass(frozen=True)
+class _MemberEnds:
+    """The kept head and tail of a tar member over its size limit.
+
+    Attributes:
+        head: The first bytes of the member.
+        tail: The last bytes of the member.
+        size: The size of the whole member.
+    """
+    head: bytes
+    tail: bytes
+    size: int
+
+
+class _MemberEndsReader:
+    """A seekable binary stream over the kept ends of a tar member.
+
+    Reads must stay within the head or the tail, or span both where
+    they meet; the skipped middle of the member cannot be read.
+    """
+
+    def __init__(self, ends: _MemberEnds):
+        """Initializes the stream at the start of the member."""
+        self._ends = ends
+        self._pos = 0
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        """Moves to an absolute position, or one relative to the end."""
+        base = self._ends.size if whence == io.SEEK_END else 0
+        self._pos = base + pos
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        """Reads up to ``size`` bytes, or up to the end of the member.
+
+        Raises:
+            OSError: If the read covers part of the skipped middle.
+        """
+        head, tail, total = self._ends.head, self._ends.tail, self._ends.size
+        end = total if size < 0 else min(self._pos + size, total)
+        data = head[self._pos : end]
+        pos = max(self._pos, min(end, len(head)))
+        tail_start = total - len(tail)
+        if pos < end:
+            if pos < tail_start:
+                raise OSError("Read beyond the kept ends of an archive member")
+            data += tail[pos - tail_start : end - tail_start]
+        self._pos = end
+        return data
+
+
+class ProjectFS(Protocol):
+    """Reads the files of a project by their relative path.
+
+    Attributes:
+        name: The name of the project root, shown as the tree root.
+        cacheable: Whether rendered sections and layouts may be cached
+            by ``stat`` results, which only identify a file version on
+            disk.
+    """
+
+    name: str
+    cacheable: bool
+
+    def scan(
+        self,
+        ignored_names: set[str],
+        matcher: IgnoreMatcher | None = None,
+        stats: Stats | None = None,
+    ) -> walker.TreeNode:
+        """Scans the project into a tree model.
+
+        Args:
+            ignored_names: Entry names to skip at any depth.
+            matcher: If given, the ignore files found in each directory
+                are loaded and applied to its entries.
+            stats: Optional run statistics.
+
+        Returns:
+            The root node of the tree.
+        """
+
+    def stat(self, rel_path: Path) -> os.stat_result | MemberStat:
+        """Returns the size and modification time of a file.
+
+        Raises:
+            OSError: If the file does not exist or cannot be stat'd.
+        """
+
+    def read_text(
+        self,
+        rel_path: Path,
+        stats: Stats | None = None,
+        digest: Digest | None = None,
+    ) -> tuple[str, str] | None:
+        """Reads a text file, see `utils.read_text_file`.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+
+    def read_excerpt(
+        self,
+        rel_path: Path,
+        max_bytes: int,
+        max_lines: int,
+        stats: Stats | None = None,
+    ) -> tuple[str, str, int, str] | None:
+        """Reads the head and tail of a file, see `utils.read_text_excerpt`.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+
+    def read_ignore_file(self, rel_path: str) -> str:
+        """Reads an ignore file, given by its relative POSIX path.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+
+    def close(self) -> None:
+        """Releases the resources held, e.g. an open archive."""
+
+
+class DirectoryFS:
+    """Reads a project from a directory on disk.
+
+    Attributes:
+        root: The project root directory.
+        name: The name of the project root.
+        cacheable: Always True.
+    """
+
+    cacheable = True
+
+    def __init__(self, root: Path):
+        """Initializes the filesystem.
+
+        Args:
+            root: The project root directory.
+        """
+        self.root = root
+        self.name = root.name
+
+    def scan(
+        self,
+        ignored_names: set[str],
+        matcher: IgnoreMatcher | None = None,
+        stats: Stats | None = None,
+    ) -> walker.TreeNode:
+        """Walks the directory, see `walker.scan_tree`."""
+        return walker.scan_tree(
+            self.root, ignored_names, matcher=matcher, stats=stats
+        )
+
+    def stat(self, rel_path: Path) -> os.stat_result:
+        """Returns the ``os.stat`` result of a file."""
+        return os.stat(self.root / rel_path)
+
+    def read_text(
+        self,
+        rel_path: Path,
+        stats: Stats | None = None,
+        digest: Digest | None = None,
+    ) -> tuple[str, str] | None:
+        """Reads a text file, see `utils.read_text_file`."""
+        return utils.read_text_file(self.root / rel_path, stats, digest)
+
+    def read_excerpt(
+        self,
+        rel_path: Path,
+        max_bytes: int,
+        max_lines: int,
+        stats: Stats | None = None,
+    ) -> tuple[str, str, int, str] | None:
+        """Reads the head and tail of a file, see `utils.read_text_excerpt`."""
+        return utils.read_text_excerpt(
+            self.root / rel_path, max_bytes, max_lines, stats
+        )
+
+    def read_ignore_file(self, rel_path: str) -> str:
+        """Reads an ignore file, replacing invalid UTF-8."""
+        return (self.root / rel_path).read_text(
+            encoding="utf-8", errors="replace"
+        )
+
+    def close(self) -> None:
+        """Does nothing: no resources are held."""
+
+
+class _ArchiveFS(abc.ABC):
+    """The parts of `TarFS` and `ZipFS` that do not depend on the format.
+
+    Subclasses list their members in ``_members`` and implement the
+    abstract `_read_member`.
+
+    Attributes:
+        name: The name of the project root: the single top-level
+            directory of the archive, if any, else the archive's file
+            name without its suffix.
+        cacheable: Always False.
+    """
+
+    cacheable = False
+
+    def __init__(self, path: Path):
+        """Initializes the filesystem.
+
+        Args:
+            path: The archive file.
+        """
+        self.path = path
+        self.name = _strip_archive_suffix(path.name)
+        # Member stats and the member names they were read from, by POSIX
+        # path relative to the project root.
+        self._members: dict[str, MemberStat] = {}
+        self._names: dict[str, str] = {}
+        self._prefix = ""
+
+    def _add_member(self, name: str, stat: MemberStat) -> str | None:
+        """Records a regular file member.
+
+        Args:
+            name: The member name in the archive.
+            stat: The member's size and modification time.
+
+        Returns:
+            The normalized member path, or None if the name points
+            outside the archive root and the member is skipped.
+        """
+        rel_path = _normalize(name)
+        if rel_path is None:
+            logging.warning(f"Skipping archive member {name!r}.")
+            return None
+        self._members[rel_path] = stat
+        self._names[rel_path] = name
+        return rel_path
+
+    def _strip_prefix(self) -> None:
+        """Makes a single top-level directory the project root."""
+        tops = {rel_path.split("/", 1)[0] for rel_path in self._members}
+        if len(tops) != 1 or any("/" not in p for p in self._members):
+            return
+        self.name = tops.pop()
+        self._prefix = self.name + "/"
+        start = len(self._prefix)
+        self._members = {p[start:]: st for p, st in self._members.items()}
+        self._names = {p[start:]: n for p, n in self._names.items()}
+
+    def scan(
+        self,
+        ignored_names: set[str],
+        matcher: IgnoreMatcher | None = None,
+        stats: Stats | None = None,
+    ) -> walker.TreeNode:
+        """Builds the tree model of the members, see `walker.build_tree`.
+
+        Directories without files are not listed.
+        """
+        if stats is not None:
+            stats.count("archive_members", len(self._members))
+        return walker.build_tree(
+            self.name, list(self._members), ignored_names, matcher
+        )
+
+    def stat(self, rel_path: Path) -> MemberStat:
+        """Returns the size and modification time of a member."""
+        try:
+            return self._members[rel_path.as_posix()]
+        except KeyError:
+            raise FileNotFoundError(
+                f"No member {rel_path.as_posix()!r} in {self.path}"
+            ) from None
+
+    def read_text(
+        self,
+        rel_path: Path,
+        stats: Stats | None = None,
+        digest: Digest | None = None,
+    ) -> tuple[str, str] | None:
+        """Decodes a member, see `utils.decode_text`."""
+        return utils.decode_text(self._read(rel_path, stats), stats, digest)
+
+    def read_excerpt(
+        self,
+        rel_path: Path,
+        max_bytes: int,
+        max_lines: int,
+        stats: Stats | None = None,
+    ) -> tuple[str, str, int, str] | None:
+        """Reads the head and tail of a member.
+
+        See `utils.read_stream_excerpt`.
+        """
+        data = self._read(rel_path, stats, whole=False)
+        if isinstance(data, _MemberEnds):
+            stream, size = _MemberEndsReader(data), data.size
+        else:
+            stream, size = io.BytesIO(data), len(data)
+        return utils.read_stream_excerpt(
+            stream, size, max_bytes, max_lines, stats
+        )
+
+    def read_ignore_file(self, rel_path: str) -> str:
+        """Reads an ignore file, replacing invalid UTF-8."""
+        return self._read(Path(rel_path)).decode("utf-8", "replace")
+
+    def close(self) -> None:
+        """Does nothing: no resources are held."""
+
+    def _read(
+        self,
+        rel_path: Path,
+        stats: Stats | None = None,
+        whole: bool = True,
+    ) -> bytes | _MemberEnds:
+        """Returns the raw content of a member.
+
+        Args:
+            rel_path: The relative path of the member.
+            stats: Optional run statistics counting the member opened.
+            whole: Whether the whole content is needed. Otherwise, the
+                kept ends of a large tar member may be returned.
+
+        Raises:
+            OSError: If there is no such member or it cannot be read,
+                or only its ends were kept and ``whole`` is set.
+        """
+        self.stat(rel_path)
+        if stats is not None:
+            stats.count("files_opened")
+        data = self._read_member(self._names[rel_path.as_posix()])
+        if whole and isinstance(data, _MemberEnds):
+            raise OSError(
+                f"Only the ends of member {rel_path.as_posix()!r} were kept"
+            )
+        return data
+
+    @abc.abstractmethod
+    def _read_member(self, name: str) -> bytes | _MemberEnds:
+        """Returns the raw content of a member, given by its name."""
+
+
+class TarFS(_ArchiveFS):
+    """Reads a project from a tar archive in one sequential pass.
+
+    The archive is read when the filesystem is created. The content of
+    members accepted by ``keep`` is held in memory, so the whole report
+    is built without reading the archive again. Of members over their
+    size limit, only the ends that their excerpt may show are held.
+
+    Attributes:
+        path: The archive file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        keep: Callable[[str], bool],
+        size_limit: Callable[[str], int | None] = lambda rel_path: None,
+        stats: Stats | None = None,
+    ):
+        """Reads the archive.
+
+        Args:
+            path: The archive file, possibly compressed.
+            keep: Tells whether a member, given by its normalized path
+                including any top-level directory, may be read later.
+            size_limit: Returns the size limit of a kept member, given
+                like for ``keep``, or None if it has none. A member over
+                its limit is only read as an excerpt, see
+                `utils.read_stream_excerpt`, so only its ends are kept.
+            stats: Optional run statistics counting the bytes kept.
+
+        Raises:
+            OSError: If the archive cannot be read.
+            tarfile.TarError: If the file is not a valid tar archive.
+        """
+        super().__init__(path)
+        self._data: dict[str, bytes | _MemberEnds] = {}
+        # The "r|*" mode streams the archive and detects compression.
+        with tarfile.open(path, "r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                rel_path = self._add_member(
+                    member.name,
+                    MemberStat(member.size, int(member.mtime) * 10**9),
+                )
+                if rel_path is None or not keep(rel_path):
+                    continue
+                # Members must be read before the stream moves on.
+                stream = archive.extractfile(member)
+                limit = size_limit(rel_path)
+                if limit is None or member.size <= limit:
+                    data = stream.read()
+                    kept = len(data)
+                else:
+                    data = _read_ends(stream, member.size, limit)
+                    kept = len(data.head) + len(data.tail)
+                self._data[member.name] = data
+                if stats is not None:
+                    stats.count("archive_bytes_kept", kept)
+        self._strip_prefix()
+
+    def _read_member(self, name: str) -> bytes | _MemberEnds:
+        """Returns the kept content, or kept ends, of a member."""
+        try:
+            return self._data[name]
+        except KeyError:
+            raise OSError(f"Member {name!r} was not kept in memory") from None
+
+
+class ZipFS(_ArchiveFS):
+    """Reads a project from a zip archive, decompressing members on demand.
+
+    Attributes:
+        path: The archive file.
+    """
+
+    def __init__(self, path: Path):
+        """Lists the archive.
+
+        Args:
+            path: The archive file.
+
+        Raises:
+            OSError: If the archive cannot be read.
+            zipfile.BadZipFile: If the file is not a valid zip archive.
+        """
+        super().__init__(path)
+        self._archive = zipfile.ZipFile(path)
+        for info in self._archive.infolist():
+            if info.is_dir():
+                continue
+            mtime = datetime.datetime(*info.date_time).timestamp()
+            self._add_member(
+                info.filename, MemberStat(info.file_size, int(mtime) * 10**9)
+            )
+        self._strip_prefix()
+
+    def close(self) -> None:
+        """Closes the archive."""
+        self._archive.close()
+
+    def _read_member(self, name: str) -> bytes:
+        """Decompresses a member."""
+        try:
+            return self._archive.read(name)
+        except (zipfile.BadZipFile, RuntimeError) as e:
+            # RuntimeError is raised for encrypted members.
+            raise OSError(str(e)) from None
+
+
+def _read_ends(stream: BinaryIO, size: int, limit: int) -> _MemberEnds:
+    """Reads the ends of a member that its excerpt may show.
+
+    The excerpt of a member over its limit shows lines from at most
+    ``limit // 2`` bytes at each end, see `utils.read_stream_excerpt`.
+    The middle is read past in blocks and dropped.
+
+    Args:
+        stream: The member's content stream, at its start.
+        size: The size of the member.
+        limit: The member's size limit.
+
+    Returns:
+        The kept ends of the member.
+    """
+    window = max(limit // 2, 1)
+    head = stream.read(window)
+    keep = window + _TAIL_SLACK
+    tail = b""
+    while chunk := stream.read(_TAR_CHUNK_SIZE):
+        tail = (tail + chunk)[-keep:]
+    return _MemberEnds(head, tail, size)
+
+
+def is_archive(path: Path) -> bool:
+    """Checks whether a path names a supported archive by its suffix."""
+    return path.name.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def open_project(
+    root: Path,
+    keep: Callable[[str], bool] = lambda rel_path: True,
+    size_limit: Callable[[str], int | None] = lambda rel_path: None,
+    stats: Stats | None = None,
+) -> ProjectFS:
+    """Opens a project directory or archive.
+
+    Args:
+        root: The project directory or archive file.
+        keep: For tar archives, tells whether a member, given by its
+            normalized path, may be read later, see `TarFS`.
+        size_limit: For tar archives, returns the size limit of a
+            member, given by its normalized path, see `TarFS`.
+        stats: Optional run statistics.
+
+    Returns:
+        The filesystem of the project.
+
+    Raises:
+        OSError: If an archive cannot be read.
+        ValueError: If an archive is invalid.
+    """
+    if not is_archive(root) or root.is_dir():
+        return DirectoryFS(root)
+    logging.info(f"Reading archive {root}...")
+    try:
+        if root.name.lower().endswith(ZIP_SUFFIXES):
+            return ZipFS(root)
+        return TarFS(root, keep, size_limit, stats)
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        raise ValueError(f"'{root}' is not a valid archive: {e}") from None
+
+
+def _strip_archive_suffix(name: str) -> str:
+    """Returns an archive's file name without its archive suffix."""
+    lower = name.lower()
+    for suffix in TAR_SUFFIXES + ZIP_SUFFIXES:
+        if lower.endswith(suffix) and len(name) > len(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _normalize(name: str) -> str | None:
+    """Normalizes a member name into a relative POSIX path.
+
+    Returns:
+        The path, or None if it is empty or points outside the archive.
+    """
+    rel_path = posixpath.normpath(name.replace("\\", "/").lstrip("/"))
+    if rel_path == "." or rel_path == ".." or rel_path.startswith("../"):
+        return None
+    return rel_path
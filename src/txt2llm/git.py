@@ -0,0 +1,153 @@
+"""Git integration module for the txt2llm project.
+
+This module wraps the few git plumbing commands txt2llm needs, such as
+listing the files of a work tree from the index with a single
+``git ls-files`` call instead of walking the filesystem, and listing
+the files changed since a commit for changed-only reports.
+
+Raises:
+    GitError: When git is unavailable or the path is not in a work tree.
+"""
+
+import logging
+import subprocess
+from pathlib import Path
+
+
+class GitError(RuntimeError):
+    """Raised when a git command cannot be run or fails."""
+
+
+def run_git(cwd: Path, *args: str) -> bytes:
+    """Runs a git command and returns its standard output.
+
+    Args:
+        cwd: The directory to run git in.
+        *args: The git arguments, e.g. ``"ls-files", "-z"``.
+
+    Returns:
+        The raw standard output of the command.
+
+    Raises:
+        GitError: If git is not installed or the command fails.
+    """
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+        )
+    except FileNotFoundError as e:
+        raise GitError("git is not installed or not on PATH") from e
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode("utf-8", "replace").strip()
+        raise GitError(f"git {args[0]} failed in {cwd}: {message}") from e
+    return result.stdout
+
+
+def ls_files(root: Path, untracked: bool = False) -> list[str]:
+    """Lists the files of a git work tree below a directory.
+
+    Files are read from the index with a ``git ls-files -z`` call, so
+    no part of the work tree is walked. Tracked files deleted from the
+    work tree are left out; a second call lists them.
+
+    Args:
+        root: A directory inside a git work tree.
+        untracked: Whether to also list untracked files that are not
+            excluded by ``.gitignore`` and the other git exclude files.
+
+    Returns:
+        The POSIX paths of the files relative to ``root``, in git's
+        order and without duplicates.
+
+    Raises:
+        GitError: If ``root`` is not inside a git work tree.
+    """
+    args = ["ls-files", "-z", "--cached"]
+    if untracked:
+        args += ["--others", "--exclude-standard"]
+    output = run_git(root, *args)
+    paths = [
+        path.decode("utf-8", "surrogateescape")
+        for path in output.split(b"\0")
+        if path
+    ]
+    # Unmerged files are listed once per conflict stage.
+    paths = list(dict.fromkeys(paths))
+    deleted = {
+        path.decode("utf-8", "surrogateescape")
+        for path in run_git(root, "ls-files", "-z", "--deleted").split(b"\0")
+        if path
+    }
+    if deleted:
+        paths = [path for path in paths if path not in deleted]
+    logging.info(f"git ls-files listed {len(paths)} files.")
+    return paths
+
+
+def changed_files(root: Path, ref: str) -> tuple[list[str], list[str]]:
+    """Lists the files of a work tree that differ from a commit.
+
+    The work tree is compared with ``ref`` by a single ``git diff
+    --name-status`` call, which only reads files whose index entries
+    are stale, and untracked files are listed by ``git ls-files``. Both
+    scale with the size of the change, not of the repository.
+
+    Args:
+        root: A directory inside a git work tree.
+        ref: The commit to compare with, e.g. ``HEAD~3`` or ``main``.
+
+    Returns:
+        A tuple of the changed files, including untracked files that are
+        not excluded by git, and the deleted files, as POSIX paths
+        relative to ``root``.
+
+    Raises:
+        GitError: If ``root`` is not inside a git work tree or ``ref``
+            does not name a commit.
+    """
+    args = ["diff", "--name-status", "-z", "--no-renames", "--relative"]
+    output = run_git(root, *args, "--end-of-options", ref, "--")
+    fields = output.split(b"\0")
+    changed, deleted = [], []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        path = path.decode("utf-8", "surrogateescape")
+        (deleted if status == b"D" else changed).append(path)
+    output = run_git(root, "ls-files", "-z", "--others", "--exclude-standard")
+    changed += [
+        path.decode("utf-8", "surrogateescape")
+        for path in output.split(b"\0")
+        if path
+    ]
+    logging.info(
+        f"git diff found {len(changed)} changed and {len(deleted)} deleted "
+        f"files since {ref}."
+    )
+    return changed, deleted
+
+
+def diff(root: Path, ref: str, path: str) -> str:
+    """Returns the unified diff of one file against a commit.
+
+    Args:
+        root: A directory inside a git work tree.
+        ref: The commit to compare with.
+        path: The POSIX path of the file, relative to ``root``.
+
+    Returns:
+        The diff from its ``---`` line on, without git's ``diff --git``
+        and ``index`` lines, or an empty string if git shows no content
+        changes, e.g. for an untracked file or a mode change.
+
+    Raises:
+        GitError: If the diff cannot be computed.
+    """
+    args = ["diff", "--no-color", "--no-ext-diff", "--relative"]
+    output = run_git(root, *args, "--end-of-options", ref, "--", path)
+    output = output.decode("utf-8", "replace")
+    start = output.find("\n--- ")
+    if start == -1:
+        return ""
+    return output[start + 1 :].rstrip("\n")
@@ -0,0 +1,401 @@
+"""Ignore pattern module for the txt2llm project.
+
+This module implements ``.gitignore``-style exclusion rules. The ignore
+files found in each directory (``.gitignore`` and ``.txt2llmignore`` by
+default) are compiled into a `RuleSet` whose patterns are combined into
+as few regular expressions as possible, so that checking a path costs
+one or two ``re.match`` calls per directory level instead of one
+``fnmatch`` call per pattern.
+
+The supported syntax follows gitignore: ``#`` comments, ``!`` negation,
+a trailing ``/`` for directory-only rules, a leading or middle ``/`` to
+anchor a pattern to the ignore file's directory, and the ``*``, ``?``,
+``[...]`` and ``**`` wildcards. Rules in deeper directories take
+precedence over rules in their parents, and later rules over earlier
+ones.
+
+Example:
+    matcher = IgnoreMatcher(Path("project"), extra_patterns=["*.min.js"])
+    level = matcher.root_level({"static", ".gitignore"})
+    level.is_ignored("static/app.min.js", is_dir=False)
+"""
+
+import dataclasses
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+@dataclasses.dataclass(frozen=True)
+class Rule:
+    """A single parsed ignore pattern.
+
+    Attributes:
+        pattern: The pattern as written, for diagnostics.
+        regex: The regular expression source of the pattern.
+        negated: Whether the rule re-includes matching paths.
+        dir_only: Whether the rule only matches directories.
+        anchored: Whether the regex matches the whole relative path
+            rather than only the last path component.
+    """
+    pattern: str
+    regex: str
+    negated: bool
+    dir_only: bool
+    anchored: bool
+
+
+def _translate_glob(glob: str) -> str:
+    """Translates a gitignore glob body into a regular expression.
+
+    Args:
+        glob: The pattern without negation, anchoring or trailing slash.
+
+    Returns:
+        A regular expression source matching the pattern.
+    """
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i):
+                at_start = i == 0 or glob[i - 1] == "/"
+                if at_start and glob.startswith("**/", i):
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if at_start and i + 2 == n:
+                    out.append(".*")
+                    i += 2
+                    continue
+            out.append("[^/]*")
+            while i < n and glob[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            # A "]" right after the opening bracket is a literal member.
+            start = i + 2 if glob[i + 1:i + 2] in ("!", "^") else i + 1
+            end = glob.find("]", start + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                body = body.replace("[", "\\[")
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def escape(rel_path: str) -> str:
+    """Returns a pattern that matches exactly one relative path.
+
+    Args:
+        rel_path: A POSIX path relative to the ignore file's directory.
+
+    Returns:
+        An anchored pattern with all wildcard characters escaped.
+    """
+    return "/" + re.sub(r"([\\*?\[])", r"\\\1", rel_path)
+
+
+def parse_pattern(line: str) -> Rule | None:
+    """Parses one line of an ignore file.
+
+    Args:
+        line: The raw line, without its line terminator.
+
+    Returns:
+        The parsed rule, or None for blank lines and comments.
+    """
+    if not line or line.startswith("#"):
+        return None
+    # Trailing spaces are ignored unless escaped with a backslash.
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    if not stripped:
+        return None
+
+    negated = stripped.startswith("!")
+    body = stripped[1:] if negated else stripped
+    if body.startswith(("\\!", "\\#")):
+        body = body[1:]
+    dir_only = body.endswith("/")
+    body = body.rstrip("/")
+    if not body:
+        return None
+
+    anchored = "/" in body
+    body = body.lstrip("/")
+    return Rule(
+        pattern=line,
+        regex=_translate_glob(body),
+        negated=negated,
+        dir_only=dir_only,
+        anchored=anchored,
+    )
+
+
+def _combine(rules: list[Rule]) -> re.Pattern | None:
+    """Compiles rules into a single alternation matching a whole string."""
+    if not rules:
+        return None
+    return re.compile("|".join(f"(?:{r.regex})" for r in rules) + r"\Z")
+
+
+@dataclasses.dataclass(frozen=True)
+class _Run:
+    """A compiled run of consecutive rules of the same polarity.
+
+    Unanchored rules only ever match the last path component, so they
+    are compiled separately and matched against the name alone, which
+    keeps the combined expressions free of leading ``.*`` backtracking.
+
+    Attributes:
+        negated: Whether the rules re-include matching paths.
+        file_names: Unanchored rules that apply to files.
+        file_paths: Anchored rules that apply to files.
+        dir_names: Unanchored rules that apply to directories.
+        dir_paths: Anchored rules that apply to directories.
+    """
+    negated: bool
+    file_names: re.Pattern | None
+    file_paths: re.Pattern | None
+    dir_names: re.Pattern | None
+    dir_paths: re.Pattern | None
+
+    @classmethod
+    def compile(cls, rules: list[Rule]) -> "_Run":
+        """Compiles rules that all share the same polarity."""
+        names = [r for r in rules if not r.anchored]
+        paths = [r for r in rules if r.anchored]
+        return cls(
+            negated=rules[0].negated,
+            file_names=_combine([r for r in names if not r.dir_only]),
+            file_paths=_combine([r for r in paths if not r.dir_only]),
+            dir_names=_combine(names),
+            dir_paths=_combine(paths),
+        )
+
+    def matches(self, rel_path: str, name: str, is_dir: bool) -> bool:
+        """Checks whether any rule of the run matches a path."""
+        if is_dir:
+            names, paths = self.dir_names, self.dir_paths
+        else:
+            names, paths = self.file_names, self.file_paths
+        return bool(
+            (names is not None and names.match(name))
+            or (paths is not None and paths.match(rel_path))
+        )
+
+
+class RuleSet:
+    """The compiled rules of one directory's ignore files.
+
+    Consecutive rules of the same polarity are combined into a few
+    regular expressions, split by whether they apply to files or
+    directories and whether they match names or whole paths. Because
+    later rules override earlier ones, the runs are checked from last to
+    first and the first run that matches decides.
+
+    Attributes:
+        base: The POSIX path of the directory, relative to the project
+            root (``""`` for the root itself).
+        rules: The parsed rules, in file order.
+    """
+
+    def __init__(self, base: str, rules: list[Rule]):
+        """Compiles the rules of a directory.
+
+        Args:
+            base: The directory's relative POSIX path.
+            rules: The parsed rules, in file order.
+        """
+        self.base = base
+        self.rules = rules
+        self._runs: list[_Run] = []
+        run: list[Rule] = []
+        for rule in rules:
+            if run and run[-1].negated != rule.negated:
+                self._runs.append(_Run.compile(run))
+                run = []
+            run.append(rule)
+        if run:
+            self._runs.append(_Run.compile(run))
+        self._runs.reverse()
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """Matches a path against the rules of this directory.
+
+        Args:
+            rel_path: The path relative to this directory.
+            is_dir: Whether the path is a directory.
+
+        Returns:
+            True if the path is ignored, False if it is explicitly
+            re-included by a negated rule, or None if no rule matches.
+        """
+        name = rel_path.rpartition("/")[2]
+        for run in self._runs:
+            if run.matches(rel_path, name, is_dir):
+                return not run.negated
+        return None
+
+
+class IgnoreLevel:
+    """The ignore rules in effect inside one directory.
+
+    A level chains the `RuleSet` of its directory, if any, to the level
+    of its parent directory.
+
+    Attributes:
+        rel_dir: The directory's POSIX path relative to the project root.
+    """
+
+    def __init__(
+        self,
+        rel_dir: str,
+        rule_sets: tuple[RuleSet, ...],
+    ):
+        """Initializes the level.
+
+        Args:
+            rel_dir: The directory's relative POSIX path.
+            rule_sets: The rule sets in effect, from the deepest
+                directory to the root.
+        """
+        self.rel_dir = rel_dir
+        self._rule_sets = rule_sets
+
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Checks whether a path below this directory is ignored.
+
+        Args:
+            rel_path: The POSIX path relative to the project root.
+            is_dir: Whether the path is a directory.
+
+        Returns:
+            True if the path is excluded.
+        """
+        for rule_set in self._rule_sets:
+            base = rule_set.base
+            local = rel_path[len(base) + 1:] if base else rel_path
+            result = rule_set.match(local, is_dir)
+            if result is not None:
+                return result
+        return False
+
+
+class IgnoreMatcher:
+    """Loads and compiles ignore files while a project is walked.
+
+    Attributes:
+        project_root: The project root directory.
+        ignore_files: The names of the ignore files read in every
+            directory, in increasing order of precedence.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        ignore_files: Iterable[str] = (".gitignore", ".txt2llmignore"),
+        extra_patterns: Iterable[str] = (),
+        read_text: Callable[[str], str] | None = None,
+    ):
+        """Initializes the matcher.
+
+        Args:
+            project_root: The project root directory.
+            ignore_files: The names of the ignore files to read.
+            extra_patterns: Additional patterns applied at the project
+                root with the highest precedence there.
+            read_text: An optional function reading an ignore file given
+                by its relative POSIX path, e.g. from an archive. By
+                default, the file is read below ``project_root``.
+        """
+        self.project_root = project_root
+        self.ignore_files = tuple(ignore_files)
+        self._read_text = read_text
+        self._extra_rules = [
+            rule for rule in map(parse_pattern, extra_patterns) if rule
+        ]
+
+    def _load_rules(self, rel_dir: str, names: set[str]) -> list[Rule]:
+        """Reads the ignore files present in a directory."""
+        rules = []
+        for file_name in self.ignore_files:
+            if file_name not in names:
+                continue
+            path = self.project_root / rel_dir / file_name
+            try:
+                if self._read_text is None:
+                    text = path.read_text(encoding="utf-8", errors="replace")
+                else:
+                    text = self._read_text(Path(rel_dir, file_name).as_posix())
+            except OSError as e:
+                logging.warning(f"Could not read ignore file {path}: {e}")
+                continue
+            lines = text.splitlines()
+            rules.extend(rule for rule in map(parse_pattern, lines) if rule)
+        return rules
+
+    def ignore_file_paths(self, rel_dir: str, names: set[str]) -> list[str]:
+        """Returns the relative paths of the ignore files in a directory.
+
+        Args:
+            rel_dir: The directory's relative POSIX path.
+            names: The names of the directory's entries.
+
+        Returns:
+            The relative POSIX paths of the ignore files present.
+        """
+        return [
+            f"{rel_dir}/{name}" if rel_dir else name
+            for name in self.ignore_files
+            if name in names
+        ]
+
+    def root_level(self, names: set[str]) -> IgnoreLevel:
+        """Returns the level of the project root.
+
+        Args:
+            names: The names of the root directory's entries.
+
+        Returns:
+            The ignore level in effect at the project root.
+        """
+        rules = self._load_rules("", names) + self._extra_rules
+        rule_sets = (RuleSet("", rules),) if rules else ()
+        return IgnoreLevel("", rule_sets)
+
+    def child_level(
+        self, parent: IgnoreLevel, rel_dir: str, names: set[str]
+    ) -> IgnoreLevel:
+        """Returns the level of a subdirectory.
+
+        Args:
+            parent: The level of the parent directory.
+            rel_dir: The subdirectory's relative POSIX path.
+            names: The names of the subdirectory's entries.
+
+        Returns:
+            The ignore level in effect inside the subdirectory.
+        """
+        rules = self._load_rules(rel_dir, names)
+        if not rules:
+            return IgnoreLevel(rel_dir, parent._rule_sets)
+        return IgnoreLevel(
+            rel_dir, (RuleSet(rel_dir, rules),) + parent._rule_sets
+        )
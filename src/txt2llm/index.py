@@ -0,0 +1,212 @@
+"""Section index module for the txt2llm project.
+
+This module writes and reads the sidecar index of a report, a compact
+binary hash table mapping each file path, and the directory tree, to
+the byte offset and length of its section in the report. A reader maps
+the index into memory and finds a section with a single hash probe, so
+a section can be extracted from a large report without reading or
+parsing anything else.
+
+The index file consists of a header, a table of fixed-size slots and
+the UTF-8 encoded keys. The table has a power-of-two number of slots,
+at least twice the number of keys, and is probed linearly. A slot with
+a zero hash is empty.
+"""
+
+import hashlib
+import io
+import mmap
+import struct
+from pathlib import Path
+from typing import BinaryIO
+
+# Identifies index files and their format version.
+MAGIC = b"T2LIDX01"
+
+# The header: magic, slot count, key count and the size of the indexed
+# report in bytes, which detects an index left stale by a newer report.
+_HEADER = struct.Struct("<8sIIQ")
+
+# A slot: key hash, section offset, section length, key offset within
+# the key area, key length.
+_SLOT = struct.Struct("<QQQII")
+
+# The key of the directory tree section. No file path is empty.
+TREE_KEY = ""
+
+# The suffix appended to a report's name to name its index.
+SUFFIX = ".idx"
+
+
+def index_path(report_path: Path) -> Path:
+    """Returns the index path of a report, e.g. ``report.txt.idx``."""
+    return report_path.with_name(report_path.name + SUFFIX)
+
+
+def _hash(key: bytes) -> int:
+    """Hashes a key; the result is stable across processes and never 0."""
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 1
+
+
+class IndexWriter:
+    """Collects section positions while a report is written.
+
+    Attributes:
+        entries: The collected keys and their section offsets and
+            lengths, in bytes.
+    """
+
+    def __init__(self):
+        """Initializes an empty index."""
+        self.entries: dict[str, tuple[int, int]] = {}
+
+    def add(self, key: str, offset: int, length: int) -> None:
+        """Records the position of a section.
+
+        Args:
+            key: The file path in POSIX form, or `TREE_KEY`.
+            offset: The byte offset of the section in the report.
+            length: The length of the section, in bytes.
+        """
+        self.entries[key] = (offset, length)
+
+    def write(self, fp: BinaryIO, report_size: int) -> None:
+        """Writes the index.
+
+        Args:
+            fp: A writable binary stream.
+            report_size: The size of the indexed report, in bytes.
+        """
+        slot_count = 1
+        while slot_count < 2 * len(self.entries):
+            slot_count *= 2
+        slots = [None] * slot_count
+        keys = bytearray()
+        for key, (offset, length) in self.entries.items():
+            encoded = key.encode("utf-8")
+            key_hash = _hash(encoded)
+            slot = key_hash & (slot_count - 1)
+            while slots[slot] is not None:
+                slot = (slot + 1) & (slot_count - 1)
+            slots[slot] = _SLOT.pack(
+                key_hash, offset, length, len(keys), len(encoded)
+            )
+            keys += encoded
+
+        empty = bytes(_SLOT.size)
+        fp.write(
+            _HEADER.pack(MAGIC, slot_count, len(self.entries), report_size)
+        )
+        fp.write(b"".join(slot or empty for slot in slots))
+        fp.write(keys)
+
+    def save(self, path: Path, report_size: int) -> None:
+        """Writes the index to a file, see `write`."""
+        with path.open("wb") as fp:
+            self.write(fp, report_size)
+
+
+class ReportIndex:
+    """A memory-mapped section index.
+
+    Attributes:
+        report_size: The size of the indexed report, in bytes.
+    """
+
+    def __init__(self, path: Path):
+        """Maps an index file into memory.
+
+        Args:
+            path: The index file.
+
+        Raises:
+            OSError: If the file cannot be read.
+            ValueError: If the file is not a valid index.
+        """
+        with path.open("rb") as fp:
+            try:
+                self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"'{path}' is not a report index.") from None
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"'{path}' is not a report index.")
+        magic, self._slot_count, self._key_count, self.report_size = (
+            _HEADER.unpack_from(self._map)
+        )
+        self._keys_start = _HEADER.size + self._slot_count * _SLOT.size
+        if magic != MAGIC or len(self._map) < self._keys_start:
+            self.close()
+            raise ValueError(f"'{path}' is not a report index.")
+
+    def __len__(self) -> int:
+        """Returns the number of indexed sections."""
+        return self._key_count
+
+    def lookup(self, key: str) -> tuple[int, int] | None:
+        """Finds the position of a section.
+
+        Args:
+            key: The file path in POSIX form, or `TREE_KEY`.
+
+        Returns:
+            The byte offset and length of the section, or None if the key
+            is not indexed.
+        """
+        encoded = key.encode("utf-8")
+        key_hash = _hash(encoded)
+        mask = self._slot_count - 1
+        slot = key_hash & mask
+        for _ in range(self._slot_count):
+            slot_hash, offset, length, key_offset, key_length = (
+                _SLOT.unpack_from(self._map, _HEADER.size + slot * _SLOT.size)
+            )
+            if slot_hash == 0:
+                return None
+            if slot_hash == key_hash:
+                start = self._keys_start + key_offset
+                if self._map[start : start + key_length] == encoded:
+                    return offset, length
+            slot = (slot + 1) & mask
+        return None
+
+    def close(self) -> None:
+        """Unmaps the index."""
+        self._map.close()
+
+    def __enter__(self) -> "ReportIndex":
+        """Returns the index itself for use in a ``with`` statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Unmaps the index when leaving a ``with`` statement."""
+        self.close()
+
+
+def extract(report_path: Path, index: ReportIndex, key: str) -> bytes | None:
+    """Reads one section of a report.
+
+    Args:
+        report_path: The uncompressed report.
+        index: The report's index.
+        key: The file path in POSIX form, or `TREE_KEY`.
+
+    Returns:
+        The UTF-8 encoded section, or None if the key is not indexed.
+
+    Raises:
+        OSError: If the report cannot be read.
+        ValueError: If the report does not match the index.
+    """
+    position = index.lookup(key)
+    if position is None:
+        return None
+    offset, length = position
+    with report_path.open("rb") as fp:
+        if fp.seek(0, io.SEEK_END) != index.report_size:
+            raise ValueError(
+                f"The index does not match '{report_path}'; regenerate it."
+            )
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as report:
+            return report[offset : offset + length]
@@ -0,0 +1,126 @@
+"""JSON Lines output module for the txt2llm project.
+
+This module renders the records of the ``jsonl`` report format: one
+JSON object per line, so that consumers can process a report record by
+record while it is still being written. A report consists of:
+
+- a ``summary`` record with the project name, configuration, directory
+  tree and number of files;
+- one ``file`` record per file, in report order;
+- an ``end`` record with the number of files and, when token counting
+  is enabled, the token total.
+
+File records always have the same keys: ``path``, ``language``,
+``size``, ``hash``, ``tokens``, ``skipped``, ``duplicate_of``,
+``encoding``, ``outline`` and ``content``. A file whose content is not
+included has a ``skipped`` reason and a null ``encoding`` and
+``content``.
+"""
+
+import dataclasses
+import json
+from pathlib import Path
+
+from .config import ProjectConfig
+
+
+def _json_default(value: object) -> object:
+    """Encodes values that JSON does not support natively."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} as JSON")
+
+
+def _line(record: dict) -> str:
+    """Encodes a record as one line of JSON."""
+    return (
+        json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+    )
+
+
+def summary_record(config: ProjectConfig, tree: str, files: int) -> str:
+    """Renders the summary record that starts a report.
+
+    Args:
+        config: The project configuration.
+        tree: The rendered directory tree.
+        files: The number of file records that follow.
+
+    Returns:
+        The record as a line of JSON.
+    """
+    return _line(
+        {
+            "type": "summary",
+            "project": config.project_root.name,
+            "config": dataclasses.asdict(config),
+            "tree": tree,
+            "files": files,
+        }
+    )
+
+
+def file_record(
+    path: Path,
+    language: str,
+    size: int | None = None,
+    digest: str | None = None,
+    tokens: int | None = None,
+    skipped: str | None = None,
+    duplicate_of: str | None = None,
+    encoding: str | None = None,
+    outline: bool = False,
+    content: str | None = None,
+) -> str:
+    """Renders the record of one file.
+
+    Args:
+        path: The relative path of the file.
+        language: The Markdown language identifier of the content.
+        size: The size of the file on disk, in bytes, if known.
+        digest: The hex digest of the file's raw content, if computed.
+        tokens: The estimated number of tokens of the content, or None
+            when token counting is disabled.
+        skipped: The reason the content is not included, if any.
+        duplicate_of: The path of an earlier file this file duplicates;
+            ``content`` is then null or a diff against that file.
+        encoding: The name of the file's detected encoding, e.g.
+            ``utf-8``, if its content was read.
+        outline: Whether ``content`` is the file's outline.
+        content: The file content, a head and tail excerpt, a diff or
+            an outline.
+
+    Returns:
+        The record as a line of JSON.
+    """
+    return _line(
+        {
+            "type": "file",
+            "path": path.as_posix(),
+            "language": language,
+            "size": size,
+            "hash": digest,
+            "tokens": tokens,
+            "skipped": skipped,
+            "duplicate_of": duplicate_of,
+            "encoding": encoding,
+            "outline": outline,
+            "content": content,
+        }
+    )
+
+
+def end_record(files: int, tokens: int | None) -> str:
+    """Renders the record that ends a complete report.
+
+    Args:
+        files: The number of file records written.
+        tokens: The estimated token total of all file contents, or None
+            when token counting is disabled.
+
+    Returns:
+        The record as a line of JSON.
+    """
+    return _line({"type": "end", "files": files, "tokens": tokens})
@@ -7,12 +7,21 @@ overview report.
 
 import argparse
 import logging
+import os
+import sqlite3
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+from . import batch, compress, fs, index, outline
+from .cache import DEFAULT_MAX_BYTES, ReportCache, default_cache_path
 from .config import ProjectConfig
 from .core import TextProjectBuilder
+from .shard import ShardWriter
+from .stats import Stats, profiled
+from .tokens import get_tokenizer
+from .watch import DEFAULT_DEBOUNCE, ProjectWatcher
 
 # Configure logging
 logging.basicConfig(
@@ -21,9 +30,424 @@ logging.basicConfig(
     stream=sys.stdout,
 )
 
+# Multipliers of the size suffixes accepted by `_byte_size`.
+_SIZE_SUFFIXES = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def _positive_int(value: str) -> int:
+    """Parses a strictly positive integer command-line value.
+
+    Args:
+        value: The raw argument string.
+
+    Returns:
+        The parsed integer.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            f"expected a positive integer: {value!r}"
+        )
+    return number
+
+
+def _byte_size(value: str) -> int:
+    """Parses a size command-line value such as ``512``, ``64K`` or ``10M``.
+
+    Args:
+        value: The raw argument string, with an optional binary K, M or G
+            suffix.
+
+    Returns:
+        The size in bytes; 0 means no limit.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a valid size.
+    """
+    number, suffix = value, ""
+    if value[-1:].upper() in _SIZE_SUFFIXES:
+        number, suffix = value[:-1], value[-1].upper()
+    try:
+        size = int(number) * _SIZE_SUFFIXES[suffix]
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise argparse.ArgumentTypeError(f"expected a size: {value!r}")
+    return size
+
+
+def _ext_size(value: str) -> tuple[str, int]:
+    """Parses an ``EXT=SIZE`` command-line value, e.g. ``.json=1M``.
+
+    Args:
+        value: The raw argument string.
+
+    Returns:
+        A tuple of the extension, with a leading dot, and the size in
+        bytes.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not ``EXT=SIZE``.
+    """
+    ext, sep, size = value.partition("=")
+    if not sep or not ext.strip("."):
+        raise argparse.ArgumentTypeError(f"expected EXT=SIZE: {value!r}")
+    return "." + ext.lstrip("."), _byte_size(size)
+
+
+def _outline_ext(value: str) -> str:
+    """Parses a file extension that has an outline, e.g. ``.py``.
+
+    Args:
+        value: The raw argument string.
+
+    Returns:
+        The extension, with a leading dot.
+
+    Raises:
+        argparse.ArgumentTypeError: If files with the extension have no
+            outline, see `outline.has_outline`.
+    """
+    ext = "." + value.lstrip(".")
+    if not outline.has_outline(ext):
+        raise argparse.ArgumentTypeError(f"no outline for {value!r} files")
+    return ext
+
+
+def _fraction(value: str) -> float:
+    """Parses a command-line value greater than 0 and at most 1.
+
+    Args:
+        value: The raw argument string.
+
+    Returns:
+        The parsed number.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not in (0, 1].
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if not 0.0 < number <= 1.0:
+        raise argparse.ArgumentTypeError(
+            f"expected a number in (0, 1]: {value!r}"
+        )
+    return number
+
+
+def _default_output_dir(project_path: Path) -> Path:
+    """Returns the default output directory for a project.
+
+    Args:
+        project_path: The resolved path of the target project.
+
+    Returns:
+        The directory ``<txt2llm_project_root>/output/<project_name>/``.
+    """
+    # Determine the txt2llm project root (e.g., /wk2/yaochu/DLAMP_model/txt2llm/)
+    # main.py is in src/txt2llm/, so go up three levels from main.py's location
+    txt2llm_project_root = Path(__file__).resolve().parents[2]
+    return txt2llm_project_root / "output" / project_path.name
+
+
+def _default_output_path(project_path: Path, suffix: str = ".txt") -> Path:
+    """Returns a timestamped default report path for a project.
+
+    Args:
+        project_path: The resolved path of the target project.
+        suffix: The file name suffix, e.g. ``.jsonl``.
+
+    Returns:
+        The path ``<project_name>_overview_<timestamp><suffix>`` inside
+        the directory given by `_default_output_dir`.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_filename = f"{project_path.name}_overview_{timestamp}{suffix}"
+    return _default_output_dir(project_path) / output_filename
+
+
+def _suffix(args: argparse.Namespace) -> str:
+    """Returns the default report file suffix for the chosen format."""
+    return ".jsonl" if args.format == "jsonl" else ".txt"
+
+
+def _project_config(
+    args: argparse.Namespace, project_path: Path, output_path: Path
+) -> ProjectConfig:
+    """Builds the configuration of a project from the parsed arguments.
+
+    Args:
+        args: The parsed command-line arguments.
+        project_path: The resolved path of the target project.
+        output_path: The path of the report.
+
+    Returns:
+        The project configuration.
+    """
+    # Default configuration values from the roadmap
+    ignored_dirs = {".git", "__pycache__", ".venv", "output"}
+    include_exts = {
+        # Code
+        ".py", ".java", ".js", ".ts", ".go", ".rs", ".c", ".h", ".cpp",
+        # Config
+        ".yaml", ".yml", ".json", ".toml", ".ini", ".cfg",
+        # Docs
+        ".md", ".txt", ".rst",
+        # Shell/Scripts
+        ".sh", ".bat",
+    }
+
+    ignore_files = (".gitignore", ".txt2llmignore")
+    if args.no_gitignore:
+        ignore_files = (".txt2llmignore",)
+
+    outline_exts = frozenset(args.outline_ext)
+    if args.outline and not outline_exts:
+        outline_exts = frozenset(filter(outline.has_outline, include_exts))
+
+    return ProjectConfig(
+        project_root=project_path,
+        output_path=output_path,
+        ignored_dirs=ignored_dirs,
+        include_exts=include_exts,
+        jobs=args.jobs,
+        count_tokens=args.count_tokens or args.max_tokens is not None,
+        max_tokens=args.max_tokens,
+        tokenizer=args.tokenizer,
+        source=args.source,
+        git_untracked=args.git_untracked,
+        ignore_files=ignore_files,
+        exclude_patterns=tuple(args.exclude),
+        dedup=args.dedup or args.near_dup is not None,
+        near_dup_threshold=args.near_dup,
+        max_file_bytes=args.max_file_size or None,
+        ext_max_file_bytes={
+            ext: size or None for ext, size in args.max_file_size_ext
+        },
+        excerpt_lines=args.excerpt_lines,
+        output_format=args.format,
+        compact=args.compact,
+        since=args.since,
+        since_manifest=(
+            args.since_manifest.resolve() if args.since_manifest else None
+        ),
+        since_diff=args.since_diff,
+        tree_max_depth=args.tree_depth,
+        tree_collapse=args.tree_collapse,
+        tree_only_included=args.tree_only_included,
+        order="imports" if args.entry else args.order,
+        entry_points=tuple(path.as_posix() for path in args.entry),
+        outline_exts=outline_exts,
+    )
+
+
+def _check_archive_options(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> None:
+    """Rejects the options that need a project directory on disk.
+
+    Args:
+        parser: The argument parser, used to report invalid options.
+        args: The parsed command-line arguments.
+    """
+    directory_only = {
+        "--source=git": args.source == "git",
+        "--since": args.since is not None,
+        "--since-manifest": args.since_manifest is not None,
+        "--write-manifest": args.write_manifest is not None,
+        "--watch": args.watch,
+    }
+    for option, given in directory_only.items():
+        if given:
+            parser.error(f"{option} cannot be used with an archive --path.")
+
+
+def _run_batch(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    paths: list[Path],
+) -> None:
+    """Builds the reports of several projects in a process pool.
+
+    Each report is written to its project's default output location.
+    The process exits with status 1 if any project failed.
+
+    Args:
+        parser: The argument parser, used to report invalid options.
+        args: The parsed command-line arguments.
+        paths: The project directories.
+    """
+    single_only = {
+        "--output": args.output is not None,
+        "--watch": args.watch,
+        "--split-bytes/--split-tokens": (
+            args.split_bytes is not None or args.split_tokens is not None
+        ),
+        "--stats": args.stats is not None,
+        "--profile": args.profile is not None,
+        "--since-manifest": args.since_manifest is not None,
+        "--write-manifest": args.write_manifest is not None,
+        "--cache": args.cache is not None,
+    }
+    for option, given in single_only.items():
+        if given:
+            parser.error(f"{option} needs a single --path.")
+    project_paths = [path.resolve() for path in paths]
+    names = [path.name for path in project_paths]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        parser.error(
+            f"Projects share the names {duplicates}; their default "
+            "outputs would collide."
+        )
+    if args.count_tokens or args.max_tokens is not None:
+        try:
+            get_tokenizer(args.tokenizer)
+        except (ValueError, ImportError) as e:
+            logging.error(f"Error: {e}")
+            sys.exit(1)
+            return
+
+    cache_max_bytes = None if args.no_cache else args.cache_max_mb * 1024**2
+    tasks = [
+        batch.BatchTask(
+            _project_config(
+                args, path, _default_output_path(path, _suffix(args))
+            ),
+            cache_max_bytes,
+            args.index,
+        )
+        for path in project_paths
+    ]
+    workers = args.batch_workers or os.cpu_count()
+    logging.info(
+        f"Building {len(tasks)} projects with {workers} processes..."
+    )
+    start = time.perf_counter()
+    results = batch.run_batch(tasks, workers)
+    logging.info(batch.summarize(results, time.perf_counter() - start))
+    failed = [result for result in results if result.error is not None]
+    for result in failed:
+        logging.error(f"Failed: {result.project_root}: {result.error}")
+    if failed:
+        sys.exit(1)
+
+
+def _open_cache(
+    cache_path: Path, config: ProjectConfig, max_bytes: int
+) -> ReportCache | None:
+    """Opens the report cache of a project, if possible.
+
+    Args:
+        cache_path: The path of the cache database. Its directory is
+            created if needed.
+        config: The project configuration.
+        max_bytes: The upper bound for the stored section text.
+
+    Returns:
+        The opened cache, or None if it could not be opened.
+    """
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        return ReportCache(cache_path, config, max_bytes)
+    except (OSError, sqlite3.Error) as e:
+        logging.warning(f"Could not open cache {cache_path}: {e}")
+        return None
+
+
+def extract_main(argv: list[str]) -> None:
+    """Runs the ``extract`` subcommand.
+
+    Writes the requested sections of an indexed report to stdout, in the
+    order given, each read at its indexed offset without scanning the
+    rest of the report. The process exits with status 1 if a section is
+    not in the index.
+
+    Args:
+        argv: The arguments following ``extract``.
+    """
+    parser = argparse.ArgumentParser(
+        prog="txt2llm extract",
+        description="""
+Print file sections of a report written with --index.
+""",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        metavar="FILE",
+        help="The project-relative path of a file whose section to print.",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        required=True,
+        help="The section index, <report>.idx.",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="""
+The indexed report. Defaults to the index path without its .idx suffix.
+""",
+    )
+    parser.add_argument(
+        "--tree",
+        action="store_true",
+        help="""
+Also print the directory tree, or the summary record of a jsonl report.
+""",
+    )
+    args = parser.parse_args(argv)
+    if not args.files and not args.tree:
+        parser.error("name at least one FILE or --tree.")
+    report = args.report
+    if report is None:
+        if args.index.suffix != index.SUFFIX:
+            parser.error("--report is required unless --index ends in .idx.")
+        report = args.index.with_suffix("")
+
+    # Keep stdout clean for the sections.
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+        force=True,
+    )
+    keys = [Path(file).as_posix() for file in args.files]
+    if args.tree:
+        keys.insert(0, index.TREE_KEY)
+    missing = 0
+    try:
+        with index.ReportIndex(args.index) as report_index:
+            for key in keys:
+                section = index.extract(report, report_index, key)
+                if section is None:
+                    logging.error(f"Not in the index: {key}")
+                    missing += 1
+                    continue
+                sys.stdout.buffer.write(section)
+    except (OSError, ValueError) as e:
+        logging.error(f"Error: {e}")
+        sys.exit(1)
+    sys.stdout.flush()
+    if missing:
+        sys.exit(1)
+
 
 def main():
     """Parses CLI arguments and generates the project report."""
+    if sys.argv[1:2] == ["extract"]:
+        extract_main(sys.argv[2:])
+        return
     parser = argparse.ArgumentParser(
         description="""
 A developer utility that consolidates an entire project's text-based
@@ -34,77 +458,578 @@ with Large Language Models (LLMs).
     parser.add_argument(
         "--path",
         type=Path,
-        required=True,
-        help="The path to the project directory.",
+        action="append",
+        default=[],
+        help="""
+The path to the project directory, or to a tar or zip archive of it
+(.tar, .tar.gz, .tgz, .tar.bz2, .tbz2, .tar.xz, .txz or .zip), which is
+read without being extracted. May be given several times to build the
+reports of many projects in one batch, each written to its default
+output location.
+""",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        metavar="FILE",
+        help="""
+A file listing project directories to build in one batch, one per line.
+Blank lines and lines starting with '#' are skipped; relative paths are
+resolved against the manifest's directory.
+""",
+    )
+    parser.add_argument(
+        "--batch-workers",
+        type=_positive_int,
+        metavar="N",
+        help="""
+In batch mode, the number of worker processes building projects in
+parallel. Defaults to the number of CPUs.
+""",
     )
     parser.add_argument(
         "--output",
         type=Path,
         help="""
-The path for the output file. If not provided, a default name is
-generated in the project's parent directory.
+The path for the output file, or '-' to write the report to stdout.
+If not provided, a default name is generated in the project's parent
+directory.
+""",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("markdown", "jsonl"),
+        default="markdown",
+        help="""
+The report format: 'markdown' (default), or 'jsonl' for one JSON record
+per line: a summary record with the tree and configuration, one record
+per file with its path, language, size, hash, token estimate, skip
+reason and content, and an end record.
+""",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=1,
+        help="""
+The number of threads used to read files ahead of the report writer.
+Output order is unaffected. Defaults to 1 (sequential reads).
+""",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="""
+Do not read or update the persistent cache of rendered file sections.
+""",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        metavar="FILE",
+        help="""
+The path of the persistent cache database. Defaults to a file named
+after the project in $XDG_CACHE_HOME/txt2llm, or ~/.cache/txt2llm.
+""",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=_positive_int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="""
+The size limit of the persistent cache in MiB. Least recently used
+sections are evicted beyond it.
+""",
+    )
+    parser.add_argument(
+        "--count-tokens",
+        action="store_true",
+        help="""
+Show an estimated token count for each file and for the whole report.
+""",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=_positive_int,
+        help="""
+A token budget for the report. Once it is reached, the remaining files
+are listed as omitted instead of being included. Implies --count-tokens.
+""",
+    )
+    parser.add_argument(
+        "--tokenizer",
+        default="heuristic",
+        help="""
+The tokenizer used for token counts: 'heuristic' (default, no
+dependencies) or 'tiktoken[:ENCODING]' (requires the tiktoken package).
+""",
+    )
+    parser.add_argument(
+        "--source",
+        choices=("filesystem", "git"),
+        default="filesystem",
+        help="""
+Where to enumerate project files from: 'filesystem' (default) walks the
+project directory, 'git' lists the files tracked in the git index with a
+single 'git ls-files' call.
+""",
+    )
+    parser.add_argument(
+        "--git-untracked",
+        action="store_true",
+        help="""
+With --source=git, also include untracked files that are not ignored
+by git.
+""",
+    )
+    parser.add_argument(
+        "--tree-depth",
+        type=_positive_int,
+        metavar="N",
+        help="""
+Only list the directory tree down to depth N; deeper directories are
+summarized as a file count and their most common extension.
+""",
+    )
+    parser.add_argument(
+        "--tree-collapse",
+        type=_positive_int,
+        metavar="N",
+        help="""
+Summarize the contents of directories with more than N entries in the
+directory tree, e.g. '… 12,431 files (8,120 .json)'.
+""",
+    )
+    parser.add_argument(
+        "--tree-only-included",
+        action="store_true",
+        help="""
+Only show the included files, and the directories containing them, in
+the directory tree.
+""",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["path", "imports"],
+        default="path",
+        help="""
+The order of the file contents: 'path' sorts files by path, 'imports'
+ranks them by the project's import graph, so the modules most of the
+project imports come first and survive a truncated context. Defaults to
+'path'.
+""",
+    )
+    parser.add_argument(
+        "--entry",
+        type=Path,
+        action="append",
+        default=[],
+        metavar="FILE",
+        help="""
+An entry point, given by its path relative to the project root. Files
+are ranked by how many imports away from the nearest entry point they
+are, then by the import graph. May be given several times. Implies
+--order=imports.
+""",
+    )
+    since_group = parser.add_mutually_exclusive_group()
+    since_group.add_argument(
+        "--since",
+        metavar="REF",
+        help="""
+Include in full only the files changed since the git commit REF (e.g.
+HEAD~3 or main), including untracked files; list the unchanged and
+removed files instead. The changed files are found by 'git diff'.
+""",
+    )
+    since_group.add_argument(
+        "--since-manifest",
+        type=Path,
+        metavar="FILE",
+        help="""
+Like --since, but compare with a manifest written by --write-manifest:
+files with the recorded size and modification time are unchanged
+without being read. A missing FILE counts every file as changed.
+""",
+    )
+    parser.add_argument(
+        "--since-diff",
+        action="store_true",
+        help="""
+With --since, show changed files as a unified diff against REF instead
+of in full. Files without a diff, e.g. untracked ones, are shown in
+full.
+""",
+    )
+    parser.add_argument(
+        "--write-manifest",
+        type=Path,
+        metavar="FILE",
+        help="""
+After the report, record the size, modification time and content hash
+of its files in FILE, for a later --since-manifest. Only changed files
+are hashed again when FILE already exists.
+""",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="""
+A .gitignore-style pattern to exclude, e.g. 'build/', '*.min.js' or
+'docs/**/generated'. May be given several times.
+""",
+    )
+    parser.add_argument(
+        "--no-gitignore",
+        action="store_true",
+        help="""
+Do not apply .gitignore files. Patterns in .txt2llmignore files are
+still applied.
+""",
+    )
+    parser.add_argument(
+        "--max-file-size",
+        type=_byte_size,
+        metavar="SIZE",
+        help="""
+Files larger than SIZE (e.g. 512K or 10M) are shown as an excerpt of
+their first and last lines instead of in full. By default, and with 0,
+files are shown in full whatever their size.
+""",
+    )
+    parser.add_argument(
+        "--max-file-size-ext",
+        type=_ext_size,
+        action="append",
+        default=[],
+        metavar="EXT=SIZE",
+        help="""
+A size limit for one file extension, e.g. '.json=1M', overriding
+--max-file-size. May be given several times.
+""",
+    )
+    parser.add_argument(
+        "--excerpt-lines",
+        type=_positive_int,
+        default=50,
+        metavar="N",
+        help="""
+The number of lines shown from each end of a file over its size limit.
+Defaults to %(default)s.
+""",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="""
+Strip comments, docstrings, license headers, trailing whitespace and
+runs of blank lines from file contents. Comments are removed for Python,
+C, C++, Java, JavaScript, TypeScript, Go, Rust and shell files.
+""",
+    )
+    parser.add_argument(
+        "--outline",
+        action="store_true",
+        help="""
+Show Python, C, C++, Java, JavaScript, TypeScript, Go and Rust files as
+an outline of their module docstrings, signatures and constants, without
+function bodies.
+""",
+    )
+    parser.add_argument(
+        "--outline-ext",
+        type=_outline_ext,
+        action="append",
+        default=[],
+        metavar="EXT",
+        help="""
+Show only the files with extension EXT, e.g. '.py', as an outline.
+Implies --outline. May be given several times.
+""",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="""
+Replace files whose content is identical to an earlier file with a
+reference to that file.
+""",
+    )
+    parser.add_argument(
+        "--near-dup",
+        type=_fraction,
+        metavar="THRESHOLD",
+        help="""
+Also show files whose estimated similarity to an earlier file is at
+least THRESHOLD (e.g. 0.8) as a diff against it, when the diff is
+smaller. Implies --dedup.
+""",
+    )
+    parser.add_argument(
+        "--stats",
+        type=Path,
+        metavar="FILE",
+        help="""
+Write run statistics as JSON: wall and CPU time per phase, directories
+visited, files stat'd and opened, bytes read and emitted, and the
+slowest files.
+""",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="FILE",
+        help="""
+Run report generation under cProfile and write the profile to FILE in
+pstats format.
+""",
+    )
+    parser.add_argument(
+        "--compress-level",
+        type=int,
+        choices=range(1, 10),
+        metavar="{1..9}",
+        help="""
+The compression level of an --output ending in .gz, .xz or .bz2, from 1
+(fastest) to 9 (smallest). Defaults to 6 for gzip and xz and 9 for bz2.
+""",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="""
+Also write a section index next to the report, as <output>.idx, from
+which 'txt2llm extract' reads single file sections without scanning the
+report. Needs an uncompressed, unsplit file output.
+""",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="""
+Keep running and rewrite the report whenever project files change. Only
+changed files are read again. Stop with Ctrl+C.
+""",
+    )
+    parser.add_argument(
+        "--debounce-ms",
+        type=_positive_int,
+        default=int(DEFAULT_DEBOUNCE * 1000),
+        help="""
+With --watch, the number of milliseconds without further changes after
+which a burst of changes is rebuilt. Defaults to %(default)s.
+""",
+    )
+    split_group = parser.add_mutually_exclusive_group()
+    split_group.add_argument(
+        "--split-bytes",
+        type=_positive_int,
+        help="""
+Split the report into parts of at most this many bytes, written as
+<output>_part001.txt, <output>_part002.txt, and so on.
+""",
+    )
+    split_group.add_argument(
+        "--split-tokens",
+        type=_positive_int,
+        help="""
+Split the report into parts of at most this many tokens, as counted by
+--tokenizer.
 """,
     )
     args = parser.parse_args()
+    split = args.split_bytes is not None or args.split_tokens is not None
+    if split and args.output is not None and str(args.output) == "-":
+        parser.error("--split-bytes/--split-tokens need a file --output.")
+    if split and args.format == "jsonl":
+        parser.error("--split-bytes/--split-tokens need --format=markdown.")
+    if args.since_diff and args.since is None:
+        parser.error("--since-diff needs --since.")
+
+    paths = list(args.path)
+    if args.manifest is not None:
+        try:
+            paths += batch.read_manifest(args.manifest)
+        except OSError as e:
+            parser.error(f"Could not read --manifest: {e}")
+    if not paths:
+        parser.error("one of --path or --manifest is required.")
+    if len(paths) > 1 or args.manifest is not None:
+        _run_batch(parser, args, paths)
+        return
 
-    project_path = args.path.resolve()
-    if not project_path.is_dir():
-        logging.error(f"Error: Path '{project_path}' is not a valid directory.")
+    project_path = paths[0].resolve()
+    archive = project_path.is_file() and fs.is_archive(project_path)
+    if not project_path.is_dir() and not archive:
+        logging.error(
+            f"Error: Path '{project_path}' is not a valid directory or "
+            "archive."
+        )
         sys.exit(1)
     else:
-        logging.info(f"Starting project overview generation for: {project_path}")
         # Only proceed with output path and config if project_path is valid
-        if args.output:
+        to_stdout = args.output is not None and str(args.output) == "-"
+        if to_stdout:
+            # Keep stdout clean for the report when piping.
+            logging.basicConfig(
+                level=logging.INFO,
+                format="%(asctime)s - %(levelname)s - %(message)s",
+                stream=sys.stderr,
+                force=True,
+            )
+        logging.info(f"Starting project overview generation for: {project_path}")
+        if archive:
+            _check_archive_options(parser, args)
+        if args.watch and (split or to_stdout):
+            parser.error("--watch needs a single file --output.")
+        if args.watch and args.source != "filesystem":
+            parser.error("--watch needs --source=filesystem.")
+        if args.watch and args.write_manifest is not None:
+            parser.error("--write-manifest cannot be used with --watch.")
+        if args.index and (
+            split
+            or to_stdout
+            or args.output is not None
+            and compress.codec_for(args.output)
+        ):
+            parser.error("--index needs an uncompressed, unsplit --output.")
+        if to_stdout:
+            output_path = args.output
+        elif args.output:
             output_path = args.output.resolve()
         else:
-            # Determine the txt2llm project root (e.g., /wk2/yaochu/DLAMP_model/txt2llm/)
-            # main.py is in src/txt2llm/, so go up three levels from main.py's location
-            txt2llm_project_root = Path(__file__).resolve().parents[2]
-
             # Construct the output directory: <txt2llm_project_root>/output/<target_project_name>/
-            target_project_name = project_path.name
-            output_dir = txt2llm_project_root / "output" / target_project_name
-            output_dir.mkdir(parents=True, exist_ok=True)  # Create directories if they don't exist
-
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_filename = f"{target_project_name}_overview_{timestamp}.txt"
-            output_path = output_dir / output_filename
-
-        # Default configuration values from the roadmap
-        ignored_dirs = {".git", "__pycache__", ".venv", "output"}
-        include_exts = {
-            # Code
-            ".py", ".java", ".js", ".ts", ".go", ".rs", ".c", ".h", ".cpp",
-            # Config
-            ".yaml", ".yml", ".json", ".toml", ".ini", ".cfg",
-            # Docs
-            ".md", ".txt", ".rst",
-            # Shell/Scripts
-            ".sh", ".bat",
-        }
-
-        config = ProjectConfig(
-            project_root=project_path,
-            output_path=output_path,
-            ignored_dirs=ignored_dirs,
-            include_exts=include_exts,
-        )
+            output_path = _default_output_path(project_path, _suffix(args))
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        config = _project_config(args, project_path, output_path)
 
         logging.info(f"Project path: {config.project_root}")
         logging.info(f"Output file: {config.output_path}")
         logging.info(f"Ignored directories: {config.ignored_dirs}")
+        logging.info(f"Ignore files: {config.ignore_files}")
+        if config.exclude_patterns:
+            logging.info(f"Exclude patterns: {config.exclude_patterns}")
         logging.info(f"Included extensions: {config.include_exts}")
+        logging.info(f"Reader threads: {config.jobs}")
+        logging.info(f"File source: {config.source}")
+        if config.max_file_bytes or config.ext_max_file_bytes:
+            logging.info(
+                f"File size limits: {config.max_file_bytes}, by extension: "
+                f"{config.ext_max_file_bytes}"
+            )
+        if config.compact:
+            logging.info("Compaction: on")
+        if config.outline_exts:
+            logging.info(
+                f"Outlined extensions: {sorted(config.outline_exts)}"
+            )
+        if config.order != "path":
+            logging.info(
+                f"File order: {config.order}, entry points: "
+                f"{', '.join(config.entry_points) or 'none'}"
+            )
+        if config.since is not None or config.since_manifest is not None:
+            logging.info(
+                f"Changed files since: {config.since or config.since_manifest}"
+                f", diffs: {'on' if config.since_diff else 'off'}"
+            )
+        if config.dedup:
+            logging.info(
+                f"Deduplication: on, near duplicates: "
+                f"{config.near_dup_threshold or 'off'}"
+            )
+
+        try:
+            tokenizer = None
+            if (
+                args.count_tokens
+                or args.max_tokens is not None
+                or args.split_tokens is not None
+            ):
+                tokenizer = get_tokenizer(args.tokenizer)
+        except (ValueError, ImportError) as e:
+            logging.error(f"Error: {e}")
+            sys.exit(1)
+            return
+
+        if args.watch:
+            watcher = ProjectWatcher(
+                config,
+                tokenizer=tokenizer,
+                debounce=args.debounce_ms / 1000,
+                compress_level=args.compress_level,
+                write_index=args.index,
+            )
+            try:
+                watcher.run()
+            except KeyboardInterrupt:
+                logging.info("Watch mode stopped.")
+            return
+
+        cache = None
+        # Archive members have no stat keys to validate cached sections.
+        if not args.no_cache and not archive:
+            cache = _open_cache(
+                args.cache or default_cache_path(project_path),
+                config,
+                args.cache_max_mb * 1024 * 1024,
+            )
+
+        stats = Stats() if args.stats is not None else None
+        builder = TextProjectBuilder(
+            config, cache=cache, tokenizer=tokenizer, stats=stats
+        )
 
-        builder = TextProjectBuilder(config)
-        
         try:
-            report_content = builder.generate_report()
-            output_path.write_text(report_content, encoding="utf-8")
-            logging.info(f"Project overview report successfully generated at: {output_path}")
+            with profiled(args.profile):
+                if split:
+                    if args.split_tokens is not None:
+                        writer = ShardWriter(
+                            output_path,
+                            project_path.name,
+                            args.split_tokens,
+                            tokenizer.count,
+                            args.compress_level,
+                        )
+                    else:
+                        writer = ShardWriter(
+                            output_path,
+                            project_path.name,
+                            args.split_bytes,
+                            compress_level=args.compress_level,
+                        )
+                    parts = builder.write_sharded_report(writer)
+                    logging.info(
+                        f"Project overview report successfully generated in "
+                        f"{len(parts)} parts next to: {output_path}"
+                    )
+                else:
+                    if to_stdout:
+                        builder.write_report(sys.stdout)
+                        sys.stdout.flush()
+                    elif args.index:
+                        index_file = builder.write_indexed_report(output_path)
+                        logging.info(f"Section index written to: {index_file}")
+                    else:
+                        with compress.open_text(
+                            output_path, args.compress_level
+                        ) as fp:
+                            builder.write_report(fp)
+                    logging.info(f"Project overview report successfully generated at: {output_path}")
+                if args.write_manifest is not None:
+                    builder.write_manifest(args.write_manifest.resolve())
         except Exception as e:
             logging.error(f"An error occurred during report generation: {e}")
             sys.exit(1)
         finally:
+            builder.close()
+            if cache is not None:
+                cache.close()
+            if stats is not None:
+                stats.write(args.stats)
             logging.info("Project overview generation finished.")
 
 
@@ -0,0 +1,424 @@
+"""File ordering module for the txt2llm project.
+
+This module orders the files of a report by their place in the
+project's import graph, so that a report cut short by a context window
+or token budget keeps the entry points and core modules rather than
+whatever sorts last. Imports are found without running or fully
+parsing the code:
+
+- Python ``import`` and ``from ... import`` statements with `ast`,
+  after a regular expression located them;
+- JavaScript and TypeScript ``import``, ``export ... from``,
+  ``require()`` and ``import()`` of relative paths with a regular
+  expression;
+- Go import declarations with a regular expression. An import of a
+  package directory of the project depends on all of its non-test
+  files;
+- C and C++ ``#include "..."`` directives with a regular expression.
+
+Imports that do not resolve to a file of the report, such as the
+standard library or third-party packages, are dropped. Files are then
+ranked by PageRank over the edges from importing to imported files, so
+the modules the rest of the project builds on come first. With entry
+points, files are ranked by their import distance from the nearest
+entry point first, and files not reachable from any come last.
+
+Extracting the imports of a file is independent of all other files, so
+`extract_imports` can be cached per file version and run in worker
+processes; resolving and ranking work on the extracted imports only.
+"""
+
+import ast
+import collections
+import posixpath
+import re
+from typing import Iterable
+
+# The languages whose imports are extracted, as returned by
+# `utils.get_markdown_lang`.
+LANGUAGES = frozenset(
+    {"python", "javascript", "typescript", "go", "c", "cpp"}
+)
+
+# The damping factor and number of iterations of the PageRank ranking.
+_DAMPING = 0.85
+_ITERATIONS = 30
+
+# The start of a Python import statement, at any indentation.
+_PY_IMPORT = re.compile(
+    r"^[ \t]*(?:from[ \t]+[\w.]+[ \t]+)?import[ \t(\\]", re.MULTILINE
+)
+
+# A JavaScript or TypeScript module specifier after ``from``, ``import``,
+# ``import(`` or ``require(``.
+_JS_IMPORT = re.compile(
+    r"""(?:\bfrom|\bimport\s*\(?|\brequire\s*\()\s*(["'])([^"'\n]+)\1"""
+)
+
+# The file name suffixes a JavaScript or TypeScript specifier may omit.
+_JS_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+# A Go import declaration, either a single import or a parenthesized
+# block of them.
+_GO_IMPORT = re.compile(
+    r'^import\s*(?:\(([^)]*)\)|[\w.]*\s*"([^"]+)")', re.MULTILINE
+)
+_GO_PATH = re.compile(r'"([^"]+)"')
+
+# A C or C++ include of a project header.
+_C_INCLUDE = re.compile(r'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+
+def extract_imports(text: str, language: str) -> tuple[str, ...]:
+    """Finds the imports of a file.
+
+    Args:
+        text: The file content.
+        language: The Markdown language identifier of the content, one
+            of `LANGUAGES`.
+
+    Returns:
+        The import specifiers in order of appearance, without
+        duplicates: dotted module names for Python, with leading dots
+        for relative imports and the imported names appended for
+        ``from`` imports; the module specifiers of relative JavaScript
+        and TypeScript imports; Go package paths; and C include paths.
+        A Python file that does not parse has no imports.
+    """
+    if language == "python":
+        specs = _python_imports(text)
+    elif language in ("javascript", "typescript"):
+        specs = (
+            match.group(2)
+            for match in _JS_IMPORT.finditer(text)
+            if match.group(2).startswith(".")
+        )
+    elif language == "go":
+        specs = _go_imports(text)
+    elif language in ("c", "cpp"):
+        specs = _C_INCLUDE.findall(text)
+    else:
+        return ()
+    return tuple(dict.fromkeys(specs))
+
+
+def _python_imports(text: str) -> list[str]:
+    """Finds the imports of Python code.
+
+    Parsing a whole file with `ast` is far slower than finding its few
+    import statements, so the statements are located by a regular
+    expression, extended over parenthesized or backslash-continued
+    lines, and only they are parsed with `ast`. A string literal line
+    that looks like an import statement counts as one; a statement that
+    does not parse is skipped.
+    """
+    specs = []
+    for match in _PY_IMPORT.finditer(text):
+        try:
+            tree = ast.parse(_logical_line(text, match.start()).strip())
+        except (SyntaxError, ValueError):
+            continue
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                specs.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                base = "." * node.level + (node.module or "")
+                for alias in node.names:
+                    if alias.name == "*":
+                        specs.append(base)
+                    elif node.module:
+                        specs.append(f"{base}.{alias.name}")
+                    else:
+                        specs.append(base + alias.name)
+    return specs
+
+
+def _logical_line(text: str, start: int) -> str:
+    """Returns the Python logical line starting at an offset.
+
+    The line goes on while it ends with a backslash or has unclosed
+    parentheses.
+    """
+    end = text.find("\n", start)
+    while end != -1:
+        line = text[start:end]
+        if not line.rstrip().endswith("\\") and (
+            line.count("(") <= line.count(")")
+        ):
+            return line
+        end = text.find("\n", end + 1)
+    return text[start:]
+
+
+def _go_imports(text: str) -> list[str]:
+    """Finds the package paths of Go import declarations."""
+    specs = []
+    for match in _GO_IMPORT.finditer(text):
+        block, single = match.groups()
+        if single is not None:
+            specs.append(single)
+        else:
+            specs.extend(_GO_PATH.findall(block))
+    return specs
+
+
+class _Resolver:
+    """Resolves import specifiers to the files of a report."""
+
+    def __init__(self, files: list[str]):
+        """Indexes the files.
+
+        Args:
+            files: The POSIX paths of the files, relative to the root.
+        """
+        self.files = set(files)
+        package_dirs = {
+            posixpath.dirname(path)
+            for path in files
+            if posixpath.basename(path) == "__init__.py"
+        }
+        # Python files by dotted module name, both from the outermost
+        # package directory and from the project root.
+        self.modules: dict[str, list[str]] = collections.defaultdict(list)
+        # Go files by package directory, and the package directories by
+        # their last path component.
+        self.go_packages: dict[str, list[str]] = collections.defaultdict(
+            list
+        )
+        self.go_dirs: dict[str, list[str]] = collections.defaultdict(list)
+        # Files by base name, for C includes.
+        self.by_name: dict[str, list[str]] = collections.defaultdict(list)
+        for path in sorted(files):
+            if path.endswith(".py"):
+                for name in _module_names(path, package_dirs):
+                    self.modules[name].append(path)
+            elif path.endswith(".go") and not path.endswith("_test.go"):
+                self.go_packages[posixpath.dirname(path)].append(path)
+            self.by_name[posixpath.basename(path)].append(path)
+        for package in self.go_packages:
+            self.go_dirs[posixpath.basename(package)].append(package)
+
+    def resolve(self, importer: str, spec: str) -> list[str]:
+        """Returns the files an import of a file refers to."""
+        if importer.endswith(".py"):
+            target = self._python(importer, spec)
+        elif importer.endswith(".go"):
+            return self._go(importer, spec)
+        elif importer.endswith(_JS_SUFFIXES):
+            target = self._javascript(importer, spec)
+        else:
+            target = self._include(importer, spec)
+        return [] if target is None else [target]
+
+    def _python(self, importer: str, spec: str) -> str | None:
+        """Resolves a Python module name, trying its parent second."""
+        stripped = spec.lstrip(".")
+        level = len(spec) - len(stripped)
+        names = [stripped]
+        if "." in stripped or (level and stripped):
+            names.append(stripped.rpartition(".")[0])
+        if level:
+            base = posixpath.dirname(importer)
+            for _ in range(level - 1):
+                base = posixpath.dirname(base)
+            for name in names:
+                module = base
+                if name:
+                    module = posixpath.join(base, name.replace(".", "/"))
+                target = self._python_file(module)
+                if target is not None:
+                    return target
+            return None
+        importer_dir = posixpath.dirname(importer)
+        for name in names:
+            # Scripts import their sibling modules without a package.
+            if not name:
+                break
+            sibling = posixpath.join(importer_dir, name.replace(".", "/"))
+            target = self._python_file(sibling)
+            if target is not None:
+                return target
+            candidates = self.modules.get(name)
+            if candidates:
+                return _closest(importer, candidates)
+        return None
+
+    def _python_file(self, module: str) -> str | None:
+        """Returns the file of a module path, if it is in the report."""
+        for path in (f"{module}.py", posixpath.join(module, "__init__.py")):
+            path = posixpath.normpath(path)
+            if path in self.files:
+                return path
+        return None
+
+    def _javascript(self, importer: str, spec: str) -> str | None:
+        """Resolves a relative JavaScript or TypeScript specifier."""
+        path = posixpath.normpath(
+            posixpath.join(posixpath.dirname(importer), spec)
+        )
+        stem, ext = posixpath.splitext(path)
+        candidates = [path]
+        if ext in (".js", ".jsx"):
+            # TypeScript imports name the compiled file.
+            candidates += [stem + ".ts", stem + ".tsx"]
+        candidates += [path + suffix for suffix in _JS_SUFFIXES]
+        candidates += [f"{path}/index{suffix}" for suffix in _JS_SUFFIXES]
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _go(self, importer: str, spec: str) -> list[str]:
+        """Resolves a Go package path to the files of the package."""
+        matches = [
+            package
+            for package in self.go_dirs.get(posixpath.basename(spec), ())
+            if spec == package or spec.endswith("/" + package)
+        ]
+        if not matches:
+            return []
+        package = max(matches, key=len)
+        return [path for path in self.go_packages[package] if path != importer]
+
+    def _include(self, importer: str, spec: str) -> str | None:
+        """Resolves a C include, first next to the including file."""
+        path = posixpath.normpath(
+            posixpath.join(posixpath.dirname(importer), spec)
+        )
+        if path in self.files:
+            return path
+        candidates = [
+            candidate
+            for candidate in self.by_name.get(posixpath.basename(spec), ())
+            if candidate == spec or candidate.endswith("/" + spec)
+        ]
+        return _closest(importer, candidates) if candidates else None
+
+
+def _module_names(path: str, package_dirs: set[str]) -> list[str]:
+    """Returns the dotted names a Python file can be imported by.
+
+    The first name starts at the outermost package directory containing
+    the file, e.g. ``txt2llm.core`` for ``src/txt2llm/core.py``; the
+    second at the project root.
+    """
+    parts = path[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    start = len(parts) - 1
+    while start > 0 and "/".join(parts[:start]) in package_dirs:
+        start -= 1
+    names = [".".join(parts[start:]), ".".join(parts)]
+    return [name for name in dict.fromkeys(names) if name]
+
+
+def _closest(importer: str, candidates: list[str]) -> str:
+    """Returns the candidate sharing the most directories with a file."""
+    importer_dirs = importer.split("/")[:-1]
+
+    def shared(candidate: str) -> int:
+        count = 0
+        for a, b in zip(importer_dirs, candidate.split("/")[:-1]):
+            if a != b:
+                break
+            count += 1
+        return count
+
+    return min(candidates, key=lambda candidate: -shared(candidate))
+
+
+def build_graph(
+    files: list[str], imports: dict[str, tuple[str, ...]]
+) -> dict[str, set[str]]:
+    """Resolves the imports of files into a dependency graph.
+
+    Args:
+        files: The POSIX paths of the report's files.
+        imports: The import specifiers of files, see `extract_imports`.
+            Files without an entry have no imports.
+
+    Returns:
+        The files each file imports, for files importing any.
+    """
+    resolver = _Resolver(files)
+    graph = {}
+    for importer, specs in imports.items():
+        targets = set()
+        for spec in specs:
+            targets.update(resolver.resolve(importer, spec))
+        targets.discard(importer)
+        if targets:
+            graph[importer] = targets
+    return graph
+
+
+def rank(
+    files: list[str],
+    graph: dict[str, set[str]],
+    entry_points: Iterable[str] = (),
+) -> list[str]:
+    """Orders files by their importance in a dependency graph.
+
+    Args:
+        files: The POSIX paths of the files, in their fallback order.
+        graph: The files each file imports, see `build_graph`.
+        entry_points: Files to rank by import distance from. Entry
+            points that are not among ``files`` are ignored.
+
+    Returns:
+        The files by ascending distance from the nearest entry point,
+        if any, then by descending PageRank, then in their given order.
+    """
+    scores = _pagerank(files, graph)
+    distances = _distances(graph, [f for f in entry_points if f in scores])
+    unreachable = len(files)
+    position = {path: index for index, path in enumerate(files)}
+    return sorted(
+        files,
+        key=lambda path: (
+            distances.get(path, unreachable),
+            -scores[path],
+            position[path],
+        ),
+    )
+
+
+def _pagerank(
+    files: list[str], graph: dict[str, set[str]]
+) -> dict[str, float]:
+    """Scores files by PageRank, with rank flowing to imported files."""
+    count = len(files)
+    if not count:
+        return {}
+    scores = dict.fromkeys(files, 1 / count)
+    edges = [
+        (importer, sorted(targets)) for importer, targets in graph.items()
+    ]
+    for _ in range(_ITERATIONS):
+        # Files without imports spread their score over all files.
+        dangling = sum(scores.values()) - sum(
+            scores[importer] for importer, _ in edges
+        )
+        base = (1 - _DAMPING + _DAMPING * dangling) / count
+        updated = dict.fromkeys(files, base)
+        for importer, targets in edges:
+            share = _DAMPING * scores[importer] / len(targets)
+            for target in targets:
+                updated[target] += share
+        scores = updated
+    return scores
+
+
+def _distances(
+    graph: dict[str, set[str]], entry_points: list[str]
+) -> dict[str, int]:
+    """Returns the import distances of files from the entry points."""
+    distances = dict.fromkeys(entry_points, 0)
+    queue = collections.deque(entry_points)
+    while queue:
+        path = queue.popleft()
+        for target in sorted(graph.get(path, ())):
+            if target not in distances:
+                distances[target] = distances[path] + 1
+                queue.append(target)
+    return distances
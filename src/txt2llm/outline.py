@@ -0,0 +1,339 @@
+"""Outline module for the txt2llm project.
+
+This module reduces a source file to its outline: what a reader needs
+to find their way around a codebase, without the function bodies that
+make up most of it. An outline keeps
+
+- the module docstring, class and function signatures, with their
+  decorators, and the top-level and class-level constants of Python
+  code, found with `ast`. A body is replaced by ``...``;
+- the declarations of C, C++, Java, JavaScript, TypeScript, Go and Rust
+  code, found by a line-based scanner that follows braces. Function
+  and other bodies are replaced by ``{ ... }``, while the members of
+  classes, structs, interfaces, enums, namespaces and ``impl`` blocks
+  are kept.
+
+The scanner for brace languages works on the output of
+`compact.compact`, so comments never hide or fake a brace, and string
+literals are blanked before braces are counted. It cannot fail; at worst
+a statement it cannot follow is cut short. A Python file that does not
+parse has no outline and is shown in full.
+"""
+
+import ast
+import re
+from pathlib import Path
+
+from . import compact, utils
+
+# The languages that have an outline, as returned by
+# `utils.get_markdown_lang`.
+LANGUAGES = frozenset(
+    {"python", "c", "cpp", "java", "javascript", "typescript", "go", "rust"}
+)
+
+# The longest constant or statement, in lines, that is shown in full.
+# Longer ones are cut after their first line.
+_MAX_STATEMENT_LINES = 10
+
+# A string or character literal of a brace language.
+_STRING = re.compile(
+    r""""(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|`(?:\\.|[^`\\])*`"""
+)
+
+# A block header whose members are part of the outline, unless it has
+# parentheses, as a C function returning a struct does.
+_TYPE_BLOCK = re.compile(
+    r"\b(?:class|struct|interface|enum|union|namespace|impl|trait|mod)\b"
+    r"|^\s*(?:export\s+)?(?:declare\s+)?type\s+\w+[^=]*=\s*\{"
+)
+
+# Characters ending a line whose statement goes on in the next line.
+_CONTINUATION_CHARS = "=+-*/%&|^<>?:\\("
+
+
+def has_outline(ext: str) -> bool:
+    """Checks whether the files with an extension have an outline."""
+    return utils.get_markdown_lang(Path("file" + ext)) in LANGUAGES
+
+
+def outline(text: str, language: str) -> str | None:
+    """Reduces a file to its outline.
+
+    Args:
+        text: The file content.
+        language: The Markdown language identifier of the content, e.g.
+            ``python``.
+
+    Returns:
+        The outline, ending with a newline if ``text`` does, or None if
+        the language has no outline or the Python code does not parse.
+    """
+    if language == "python":
+        lines = _python_outline(text)
+    elif language in LANGUAGES:
+        lines = _brace_outline(text, language)
+    else:
+        return None
+    if lines is None:
+        return None
+    result = "\n".join(lines)
+    if result and text.endswith("\n"):
+        result += "\n"
+    return result
+
+
+def _python_outline(text: str) -> list[str] | None:
+    """Outlines Python code.
+
+    Returns:
+        The lines of the outline, or None if the code does not parse.
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    lines = text.splitlines()
+    result = []
+    body = tree.body
+    if body and _is_docstring(body[0]):
+        result.extend(lines[body[0].lineno - 1 : body[0].end_lineno])
+        body = body[1:]
+    _python_block(body, lines, result, top_level=True)
+    return result
+
+
+def _is_docstring(node: ast.stmt) -> bool:
+    """Checks whether a statement is a string literal expression."""
+    return (
+        isinstance(node, ast.Expr)
+        and isinstance(node.value, ast.Constant)
+        and isinstance(node.value.value, str)
+    )
+
+
+def _python_block(
+    body: list[ast.stmt],
+    lines: list[str],
+    result: list[str],
+    top_level: bool = False,
+) -> None:
+    """Appends the outline of a module or class body.
+
+    Args:
+        body: The statements of the body.
+        lines: The source lines of the file.
+        result: The outline lines so far, extended in place.
+        top_level: Whether the body is the module's. Top-level classes
+            and functions are separated by a blank line.
+    """
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if top_level and result:
+                result.append("")
+            result.extend(_python_header(node, lines))
+        elif isinstance(node, ast.ClassDef):
+            if top_level and result:
+                result.append("")
+            header = _python_header(node, lines)
+            if header[-1].strip() != "...":
+                # A one-line class, e.g. ``class Error(Exception): pass``.
+                result.extend(header)
+                continue
+            result.extend(header[:-1])
+            start = len(result)
+            _python_block(node.body, lines, result)
+            if len(result) == start:
+                result.append(header[-1])
+        elif _is_constant(node, in_class=not top_level):
+            result.extend(_python_constant(node, lines))
+
+
+def _python_header(
+    node: ast.FunctionDef | ast.AsyncFunctionDef | ast.ClassDef,
+    lines: list[str],
+) -> list[str]:
+    """Returns the decorators and signature of a definition.
+
+    The last line is the ``...`` standing in for the body, indented like
+    the body. A definition whose body starts on its signature line, e.g.
+    ``def f(): pass``, is returned up to that line, without a ``...``
+    line.
+    """
+    start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+    first = node.body[0]
+    if first.lineno == node.lineno:
+        return lines[start - 1 : node.lineno]
+    end = first.lineno - 1
+    # Leave out comments and blank lines between the signature and body.
+    while end > node.lineno and lines[end - 1].strip()[:1] in ("#", ""):
+        end -= 1
+    indent = lines[first.lineno - 1][: first.col_offset]
+    return lines[start - 1 : end] + [f"{indent}..."]
+
+
+def _is_constant(node: ast.stmt, in_class: bool) -> bool:
+    """Checks whether a statement defines a constant or class field.
+
+    Constants are assignments to upper-case or dunder names, e.g.
+    ``MAX_SIZE`` or ``__all__``. In a class body, annotated assignments,
+    such as dataclass fields, count as well.
+    """
+    if isinstance(node, ast.AnnAssign):
+        return in_class or _is_constant_name(node.target)
+    if isinstance(node, ast.Assign):
+        return all(map(_is_constant_name, node.targets))
+    return False
+
+
+def _is_constant_name(target: ast.expr) -> bool:
+    """Checks whether an assignment target is a constant's name."""
+    if not isinstance(target, ast.Name):
+        return False
+    name = target.id
+    return name.isupper() or name.startswith("__") and name.endswith("__")
+
+
+def _python_constant(
+    node: ast.Assign | ast.AnnAssign, lines: list[str]
+) -> list[str]:
+    """Returns the lines of a constant, eliding a long value."""
+    if node.end_lineno - node.lineno < _MAX_STATEMENT_LINES:
+        return lines[node.lineno - 1 : node.end_lineno]
+    indent = lines[node.lineno - 1][: node.col_offset]
+    if isinstance(node, ast.AnnAssign):
+        target = ast.unparse(node.target)
+        target += f": {ast.unparse(node.annotation)}"
+    else:
+        target = " = ".join(map(ast.unparse, node.targets))
+    return [f"{indent}{target} = ..."]
+
+
+def _brace_outline(text: str, language: str) -> list[str]:
+    """Outlines the code of a brace language.
+
+    Lines are collected into statements until a statement is complete
+    or opens a block. A block opened by a type or namespace header is
+    entered and its members outlined; any other block is replaced by
+    ``{ ... }`` and skipped up to its closing brace. So is a block that
+    is closed in the line that opens it, e.g. the body of
+    ``int one() { return 1; }``, see `_collapse_bodies`.
+
+    Args:
+        text: The file content.
+        language: The Markdown language identifier of the content.
+
+    Returns:
+        The lines of the outline.
+    """
+    result = []
+    # The code of the current statement, with string literals blanked.
+    statement: list[str] = []
+    code: list[str] = []
+    depth = 0
+    # The depth at which a skipped body ends, if a body is skipped.
+    skip_depth = None
+    for line in compact.compact(text, language).splitlines():
+        line_code = _STRING.sub(_blank, line)
+        new_depth = depth + line_code.count("{") - line_code.count("}")
+        new_depth = max(new_depth, 0)
+        if skip_depth is not None:
+            depth = new_depth
+            if depth <= skip_depth:
+                skip_depth = None
+            continue
+        if not line.strip():
+            # Keep single blank lines between declarations.
+            if not statement and result and result[-1]:
+                result.append("")
+            continue
+        statement.append(line)
+        code.append(line_code)
+        if new_depth > depth:
+            header = "\n".join(code)
+            if _TYPE_BLOCK.search(header) and "(" not in header:
+                result.extend(statement)
+            else:
+                cut = code[-1].index("{") + 1
+                result.extend(statement[:-1])
+                result.append(statement[-1][:cut] + " ... }")
+                skip_depth = depth
+        elif new_depth == depth and _continues(code):
+            continue
+        else:
+            result.extend(_statement_lines(_collapse_bodies(statement, code)))
+        statement, code = [], []
+        depth = new_depth
+    result.extend(_statement_lines(statement))
+    while result and not result[-1]:
+        result.pop()
+    return result
+
+
+def _blank(match: re.Match) -> str:
+    """Replaces the content of a string literal with spaces."""
+    literal = match.group()
+    return literal[0] + " " * (len(literal) - 2) + literal[-1]
+
+
+def _continues(code: list[str]) -> bool:
+    """Checks whether a statement goes on in the next line."""
+    if code[0].lstrip().startswith("#"):
+        # A preprocessor directive, e.g. ``#include <stdio.h>``.
+        return code[-1].endswith("\\")
+    joined = "".join(code)
+    if joined.count("(") > joined.count(")"):
+        return True
+    if joined.count("[") > joined.count("]"):
+        return True
+    return code[-1].rstrip()[-1:] in tuple(_CONTINUATION_CHARS)
+
+
+def _collapse_bodies(statement: list[str], code: list[str]) -> list[str]:
+    """Elides the blocks opened and closed within the lines of a statement.
+
+    The first block of each line is replaced by ``{ ... }``, unless it is
+    empty. A statement that is a type block, e.g. ``struct p { int x; };``,
+    is returned unchanged, as its members are part of the outline.
+
+    Args:
+        statement: The lines of the statement.
+        code: The lines of the statement, with string literals blanked.
+
+    Returns:
+        The lines of the statement with the blocks elided.
+    """
+    header = "\n".join(code)
+    if _TYPE_BLOCK.search(header) and "(" not in header:
+        return statement
+    return [
+        _collapse_body(line, line_code)
+        for line, line_code in zip(statement, code)
+    ]
+
+
+def _collapse_body(line: str, line_code: str) -> str:
+    """Elides the first block of a line, if the line closes it."""
+    start = line_code.find("{")
+    if start < 0:
+        return line
+    depth = 0
+    for end in range(start, len(line_code)):
+        if line_code[end] == "{":
+            depth += 1
+        elif line_code[end] == "}":
+            depth -= 1
+            if depth == 0:
+                break
+    else:
+        return line
+    if not line_code[start + 1 : end].strip():
+        return line
+    return f"{line[: start + 1]} ... {line[end:]}"
+
+
+def _statement_lines(statement: list[str]) -> list[str]:
+    """Returns the lines of a statement, cutting a long one short."""
+    if len(statement) <= _MAX_STATEMENT_LINES:
+        return statement
+    return [statement[0].rstrip() + " ..."]
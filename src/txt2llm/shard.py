@@ -0,0 +1,256 @@
+"""Sharded output module for the txt2llm project.
+
+This module splits a report into numbered part files, each small enough
+to fit a size limit measured in bytes or tokens. Every part starts with
+a compact header and a table of contents of the sections it holds.
+Sections are never split across parts unless a single section exceeds
+the limit on its own, in which case its fenced block is closed at the
+end of each part and reopened in the next. An unfenced section, such as
+a listing, is split between lines.
+
+Parts are written and closed as soon as they are full, so at most one
+part's worth of sections is held in memory. A compressed output name,
+e.g. ``report.txt.gz``, compresses every part; the limit still applies
+to the uncompressed text.
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable
+
+from . import compress
+
+
+def utf8_size(text: str) -> int:
+    """Returns the UTF-8 encoded size of a text, in bytes."""
+    # ASCII text, the common case, is measured without encoding it.
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+class ShardWriter:
+    """Writes report sections into size-limited part files.
+
+    Attributes:
+        output_path: The report path the part names are derived from,
+            e.g. ``report.txt`` yields ``report_part001.txt`` and
+            ``report.txt.gz`` yields ``report_part001.txt.gz``.
+        project_name: The project name shown in each part header.
+        limit: The maximum size of a part, in units of ``measure``.
+        parts: The paths of the parts written so far.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        project_name: str,
+        limit: int,
+        measure: Callable[[str], int] = utf8_size,
+        compress_level: int | None = None,
+    ):
+        """Initializes the writer.
+
+        Args:
+            output_path: The report path the part names are derived from.
+            project_name: The project name shown in each part header.
+            limit: The maximum size of a part.
+            measure: A function returning the size of a text, e.g.
+                `utf8_size` or a tokenizer's ``count`` method.
+            compress_level: The compression level of compressed parts,
+                see `compress.open_text`.
+        """
+        self.output_path = output_path
+        self.project_name = project_name
+        self.limit = limit
+        self.parts: list[Path] = []
+        self._measure = measure
+        self._compress_level = compress_level
+        self._titles: list[str] = []
+        self._sections: list[str] = []
+        self._size = 0
+
+    def _part_path(self, number: int) -> Path:
+        """Returns the path of a part, numbered from 1."""
+        plain = compress.plain_name(self.output_path)
+        name = f"{plain.stem}_part{number:03d}{plain.suffix}"
+        if plain != self.output_path:
+            name += self.output_path.suffix
+        return self.output_path.with_name(name)
+
+    def _header(self, number: int, toc: str = "") -> str:
+        """Returns a part header.
+
+        Args:
+            number: The part number, starting from 1.
+            toc: The table of contents lines of the part.
+
+        Returns:
+            The header, including its table of contents.
+        """
+        return (
+            f"# Project Overview: {self.project_name} (part {number:03d})\n"
+            "\n"
+            "## Contents\n"
+            "\n"
+            f"{toc}"
+            "\n"
+            "---\n"
+            "\n"
+        )
+
+    @staticmethod
+    def _toc_line(title: str) -> str:
+        """Returns the table of contents line of a section."""
+        return f"- {title}\n"
+
+    def _overhead(self, number: int) -> int:
+        """Returns the size of a part header with an empty contents list."""
+        return self._measure(self._header(number))
+
+    def _fits(self, title: str, text: str) -> bool:
+        """Checks whether a section fits into the current part."""
+        extra = self._measure(self._toc_line(title)) + self._measure(text)
+        if self._sections:
+            extra += 1  # The blank line separating sections.
+        else:
+            extra += self._overhead(len(self.parts) + 1)
+        return self._size + extra <= self.limit
+
+    def _append(self, title: str, text: str) -> None:
+        """Appends a section to the current part."""
+        if not self._sections:
+            self._size = self._overhead(len(self.parts) + 1)
+        else:
+            self._size += 1
+        self._titles.append(title)
+        self._sections.append(text)
+        self._size += self._measure(self._toc_line(title))
+        self._size += self._measure(text)
+
+    def _flush(self) -> None:
+        """Writes the current part, if any, and starts a new one."""
+        if not self._sections:
+            return
+        number = len(self.parts) + 1
+        path = self._part_path(number)
+        header = self._header(
+            number, "".join(self._toc_line(t) for t in self._titles)
+        )
+        with compress.open_text(path, self._compress_level) as fp:
+            fp.write(header)
+            fp.write("\n".join(self._sections))
+        logging.info(f"Wrote report part {path}")
+        self.parts.append(path)
+        self._titles = []
+        self._sections = []
+        self._size = 0
+
+    def add(self, title: str, text: str) -> None:
+        """Adds a section, starting a new part when the current one is full.
+
+        Args:
+            title: The section title listed in the table of contents.
+            text: The section text in the report's section format: a
+                heading line, a blank line, a fenced block, and a
+                trailing newline. Instead of the fenced block, the
+                section may have unfenced lines, e.g. a list.
+
+        Raises:
+            ValueError: If the limit is too small to hold even a part
+                header and a single line of the section.
+        """
+        if self._fits(title, text):
+            self._append(title, text)
+            return
+        self._flush()
+        if self._fits(title, text):
+            self._append(title, text)
+            return
+
+        pieces = self._split(title, text)
+        for piece_title, piece in pieces[:-1]:
+            self._append(piece_title, piece)
+            self._flush()
+        self._append(*pieces[-1])
+
+    def _split(self, title: str, text: str) -> list[tuple[str, str]]:
+        """Splits an oversized section into pieces that each fill a part.
+
+        The section's fenced block is closed at the end of every piece
+        and reopened at the start of the next, under a ``(continued)``
+        heading. The lines of an unfenced section are split between
+        pieces as they are.
+
+        Args:
+            title: The section title.
+            text: The section text.
+
+        Returns:
+            The ``(title, text)`` pairs of the pieces, in order.
+
+        Raises:
+            ValueError: If not even a single character fits into a part.
+        """
+        lines = text.splitlines(keepends=True)
+        heading = lines[0].rstrip("\n")
+        if len(lines) > 3 and lines[2].startswith("```"):
+            fence, body, closing = lines[2], lines[3:-1], lines[-1]
+        else:
+            fence, body, closing = "", lines[2:], ""
+
+        pieces: list[tuple[str, str]] = []
+        current: list[str] = []
+        used = 0
+        capacity = 0
+
+        def start_piece() -> None:
+            nonlocal capacity, used
+            piece_title = title if not pieces else f"{title} (continued)"
+            piece_heading = heading if not pieces else f"{heading} (continued)"
+            frame = f"{piece_heading}\n\n{fence}{closing}"
+            capacity = (
+                self.limit
+                - self._overhead(len(self.parts) + len(pieces) + 1)
+                - self._measure(self._toc_line(piece_title))
+                - self._measure(frame)
+            )
+            if capacity < 4:
+                raise ValueError(
+                    f"Split limit {self.limit} is too small for a part."
+                )
+            used = 0
+            current.clear()
+            current.append(f"{piece_heading}\n\n{fence}")
+
+        def end_piece() -> None:
+            piece_title = title if not pieces else f"{title} (continued)"
+            pieces.append((piece_title, "".join(current) + closing))
+
+        start_piece()
+        for line in body:
+            size = self._measure(line)
+            if used + size > capacity and used:
+                end_piece()
+                start_piece()
+            if size <= capacity:
+                current.append(line)
+                used += size
+                continue
+            # A single line longer than a whole part: split it hard. Four
+            # bytes per character is the worst case for UTF-8.
+            step = max(capacity // 4, 1)
+            for start in range(0, len(line), step):
+                chunk = line[start:start + step]
+                if not chunk.endswith("\n"):
+                    chunk += "\n"
+                if used + self._measure(chunk) > capacity and used:
+                    end_piece()
+                    start_piece()
+                current.append(chunk)
+                used += self._measure(chunk)
+        end_piece()
+        return pieces
+
+    def close(self) -> list[Path]:
+        """Writes the last part and returns the paths of all parts."""
+        self._flush()
+        return self.parts
@@ -0,0 +1,176 @@
+"""Run statistics module for the txt2llm project.
+
+This module collects timing and I/O metrics of a report run: wall and
+CPU time per phase, counters such as directories visited, files opened
+and bytes read or emitted, and the slowest files. The metrics can be
+written as JSON with `Stats.write`.
+
+Collection is opt-in. Code paths take an optional `Stats` and skip all
+bookkeeping when it is None, so a run without statistics pays for
+nothing but a few ``is None`` checks.
+"""
+
+import collections
+import contextlib
+import cProfile
+import dataclasses
+import heapq
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+# Default number of slowest files kept in the statistics.
+DEFAULT_SLOWEST = 10
+
+
+@dataclasses.dataclass
+class PhaseTime:
+    """The accumulated time spent in one phase.
+
+    Attributes:
+        wall: The wall-clock time, in seconds.
+        cpu: The CPU time, in seconds. Phases that run on the report
+            writer's thread are charged the CPU time of the whole
+            process; phases that run per file are charged the CPU time
+            of the thread doing the work.
+        calls: The number of times the phase was entered.
+    """
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+
+
+class Stats:
+    """Collects the metrics of one report run.
+
+    All recording methods are thread-safe, so reader threads can record
+    per-file metrics while the writer records its phases.
+
+    Attributes:
+        phases: The accumulated time of each phase, by name.
+        counters: Event and volume counters, by name.
+        slowest: The maximum number of slowest files kept.
+    """
+
+    def __init__(self, slowest: int = DEFAULT_SLOWEST):
+        """Initializes empty statistics.
+
+        Args:
+            slowest: The maximum number of slowest files kept.
+        """
+        self.phases: dict[str, PhaseTime] = collections.defaultdict(
+            PhaseTime
+        )
+        self.counters: collections.Counter[str] = collections.Counter()
+        self.slowest = slowest
+        self._files: list[tuple[float, str, int]] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as part of a phase.
+
+        Args:
+            name: The phase name, e.g. ``scan``.
+        """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.add_time(
+                name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+            )
+
+    def add_time(self, name: str, wall: float, cpu: float = 0.0) -> None:
+        """Adds time to a phase.
+
+        Args:
+            name: The phase name.
+            wall: The wall-clock time, in seconds.
+            cpu: The CPU time, in seconds.
+        """
+        with self._lock:
+            phase = self.phases[name]
+            phase.wall += wall
+            phase.cpu += cpu
+            phase.calls += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increments a counter.
+
+        Args:
+            name: The counter name, e.g. ``files_opened``.
+            amount: The amount to add.
+        """
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_file(self, rel_path: str, seconds: float, size: int) -> None:
+        """Records the time spent rendering one file.
+
+        Args:
+            rel_path: The POSIX path of the file, relative to the root.
+            seconds: The wall-clock time spent on the file.
+            size: The length of the rendered section, in characters.
+        """
+        entry = (seconds, rel_path, size)
+        with self._lock:
+            if len(self._files) < self.slowest:
+                heapq.heappush(self._files, entry)
+            elif self._files and entry > self._files[0]:
+                heapq.heapreplace(self._files, entry)
+
+    def to_dict(self) -> dict:
+        """Returns the statistics as a JSON-serializable dictionary."""
+        with self._lock:
+            slowest = sorted(self._files, reverse=True)
+            return {
+                "phases": {
+                    name: dataclasses.asdict(phase)
+                    for name, phase in sorted(self.phases.items())
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "slowest_files": [
+                    {"path": path, "seconds": seconds, "chars": size}
+                    for seconds, path, size in slowest
+                ],
+            }
+
+    def write(self, path: Path) -> None:
+        """Writes the statistics as JSON.
+
+        Args:
+            path: The path of the JSON file.
+        """
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        logging.info(f"Run statistics written to {path}")
+
+
+@contextlib.contextmanager
+def profiled(path: Path | None) -> Iterator[None]:
+    """Runs the enclosed block under cProfile, if a path is given.
+
+    Only the calling thread is profiled; reader threads started by
+    ``--jobs`` are not.
+
+    Args:
+        path: Where to dump the profile in ``pstats`` format, or None to
+            run the block unprofiled.
+    """
+    if path is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
+        logging.info(f"Profile written to {path}")
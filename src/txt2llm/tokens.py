@@ -0,0 +1,101 @@
+"""Token estimation module for the txt2llm project.
+
+This module provides tokenizers used to estimate how much of an LLM
+context window the report occupies. The default `HeuristicTokenizer`
+needs no dependencies and runs at C speed; an exact tokenizer can be
+plugged in through the `Tokenizer` protocol, e.g. `TiktokenTokenizer`
+when the optional ``tiktoken`` package is installed.
+
+Example:
+    tokenizer = get_tokenizer("tiktoken:cl100k_base")
+    tokenizer.count("def main(): pass")
+"""
+
+from typing import Protocol
+
+
+class Tokenizer(Protocol):
+    """Counts the tokens of a piece of text.
+
+    Counts must be additive enough that the sum over consecutive chunks
+    of a text is a usable estimate for the whole text.
+    """
+
+    def count(self, text: str) -> int:
+        """Returns the number of tokens in ``text``."""
+
+
+class HeuristicTokenizer:
+    """Estimates token counts from character classes.
+
+    ASCII text averages about four characters per token for both code
+    and prose in common BPE vocabularies, while CJK and other non-ASCII
+    characters are usually one token or more each. The estimate only
+    needs the character count and the UTF-8 byte count, both of which
+    are computed in C.
+    """
+
+    _CHARS_PER_TOKEN = 4
+
+    def count(self, text: str) -> int:
+        """Returns the estimated number of tokens in ``text``."""
+        chars = len(text)
+        if text.isascii():
+            return -(-chars // self._CHARS_PER_TOKEN)
+        # Multi-byte characters add 1 to 3 extra UTF-8 bytes each;
+        # assume 2 on average, i.e. mostly CJK text.
+        non_ascii = (len(text.encode("utf-8", "surrogatepass")) - chars) // 2
+        ascii_chars = max(chars - non_ascii, 0)
+        return -(-ascii_chars // self._CHARS_PER_TOKEN) + non_ascii
+
+
+class TiktokenTokenizer:
+    """Counts tokens exactly with a ``tiktoken`` encoding.
+
+    Attributes:
+        encoding_name: The name of the tiktoken encoding in use.
+    """
+
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        """Loads a tiktoken encoding.
+
+        Args:
+            encoding_name: The name of the encoding, e.g. ``cl100k_base``.
+
+        Raises:
+            ImportError: If the optional ``tiktoken`` package is missing.
+        """
+        try:
+            import tiktoken
+        except ImportError as e:
+            raise ImportError(
+                "The 'tiktoken' tokenizer requires the optional tiktoken "
+                "package: pip install tiktoken"
+            ) from e
+        self.encoding_name = encoding_name
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(self, text: str) -> int:
+        """Returns the exact number of tokens in ``text``."""
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+def get_tokenizer(spec: str) -> Tokenizer:
+    """Creates a tokenizer from its command-line specification.
+
+    Args:
+        spec: Either ``heuristic`` or ``tiktoken[:<encoding>]``.
+
+    Returns:
+        The requested tokenizer.
+
+    Raises:
+        ValueError: If the specification is not recognized.
+        ImportError: If the tokenizer needs a package that is missing.
+    """
+    name, _, option = spec.partition(":")
+    if name == "heuristic" and not option:
+        return HeuristicTokenizer()
+    if name == "tiktoken":
+        return TiktokenTokenizer(option or "cl100k_base")
+    raise ValueError(f"Unknown tokenizer: {spec!r}")
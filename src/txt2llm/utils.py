@@ -1,11 +1,26 @@
 """Utilities module for the txt2llm project.
 
 This module provides helper functions for file operations, such as
-determining if a file is binary and getting the appropriate Markdown
-language identifier for a given file extension.
+determining if a file is binary, reading a text file with a single open
+and detecting its encoding, reading head and tail excerpts of files too
+large to include, and getting the appropriate Markdown language
+identifier for a given file extension. The decoding and excerpt
+functions also work on raw bytes and streams, e.g. archive members.
 """
 
+import mmap
+import os
+import time
 from pathlib import Path
+from typing import AnyStr, BinaryIO
+
+from . import encoding
+from .dedup import Digest
+from .stats import Stats
+
+# Files at least this large are memory-mapped instead of read into a
+# bytes object before decoding.
+_MMAP_THRESHOLD = 1024 * 1024
 
 _MARKDOWN_LANG_MAP = {
     ".py": "python",
@@ -59,7 +74,300 @@ def is_binary_file(file_path: Path) -> bool:
     """
     try:
         with open(file_path, "rb") as f:
-            chunk = f.read(4096)  # Read first 4KB
-        return b"\x00" in chunk
+            chunk = f.read(encoding.SNIFF_SIZE)  # Read first 4KB
+        return encoding.has_null_byte(chunk)
     except IOError:
         return False  # Could not read the file
+
+
+def read_text_file(
+    file_path: Path,
+    stats: Stats | None = None,
+    digest: Digest | None = None,
+) -> tuple[str, str] | None:
+    """Reads a text file, or detects a binary one, with a single open.
+
+    The file is opened once in binary mode and its content is checked
+    and decoded by `decode_text`. Files of at least 1 MiB are
+    memory-mapped and decoded straight from the mapping, without an
+    intermediate bytes copy.
+
+    Args:
+        file_path: The path to the file.
+        stats: Optional run statistics. When given, the ``read`` phase
+            is timed and the opened files and bytes read are counted,
+            along with the statistics of `decode_text`. Pages of a
+            mapped file are faulted in during the later phases.
+        digest: An optional ``hashlib`` object that is updated with the
+            raw bytes of a text file, straight from the read buffer or
+            mapping. It is left untouched for binary files.
+
+    Returns:
+        A tuple of the decoded file content and the name of its
+        encoding, or None if the file is likely binary.
+
+    Raises:
+        OSError: If the file cannot be opened or read.
+    """
+    if stats is not None:
+        start = time.perf_counter()
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if stats is not None:
+            stats.count("files_opened")
+            stats.count("bytes_read", size)
+        if size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if stats is not None:
+                    stats.add_time("read", time.perf_counter() - start)
+                return decode_text(mm, stats, digest)
+        data = f.read()
+    if stats is not None:
+        stats.add_time("read", time.perf_counter() - start)
+    return decode_text(data, stats, digest)
+
+
+def decode_text(
+    data: bytes | mmap.mmap,
+    stats: Stats | None = None,
+    digest: Digest | None = None,
+) -> tuple[str, str] | None:
+    """Decodes the raw content of a file, or detects binary content.
+
+    The first block is checked for a byte order mark and with the same
+    null-byte heuristic as `is_binary_file`, and the content is decoded
+    only if it is text, see `encoding.decode`. Line endings are
+    normalized to ``\\n`` as in text-mode reads.
+
+    Args:
+        data: The raw content of the file.
+        stats: Optional run statistics. When given, the ``sniff`` and
+            ``decode`` phases are timed and the binary files and text
+            files by encoding are counted.
+        digest: An optional ``hashlib`` object that is updated with the
+            content if it is text.
+
+    Returns:
+        A tuple of the decoded content and the name of its encoding, or
+        None if the content is likely binary.
+    """
+    if stats is not None:
+        start = time.perf_counter()
+    binary, codec = encoding.sniff(data)
+    if stats is not None:
+        sniffed = time.perf_counter()
+        stats.add_time("sniff", sniffed - start)
+    if binary:
+        if stats is not None:
+            stats.count("binary_files")
+        return None
+    if digest is not None:
+        digest.update(data)
+    text, codec = encoding.decode(data, codec)
+    if stats is not None:
+        stats.add_time("decode", time.perf_counter() - sniffed)
+        stats.count(f"files_by_encoding.{codec}")
+    return _normalize_newlines(text), codec
+
+
+def _normalize_newlines(text: str) -> str:
+    """Normalizes line endings to ``\\n`` as in text-mode reads."""
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _head_lines(data: AnyStr, max_lines: int, complete: bool) -> AnyStr:
+    """Returns up to ``max_lines`` whole lines from the start of a buffer.
+
+    Args:
+        data: Bytes, or decoded text, read from the start of a file.
+        max_lines: The maximum number of lines to keep.
+        complete: Whether ``data`` ends at the end of the file, so that
+            its last line is whole even without a newline.
+
+    Returns:
+        The kept lines. A single line longer than ``data`` is kept cut.
+    """
+    newline = "\n" if isinstance(data, str) else b"\n"
+    end = 0
+    for _ in range(max_lines):
+        position = data.find(newline, end)
+        if position == -1:
+            return data if complete or not end else data[:end]
+        end = position + 1
+    return data[:end]
+
+
+def _tail_lines(data: AnyStr, max_lines: int, complete: bool) -> AnyStr:
+    """Returns up to ``max_lines`` whole lines from the end of a buffer.
+
+    Args:
+        data: Bytes, or decoded text, read up to the end of a file.
+        max_lines: The maximum number of lines to keep.
+        complete: Whether ``data`` starts at the start of a line.
+
+    Returns:
+        The kept lines. A single line longer than ``data`` is kept cut.
+    """
+    newline = "\n" if isinstance(data, str) else b"\n"
+    body_end = len(data) - 1 if data.endswith(newline) else len(data)
+    start = body_end
+    for _ in range(max_lines):
+        position = data.rfind(newline, 0, start)
+        if position == -1:
+            if complete or start == body_end:
+                return data
+            break
+        start = position
+    return data[start + 1:]
+
+
+def read_text_excerpt(
+    file_path: Path,
+    max_bytes: int,
+    max_lines: int,
+    stats: Stats | None = None,
+) -> tuple[str, str, int, str] | None:
+    """Reads the head and tail of a text file without reading the rest.
+
+    See `read_stream_excerpt`, which reads the opened file.
+
+    Args:
+        file_path: The path to the file.
+        max_bytes: The maximum number of bytes read from both ends.
+        max_lines: The maximum number of lines kept from each end.
+        stats: Optional run statistics. When given, the opened files are
+            counted, along with the statistics of `read_stream_excerpt`.
+
+    Returns:
+        A tuple of the decoded head, the decoded tail, the number of
+        bytes between them and the name of the encoding, or None if the
+        file is likely binary.
+
+    Raises:
+        OSError: If the file cannot be opened or read.
+    """
+    with open(file_path, "rb") as f:
+        if stats is not None:
+            stats.count("files_opened")
+        size = os.fstat(f.fileno()).st_size
+        return read_stream_excerpt(f, size, max_bytes, max_lines, stats)
+
+
+def read_stream_excerpt(
+    stream: BinaryIO,
+    size: int,
+    max_bytes: int,
+    max_lines: int,
+    stats: Stats | None = None,
+) -> tuple[str, str, int, str] | None:
+    """Reads the head and tail of seekable text content.
+
+    At most ``max_bytes // 2`` bytes are read from each end of the
+    content: the head with one read from the start, the tail with one
+    read after a seek from the end. Each end then keeps at most
+    ``max_lines`` whole lines. The head block is checked for binary
+    content like in `decode_text`, and the encoding is detected from the
+    kept lines.
+
+    Args:
+        stream: A seekable binary stream positioned at the start of the
+            content, e.g. an open file or an archive member.
+        size: The size of the content in bytes.
+        max_bytes: The maximum number of bytes read from both ends.
+        max_lines: The maximum number of lines kept from each end.
+        stats: Optional run statistics. When given, the ``read`` phase is
+            timed and the bytes read and binary files are counted.
+
+    Returns:
+        A tuple of the decoded head, the decoded tail, the number of
+        bytes between them and the name of the encoding, or None if the
+        content is likely binary.
+
+    Raises:
+        OSError: If the stream cannot be read.
+    """
+    if stats is not None:
+        start = time.perf_counter()
+    window = max(max_bytes // 2, 1)
+    head = stream.read(window)
+    binary, codec = encoding.sniff(head)
+    wide = None if binary else encoding.fixed_width(codec, head)
+    # Both ends must hold whole UTF-16 or UTF-32 code units.
+    unit = 1 if wide is None else wide[1]
+    head = head[: len(head) - len(head) % unit]
+    tail = b""
+    if not binary and size > len(head):
+        # Read one extra unit to tell whether the tail starts a line.
+        tail_start = max(size - window, len(head), unit)
+        tail_start += -tail_start % unit
+        stream.seek(tail_start - unit)
+        tail = stream.read()
+    if stats is not None:
+        stats.count("bytes_read", len(head) + len(tail))
+        stats.add_time("read", time.perf_counter() - start)
+        if binary:
+            stats.count("binary_files")
+    if binary:
+        return None
+
+    if wide is not None:
+        return *_wide_excerpt(head, tail, size, max_lines, wide), codec
+    head = _head_lines(head, max_lines, complete=not tail)
+    if tail:
+        tail = _tail_lines(tail[1:], max_lines, complete=tail[:1] == b"\n")
+    if codec is None:
+        codec = encoding.detect(head)
+        if codec == "ascii" and tail:
+            codec = encoding.detect(tail) or codec
+    return (
+        _normalize_newlines(encoding.decode(head, codec)[0]),
+        _normalize_newlines(encoding.decode(tail, codec)[0]),
+        size - len(head) - len(tail),
+        codec,
+    )
+
+
+def _wide_excerpt(
+    head: bytes,
+    tail: bytes,
+    size: int,
+    max_lines: int,
+    wide: tuple[str, int],
+) -> tuple[str, str, int]:
+    """Cuts an excerpt of a UTF-16 or UTF-32 file into whole lines.
+
+    The newlines of these encodings are not single bytes, so both ends
+    are decoded before they are cut into lines.
+
+    Args:
+        head: The bytes read from the start of the file.
+        tail: The bytes read from the end of the file, after one extra
+            code unit, or empty if the head reaches the end.
+        size: The size of the file, in bytes.
+        max_lines: The maximum number of lines kept from each end.
+        wide: The codec without byte order mark handling and the size of
+            its code units, see `encoding.fixed_width`.
+
+    Returns:
+        A tuple of the decoded head, the decoded tail and the number of
+        bytes between them.
+    """
+    codec, unit = wide
+    head_text = str(head, codec, "replace")
+    kept = 0
+    if head_text.startswith("\ufeff"):
+        head_text = head_text[1:]
+        kept = unit
+    head_text = _head_lines(head_text, max_lines, complete=not tail)
+    tail_text = str(tail[unit:], codec, "replace")
+    if tail:
+        previous = str(tail[:unit], codec, "replace")
+        tail_text = _tail_lines(tail_text, max_lines, previous == "\n")
+    kept += len(head_text.encode(codec)) + len(tail_text.encode(codec))
+    return (
+        _normalize_newlines(head_text),
+        _normalize_newlines(tail_text),
+        size - kept,
+    )
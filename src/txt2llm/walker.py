@@ -0,0 +1,343 @@
+"""Directory walker module for the txt2llm project.
+
+This module scans a project directory in a single pass and builds an
+in-memory tree model. Both the directory tree text and the list of
+included files are rendered from that model, so the filesystem is only
+walked once per report. For very large projects, the rendered tree can
+be limited in depth, collapse crowded directories into a summary line
+and leave out entries that contribute no files to the report.
+"""
+
+import collections
+import dataclasses
+import logging
+import os
+from pathlib import Path
+
+from .ignore import IgnoreLevel, IgnoreMatcher
+from .stats import Stats
+
+
+@dataclasses.dataclass
+class TreeNode:
+    """A file or directory entry in the scanned project tree.
+
+    Attributes:
+        name: The entry name.
+        is_dir: Whether the entry is a directory.
+        is_file: Whether the entry is a regular file.
+        children: The child nodes of a directory, sorted with directories
+            first and then by case-insensitive name.
+    """
+    name: str
+    is_dir: bool
+    is_file: bool = False
+    children: list["TreeNode"] = dataclasses.field(default_factory=list)
+
+
+def _sort_key(node: TreeNode) -> tuple[bool, str]:
+    """Returns the display order key for a tree node."""
+    return (not node.is_dir, node.name.lower())
+
+
+def scan_tree(
+    root: Path,
+    ignored_names: set[str],
+    dir_mtimes: dict[str, int] | None = None,
+    matcher: IgnoreMatcher | None = None,
+    stats: Stats | None = None,
+) -> TreeNode:
+    """Scans a directory into a tree model, pruning ignored entries.
+
+    Entries whose name is in ``ignored_names`` or that are excluded by
+    ``matcher`` are dropped before they are entered, so ignored subtrees
+    cost a single directory read of their parent. File type information
+    is taken from the ``DirEntry`` objects returned by ``os.scandir``
+    rather than from extra ``stat`` calls. Symbolic links to directories
+    are listed but not descended into.
+
+    Args:
+        root: The directory to scan.
+        ignored_names: Entry names to skip at any depth.
+        dir_mtimes: If given, filled with the modification time in
+            nanoseconds of every scanned directory and of every ignore
+            file read, keyed by its POSIX path relative to ``root``. This
+            costs one ``stat`` call per directory and ignore file.
+        matcher: If given, the ignore files found in each directory are
+            loaded and applied to its entries.
+        stats: Optional run statistics counting the directories visited
+            and the entries seen and pruned.
+
+    Returns:
+        The root node of the scanned tree.
+    """
+    root_node = TreeNode(name=root.name, is_dir=True)
+    if dir_mtimes is not None:
+        dir_mtimes[""] = os.stat(root).st_mtime_ns
+    stack: list[tuple[TreeNode, str, str, IgnoreLevel | None]] = [
+        (root_node, os.fspath(root), "", None)
+    ]
+    while stack:
+        node, dir_path, rel_dir, parent_level = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = [e for e in it if e.name not in ignored_names]
+        except OSError as e:
+            logging.warning(f"Could not read directory {dir_path}: {e}")
+            continue
+        if stats is not None:
+            stats.count("dirs_visited")
+            stats.count("entries_seen", len(entries))
+
+        level = None
+        if matcher is not None:
+            names = {e.name for e in entries}
+            if parent_level is None:
+                level = matcher.root_level(names)
+            else:
+                level = matcher.child_level(parent_level, rel_dir, names)
+            if dir_mtimes is not None:
+                for rel_path in matcher.ignore_file_paths(rel_dir, names):
+                    try:
+                        mtime_ns = os.stat(root / rel_path).st_mtime_ns
+                    except OSError:
+                        mtime_ns = -1
+                    dir_mtimes[rel_path] = mtime_ns
+
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                is_dir = is_file = False
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if level is not None and level.is_ignored(rel_path, is_dir):
+                if stats is not None:
+                    stats.count("entries_ignored")
+                continue
+            child = TreeNode(name=entry.name, is_dir=is_dir, is_file=is_file)
+            node.children.append(child)
+            if is_dir and not entry.is_symlink():
+                if dir_mtimes is not None:
+                    try:
+                        dir_mtimes[rel_path] = entry.stat().st_mtime_ns
+                    except OSError:
+                        dir_mtimes[rel_path] = -1
+                stack.append((child, entry.path, rel_path, level))
+        node.children.sort(key=_sort_key)
+    return root_node
+
+
+def build_tree(
+    root_name: str,
+    paths: list[str],
+    ignored_names: set[str],
+    matcher: IgnoreMatcher | None = None,
+) -> TreeNode:
+    """Builds a tree model from a list of file paths.
+
+    This is used when the files of a project come from another source
+    than a directory walk, e.g. the git index. Every path is taken to be
+    a regular file; its parent directories are created as needed, and
+    directories left without any entries are dropped.
+
+    Args:
+        root_name: The name of the root directory.
+        paths: POSIX file paths relative to the root.
+        ignored_names: Entry names to skip at any depth.
+        matcher: If given, the ignore files listed in each directory are
+            loaded and applied to its entries.
+
+    Returns:
+        The root node of the tree.
+    """
+    listing: dict[str, dict[str, bool]] = {"": {}}
+    for path in paths:
+        parts = path.split("/")
+        rel_dir = ""
+        for part in parts[:-1]:
+            listing[rel_dir][part] = True
+            rel_dir = f"{rel_dir}/{part}" if rel_dir else part
+            listing.setdefault(rel_dir, {})
+        listing[rel_dir].setdefault(parts[-1], False)
+
+    root_node = TreeNode(name=root_name, is_dir=True)
+    visited: list[TreeNode] = []
+    stack: list[tuple[TreeNode, str, IgnoreLevel | None]] = [
+        (root_node, "", None)
+    ]
+    while stack:
+        node, rel_dir, parent_level = stack.pop()
+        visited.append(node)
+        entries = listing[rel_dir]
+        level = None
+        if matcher is not None:
+            names = set(entries)
+            if parent_level is None:
+                level = matcher.root_level(names)
+            else:
+                level = matcher.child_level(parent_level, rel_dir, names)
+        for name, is_dir in entries.items():
+            if name in ignored_names:
+                continue
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if level is not None and level.is_ignored(rel_path, is_dir):
+                continue
+            child = TreeNode(name=name, is_dir=is_dir, is_file=not is_dir)
+            node.children.append(child)
+            if is_dir:
+                stack.append((child, rel_path, level))
+
+    # Children are visited after their parents, so emptied directories
+    # are dropped bottom-up by walking the visit order backwards.
+    for node in reversed(visited):
+        node.children = [
+            c for c in node.children if not c.is_dir or c.children
+        ]
+        node.children.sort(key=_sort_key)
+    return root_node
+
+
+def render_tree(
+    root: TreeNode,
+    max_depth: int | None = None,
+    collapse_threshold: int | None = None,
+) -> str:
+    """Renders a tree model as a visual directory tree.
+
+    The tree is rendered iteratively, so its depth is not limited by the
+    recursion limit, and each directory's line prefix is built once for
+    all of its children. The contents of a directory below
+    ``max_depth``, or of a directory other than the root with more than
+    ``collapse_threshold`` entries, are replaced by a summary line such
+    as ``… 12,431 files (8,120 .json)``.
+
+    Args:
+        root: The root node of the tree.
+        max_depth: The deepest level whose entries are listed, where the
+            root's entries are at level 1, or None for no limit.
+        collapse_threshold: The largest number of entries a directory
+            may have and still be listed, or None for no limit.
+
+    Returns:
+        The directory tree, one entry per line.
+    """
+    tree_lines = [f"{root.name}/"]
+    # Entries still to be rendered, in reverse order: an entry is a node
+    # or a summary line, with its line prefix, whether it is the last
+    # entry of its directory and its level.
+    stack: list[tuple[TreeNode | str, str, bool, int]] = []
+
+    def push_children(node: TreeNode, prefix: str, level: int) -> None:
+        entries: list[TreeNode | str] = node.children
+        too_deep = max_depth is not None and level >= max_depth
+        too_wide = (
+            collapse_threshold is not None
+            and level > 0
+            and len(entries) > collapse_threshold
+        )
+        if entries and (too_deep or too_wide):
+            entries = [_summary(node)]
+        last = len(entries) - 1
+        for index in range(last, -1, -1):
+            stack.append((entries[index], prefix, index == last, level + 1))
+
+    push_children(root, "", 0)
+    while stack:
+        entry, prefix, is_last, level = stack.pop()
+        pointer = "└── " if is_last else "├── "
+        if isinstance(entry, str):
+            tree_lines.append(f"{prefix}{pointer}{entry}")
+            continue
+        display_name = f"{entry.name}/" if entry.is_dir else entry.name
+        tree_lines.append(f"{prefix}{pointer}{display_name}")
+        if entry.is_dir:
+            extension = "    " if is_last else "│   "
+            push_children(entry, prefix + extension, level)
+    return "\n".join(tree_lines)
+
+
+def _summary(node: TreeNode) -> str:
+    """Summarizes the files below a directory in one line.
+
+    Returns:
+        The number of files at any depth below ``node`` and of its most
+        common extension, e.g. ``… 12,431 files (8,120 .json)``.
+    """
+    extensions: collections.Counter[str] = collections.Counter()
+    stack = [node]
+    while stack:
+        for child in stack.pop().children:
+            if child.is_dir:
+                stack.append(child)
+            else:
+                extensions[os.path.splitext(child.name)[1]] += 1
+    total = sum(extensions.values())
+    if not total:
+        return "… 0 files"
+    ext, count = extensions.most_common(1)[0]
+    return f"… {total:,} files ({count:,} {ext or 'without extension'})"
+
+
+def prune_tree(root: TreeNode, include_exts: set[str]) -> TreeNode:
+    """Keeps only the entries of a tree that contribute files.
+
+    Args:
+        root: The root node of the tree, which is left unchanged.
+        include_exts: File extensions to include, e.g. ``".py"``.
+
+    Returns:
+        The root node of a copy of the tree with only the files that
+        `collect_files` would collect and the directories containing
+        them.
+    """
+    pruned_root = TreeNode(name=root.name, is_dir=True)
+    visited: list[TreeNode] = []
+    stack = [(root, pruned_root)]
+    while stack:
+        node, pruned = stack.pop()
+        visited.append(pruned)
+        for child in node.children:
+            if child.is_dir:
+                pruned_child = TreeNode(name=child.name, is_dir=True)
+                stack.append((child, pruned_child))
+            elif (
+                child.is_file
+                and os.path.splitext(child.name)[1] in include_exts
+            ):
+                pruned_child = TreeNode(
+                    name=child.name, is_dir=False, is_file=True
+                )
+            else:
+                continue
+            pruned.children.append(pruned_child)
+
+    # As in `build_tree`, directories left empty are dropped bottom-up.
+    for pruned in reversed(visited):
+        pruned.children = [
+            c for c in pruned.children if not c.is_dir or c.children
+        ]
+    return pruned_root
+
+
+def collect_files(root: TreeNode, include_exts: set[str]) -> list[Path]:
+    """Collects the files of a tree model with an included extension.
+
+    Args:
+        root: The root node of the tree.
+        include_exts: File extensions to include, e.g. ``".py"``.
+
+    Returns:
+        A sorted list of Path objects, relative to the tree root.
+    """
+    found_files = []
+    stack = [(root, Path())]
+    while stack:
+        node, rel_dir = stack.pop()
+        for child in node.children:
+            if child.is_dir:
+                stack.append((child, rel_dir / child.name))
+            elif child.is_file:
+                if os.path.splitext(child.name)[1] in include_exts:
+                    found_files.append(rel_dir / child.name)
+    return sorted(found_files)
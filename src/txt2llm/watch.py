@@ -0,0 +1,452 @@
+"""Watch mode module for the txt2llm project.
+
+This module keeps a report up to date while the project is edited. The
+rendered sections and the scanned layout are held in a `MemoryCache`
+between rebuilds, so a rebuild only re-reads files whose stat key
+changed and only rescans the tree when a watched directory changed.
+
+Changes are detected with inotify on Linux, through ``ctypes`` so that
+no extra package is needed, and by polling ``stat`` results elsewhere.
+Bursts of events, such as an editor's save sequence, are debounced into
+a single rebuild. The report is written to a temporary file and moved
+over the output, so readers never see a partially written report.
+"""
+
+import ctypes
+import ctypes.util
+import dataclasses
+import errno
+import logging
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Protocol
+
+from . import compress, ignore, index, tokens
+from .cache import MemoryCache
+from .config import ProjectConfig
+from .core import TextProjectBuilder
+
+# Seconds without further events before a burst is considered finished.
+DEFAULT_DEBOUNCE = 0.2
+
+# Seconds between two scans of the polling backend.
+DEFAULT_POLL_INTERVAL = 0.5
+
+# inotify constants from <sys/inotify.h>.
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = 0o0004000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+    | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Stands in for every path when the kernel event queue overflowed.
+OVERFLOW = "*"
+
+
+class WatchBackend(Protocol):
+    """Reports changes below a project root."""
+
+    def sync(self, dirs: list[str], files: list[str]) -> None:
+        """Sets the directories and files to watch.
+
+        Args:
+            dirs: The POSIX paths of the directories to watch, relative
+                to the project root.
+            files: The POSIX paths of the files to watch, relative to
+                the project root.
+        """
+
+    def wait(self, timeout: float) -> set[str]:
+        """Waits for changes.
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+
+        Returns:
+            The relative paths that changed, or an empty set if nothing
+            changed before the timeout.
+        """
+
+    def close(self) -> None:
+        """Releases the resources of the backend."""
+
+
+class InotifyBackend:
+    """Watches directories with the Linux inotify API.
+
+    Every watched directory reports events for its own entries, so files
+    need no watches of their own.
+
+    Attributes:
+        project_root: The project root directory.
+    """
+
+    def __init__(self, project_root: Path):
+        """Creates the inotify instance.
+
+        Args:
+            project_root: The project root directory.
+
+        Raises:
+            OSError: If inotify is not available on this platform.
+        """
+        self.project_root = project_root
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        self._watches: dict[str, int] = {}
+        self._dirs: dict[int, str] = {}
+
+    def sync(self, dirs: list[str], files: list[str]) -> None:
+        """Adds watches for new directories and removes stale ones.
+
+        Args:
+            dirs: The relative POSIX paths of the directories to watch.
+            files: Unused; changes to files are reported by their
+                directory's watch.
+
+        Raises:
+            OSError: If a watch cannot be added, e.g. because the
+                per-user watch limit is reached.
+        """
+        wanted = set(dirs)
+        for rel_dir in self._watches.keys() - wanted:
+            wd = self._watches.pop(rel_dir)
+            self._dirs.pop(wd, None)
+            # Fails harmlessly if the directory is already gone.
+            self._libc.inotify_rm_watch(self._fd, wd)
+        for rel_dir in wanted - self._watches.keys():
+            path = os.fsencode(self.project_root / rel_dir)
+            wd = self._libc.inotify_add_watch(self._fd, path, _WATCH_MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                if code == errno.ENOENT:
+                    continue
+                raise OSError(code, os.strerror(code), rel_dir)
+            self._watches[rel_dir] = wd
+            self._dirs[wd] = rel_dir
+
+    def wait(self, timeout: float) -> set[str]:
+        """Waits for inotify events.
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+
+        Returns:
+            The relative paths of the changed entries. Contains
+            `OVERFLOW` if events were lost.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    changed.add(OVERFLOW)
+                    continue
+                rel_dir = self._dirs.get(wd)
+                if rel_dir is None:
+                    continue
+                if not name:
+                    changed.add(rel_dir)
+                    continue
+                name = os.fsdecode(name)
+                changed.add(f"{rel_dir}/{name}" if rel_dir else name)
+        return changed
+
+    def close(self) -> None:
+        """Closes the inotify instance."""
+        os.close(self._fd)
+
+
+class PollingBackend:
+    """Detects changes by comparing ``stat`` results at intervals.
+
+    Attributes:
+        project_root: The project root directory.
+        interval: The number of seconds between two scans.
+    """
+
+    def __init__(
+        self, project_root: Path, interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """Initializes the backend.
+
+        Args:
+            project_root: The project root directory.
+            interval: The number of seconds between two scans.
+        """
+        self.project_root = project_root
+        self.interval = interval
+        self._state: dict[str, tuple[int, int, int]] = {}
+
+    def _stat(self, rel_path: str) -> tuple[int, int, int]:
+        """Returns the change-relevant stat fields of a path."""
+        try:
+            st = os.stat(self.project_root / rel_path)
+        except OSError:
+            return (-1, -1, -1)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def sync(self, dirs: list[str], files: list[str]) -> None:
+        """Sets the paths to poll and records the state of new ones.
+
+        Args:
+            dirs: The relative POSIX paths of the directories to watch.
+            files: The relative POSIX paths of the files to watch.
+        """
+        # Keep the state of known paths, so that a change made while the
+        # report was being rebuilt is still detected by the next scan.
+        self._state = {
+            path: self._state.get(path) or self._stat(path)
+            for path in dirs + files
+        }
+
+    def wait(self, timeout: float) -> set[str]:
+        """Polls the watched paths until one changes or time runs out.
+
+        Args:
+            timeout: The maximum number of seconds to wait.
+
+        Returns:
+            The relative paths that changed since the last scan.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            time.sleep(max(min(self.interval, remaining), 0))
+            changed = set()
+            for path, state in self._state.items():
+                current = self._stat(path)
+                if current != state:
+                    self._state[path] = current
+                    changed.add(path)
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+    def close(self) -> None:
+        """Releases nothing; polling holds no resources."""
+
+
+def make_backend(project_root: Path) -> WatchBackend:
+    """Returns the best available watch backend.
+
+    Args:
+        project_root: The project root directory.
+
+    Returns:
+        An `InotifyBackend` where inotify is available, otherwise a
+        `PollingBackend`.
+    """
+    try:
+        return InotifyBackend(project_root)
+    except OSError as e:
+        logging.info(f"inotify unavailable ({e}); polling for changes.")
+        return PollingBackend(project_root)
+
+
+class ProjectWatcher:
+    """Rebuilds a report whenever the project changes.
+
+    Attributes:
+        config: The project configuration. Its output path is rewritten
+            on every rebuild and excluded from the report.
+        cache: The in-memory cache of sections and layout.
+        backend: The backend reporting changes.
+        debounce: The number of quiet seconds that end a burst of
+            changes.
+        rebuilds: The number of reports written so far.
+    """
+
+    def __init__(
+        self,
+        config: ProjectConfig,
+        tokenizer: tokens.Tokenizer | None = None,
+        backend: WatchBackend | None = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        compress_level: int | None = None,
+        write_index: bool = False,
+    ):
+        """Initializes the watcher.
+
+        Args:
+            config: The project configuration. Only the ``filesystem``
+                source is supported.
+            tokenizer: An optional tokenizer passed to each builder.
+            backend: The backend reporting changes. Defaults to the
+                result of `make_backend`.
+            debounce: The number of quiet seconds that end a burst of
+                changes.
+            compress_level: The compression level of a compressed
+                output, see `compress.open_text`.
+            write_index: Whether to rewrite the report's section index
+                along with the report, see `index.IndexWriter`.
+
+        Raises:
+            ValueError: If the project files come from the git index, or
+                if an index is requested for a compressed output.
+        """
+        if config.source != "filesystem":
+            raise ValueError("Watch mode needs the filesystem source.")
+        if write_index and compress.codec_for(config.output_path):
+            raise ValueError("A section index needs an uncompressed output.")
+        output = config.output_path
+        self._tmp_path = output.with_name(f".{output.name}.tmp")
+        self._index_path = None
+        own_paths = [output, self._tmp_path]
+        if write_index:
+            self._index_path = index.index_path(output)
+            own_paths.append(index.index_path(self._tmp_path))
+            own_paths.append(self._index_path)
+        self._own_paths = set()
+        for path in own_paths:
+            try:
+                rel_path = path.relative_to(config.project_root)
+            except ValueError:
+                continue
+            self._own_paths.add(rel_path.as_posix())
+        # A report inside the project must not end up in its own tree,
+        # let alone have its previous version embedded as a file.
+        self.config = dataclasses.replace(
+            config,
+            exclude_patterns=config.exclude_patterns
+            + tuple(ignore.escape(p) for p in sorted(self._own_paths)),
+        )
+        self.cache = MemoryCache()
+        self.backend = backend or make_backend(config.project_root)
+        self.debounce = debounce
+        self.rebuilds = 0
+        self._tokenizer = tokenizer
+        self._compress_level = compress_level
+
+    def rebuild(self) -> None:
+        """Writes the report and updates the watched paths.
+
+        Unchanged sections come from the in-memory cache, so only new or
+        modified files are read. The report, and its section index if
+        any, are written to temporary files that then replace the output.
+        """
+        start = time.perf_counter()
+        builder = TextProjectBuilder(
+            self.config, cache=self.cache, tokenizer=self._tokenizer
+        )
+        section_index = None
+        if self._index_path is not None:
+            section_index = index.IndexWriter()
+        with compress.open_text(
+            self._tmp_path,
+            self._compress_level,
+            compress.codec_for(self.config.output_path),
+        ) as fp:
+            builder.write_report(fp, section_index)
+        if section_index is not None:
+            tmp_index_path = index.index_path(self._tmp_path)
+            section_index.save(tmp_index_path, self._tmp_path.stat().st_size)
+        os.replace(self._tmp_path, self.config.output_path)
+        if section_index is not None:
+            os.replace(tmp_index_path, self._index_path)
+
+        layout = self.cache.get_layout()
+        files = [f.as_posix() for f in layout.files]
+        read = self.cache.misses
+        self.cache.retain(set(files))
+        dirs = [
+            path
+            for path in layout.dir_mtimes
+            if path.rpartition("/")[2] not in self.config.ignore_files
+        ]
+        ignore_files = sorted(layout.dir_mtimes.keys() - set(dirs))
+        self._sync(dirs, files + ignore_files)
+        self.rebuilds += 1
+        elapsed = time.perf_counter() - start
+        logging.info(
+            f"Rewrote {self.config.output_path} in {elapsed:.3f}s "
+            f"({read} of {len(files)} files read)."
+        )
+
+    def _sync(self, dirs: list[str], files: list[str]) -> None:
+        """Updates the backend's watches, falling back to polling."""
+        try:
+            self.backend.sync(dirs, files)
+        except OSError as e:
+            if isinstance(self.backend, PollingBackend):
+                raise
+            logging.warning(
+                f"Could not watch {e.filename}: {e.strerror}; "
+                "polling for changes instead."
+            )
+            self.backend.close()
+            self.backend = PollingBackend(self.config.project_root)
+            self.backend.sync(dirs, files)
+
+    def wait_for_changes(self, timeout: float) -> set[str]:
+        """Waits for a burst of changes to finish.
+
+        Changes to the report itself are ignored.
+
+        Args:
+            timeout: The maximum number of seconds to wait for the first
+                change.
+
+        Returns:
+            The relative paths changed during the burst, or an empty set
+            if nothing changed before the timeout.
+        """
+        changed = self.backend.wait(timeout) - self._own_paths
+        if not changed:
+            return changed
+        while True:
+            more = self.backend.wait(self.debounce) - self._own_paths
+            if not more:
+                return changed
+            changed |= more
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Writes the report, then rewrites it after every change.
+
+        Args:
+            stop: An optional event that ends the loop when set.
+                Otherwise the loop runs until interrupted.
+        """
+        stop = stop or threading.Event()
+        self.rebuild()
+        logging.info(f"Watching {self.config.project_root} for changes...")
+        try:
+            while not stop.is_set():
+                changed = self.wait_for_changes(timeout=1.0)
+                if changed:
+                    logging.info(f"Detected {len(changed)} changed paths.")
+                    self.rebuild()
+        finally:
+            self.backend.close()
@@ -0,0 +1,51 @@
+"""Tests for the txt2llm.batch module."""
+
+from pathlib import Path
+
+from txt2llm import batch
+from txt2llm.config import ProjectConfig
+
+
+def _task(root: Path, out: Path) -> batch.BatchTask:
+    return batch.BatchTask(
+        ProjectConfig(
+            project_root=root,
+            output_path=out / root.name / "report.txt",
+            ignored_dirs={".git"},
+            include_exts={".py"},
+        )
+    )
+
+
+def test_read_manifest(tmp_path: Path):
+    """Tests that manifests skip comments and resolve relative paths."""
+    manifest = tmp_path / "projects.txt"
+    manifest.write_text("# services\nsvc-a\n\n  /abs/svc-b  \n")
+    assert batch.read_manifest(manifest) == [
+        tmp_path / "svc-a",
+        Path("/abs/svc-b"),
+    ]
+
+
+def test_run_batch_isolates_failures(tmp_path: Path):
+    """Tests that a failing project does not stop the others."""
+    good = tmp_path / "good"
+    good.mkdir()
+    (good / "main.py").write_text("print('hi')\n")
+    (good / "util.py").write_text("x = 1\n")
+    out = tmp_path / "out"
+    tasks = [_task(tmp_path / "missing", out), _task(good, out)]
+
+    results = batch.run_batch(tasks, workers=2)
+
+    assert [r.project_root for r in results] == [tmp_path / "missing", good]
+    assert "NotADirectoryError" in results[0].error
+    assert results[1].error is None
+    assert results[1].files == 2
+    assert results[1].output_bytes == results[1].output_path.stat().st_size
+    assert "print('hi')" in results[1].output_path.read_text()
+
+    assert batch.summarize(results, 1.0) == (
+        "Built 1 of 2 projects in 1.00s: 1.00 projects/s, 2 files/s, "
+        "0.0 MiB/s written."
+    )
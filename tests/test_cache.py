@@ -0,0 +1,162 @@
+"""Tests for the txt2llm.cache module."""
+
+import dataclasses
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from txt2llm.cache import ReportCache, StatKey, default_cache_path
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+
+
+@pytest.fixture
+def project_config(tmp_path: Path) -> ProjectConfig:
+    """Creates a small project and its configuration."""
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('Hello')")
+    (root / "README.md").write_text("Project README")
+    return ProjectConfig(
+        project_root=root,
+        output_path=tmp_path / "out.txt",
+        ignored_dirs={".git"},
+        include_exts={".py", ".md"},
+    )
+
+
+def test_default_cache_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Tests that caches live in the user cache directory, per project."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    first = default_cache_path(tmp_path / "a" / "project")
+    second = default_cache_path(tmp_path / "b" / "project")
+
+    assert first.parent == tmp_path / "cache" / "txt2llm"
+    assert first.name.startswith("project_")
+    assert first != second
+
+
+def test_section_roundtrip_and_staleness(
+    tmp_path: Path, project_config: ProjectConfig
+):
+    """Tests that sections are only served for an identical stat key."""
+    key = StatKey(size=3, mtime_ns=10, inode=7)
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        assert cache.get_section("a.py", key) is None
+        cache.put_section("a.py", key, "section")
+
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        assert cache.get_section("a.py", key) == ("section", 0, None, ())
+        stale = dataclasses.replace(key, mtime_ns=11)
+        assert cache.get_section("a.py", stale) is None
+
+
+def test_section_keeps_digest_and_sketch(
+    tmp_path: Path, project_config: ProjectConfig
+):
+    """Tests that dedup digests and sketches survive a reopen."""
+    key = StatKey(size=3, mtime_ns=10, inode=7)
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        cache.put_section("a.py", key, "section", 5, "abc", (1, 2**32 - 1))
+
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        assert cache.get_section("a.py", key) == (
+            "section", 5, "abc", (1, 2**32 - 1)
+        )
+
+
+def test_config_change_clears_cache(
+    tmp_path: Path, project_config: ProjectConfig
+):
+    """Tests that changing the included extensions invalidates the cache."""
+    key = StatKey(size=3, mtime_ns=10, inode=7)
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        cache.put_section("a.py", key, "section")
+
+    # Fields that do not affect the output keep the cache.
+    same_output = dataclasses.replace(project_config, jobs=8)
+    with ReportCache(tmp_path / "cache.db", same_output) as cache:
+        assert cache.get_section("a.py", key) == ("section", 0, None, ())
+
+    # Neither do the changed-only and ordering settings.
+    reordered = dataclasses.replace(
+        project_config, since="HEAD~1", order="imports", entry_points=("a",)
+    )
+    with ReportCache(tmp_path / "cache.db", reordered) as cache:
+        assert cache.get_section("a.py", key) == ("section", 0, None, ())
+
+    # A token budget turns on token counting, recorded in sections.
+    budgeted = dataclasses.replace(project_config, max_tokens=100)
+    with ReportCache(tmp_path / "cache.db", budgeted) as cache:
+        assert cache.get_section("a.py", key) is None
+        cache.put_section("a.py", key, "section")
+
+    changed = dataclasses.replace(project_config, include_exts={".py"})
+    with ReportCache(tmp_path / "cache.db", changed) as cache:
+        assert cache.get_section("a.py", key) is None
+
+
+def test_eviction_keeps_recently_used(
+    tmp_path: Path, project_config: ProjectConfig
+):
+    """Tests that least recently used sections are evicted first."""
+    key = StatKey(size=3, mtime_ns=10, inode=7)
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        cache.put_section("old.py", key, "x" * 60)
+    with ReportCache(tmp_path / "cache.db", project_config, 100) as cache:
+        cache.put_section("new.py", key, "y" * 60)
+
+    with ReportCache(tmp_path / "cache.db", project_config) as cache:
+        assert cache.get_section("old.py", key) is None
+        assert cache.get_section("new.py", key) == ("y" * 60, 0, None, ())
+
+
+def test_builder_rerun_reads_only_changed_files(
+    tmp_path: Path, project_config: ProjectConfig
+):
+    """Tests that a cached re-run only re-reads modified files."""
+    cache_path = tmp_path / "cache.db"
+    with ReportCache(cache_path, project_config) as cache:
+        first = TextProjectBuilder(project_config, cache=cache).generate_report()
+    assert first == TextProjectBuilder(project_config).generate_report()
+
+    main_py = project_config.project_root / "src" / "main.py"
+    main_py.write_text("print('Changed')")
+    os.utime(main_py, ns=(1, 1))
+
+    read = TextProjectBuilder._read_file_content
+    with patch.object(
+        TextProjectBuilder, "_read_file_content", autospec=True,
+        side_effect=read,
+    ) as mock_read, patch("txt2llm.walker.scan_tree") as mock_scan:
+        with ReportCache(cache_path, project_config) as cache:
+            second = TextProjectBuilder(
+                project_config, cache=cache
+            ).generate_report()
+
+    mock_scan.assert_not_called()
+    assert [c.args[1] for c in mock_read.call_args_list] == [Path("src/main.py")]
+    assert second == first.replace("print('Hello')", "print('Changed')")
+
+
+def test_cached_layout_tracks_ignore_files(
+    tmp_path: Path, project_config: ProjectConfig
+):
+    """Tests that editing an ignore file invalidates the cached layout."""
+    root = project_config.project_root
+    gitignore = root / ".gitignore"
+    gitignore.write_text("*.md\n")
+    cache_path = tmp_path / "cache.db"
+    with ReportCache(cache_path, project_config) as cache:
+        files = TextProjectBuilder(project_config, cache=cache)._find_files()
+    assert files == [Path("src/main.py")]
+
+    gitignore.write_text("src/\n")
+    os.utime(gitignore, ns=(1, 1))
+    with ReportCache(cache_path, project_config) as cache:
+        files = TextProjectBuilder(project_config, cache=cache)._find_files()
+    assert files == [Path("README.md")]
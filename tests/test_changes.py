@@ -0,0 +1,137 @@
+"""Tests for the txt2llm.changes module."""
+
+import json
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from txt2llm import changes
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+from txt2llm.shard import ShardWriter, utf8_size
+
+
+def test_manifest_changes(tmp_path: Path, monkeypatch):
+    """Tests that only touched files are hashed and compared."""
+    (tmp_path / "same.py").write_text("a = 1\n")
+    (tmp_path / "touched.py").write_text("b = 2\n")
+    (tmp_path / "edited.py").write_text("c = 3\n")
+    (tmp_path / "deleted.py").write_text("d = 4\n")
+    files = ["deleted.py", "edited.py", "same.py", "touched.py"]
+    manifest_path = tmp_path / "manifest.json"
+    changes.write_manifest(manifest_path, changes.snapshot(tmp_path, files))
+    manifest = changes.read_manifest(manifest_path)
+    assert manifest["same.py"].size == 6
+
+    (tmp_path / "deleted.py").unlink()
+    (tmp_path / "new.py").write_text("e = 5\n")
+    (tmp_path / "edited.py").write_text("c = 9\n")
+    os.utime(tmp_path / "edited.py", ns=(0, 1))
+    os.utime(tmp_path / "touched.py", ns=(0, 1))
+    hashed = []
+    file_digest = changes.file_digest
+    monkeypatch.setattr(
+        changes,
+        "file_digest",
+        lambda path: hashed.append(path.name) or file_digest(path),
+    )
+    files = ["edited.py", "new.py", "same.py", "touched.py"]
+    changed, removed = changes.manifest_changes(tmp_path, files, manifest)
+    assert changed == {"edited.py", "new.py"}
+    assert removed == ["deleted.py"]
+    assert sorted(hashed) == ["edited.py", "touched.py"]
+
+    # Recorded digests are reused for unchanged files.
+    hashed.clear()
+    changes.snapshot(tmp_path, files, manifest)
+    assert sorted(hashed) == ["edited.py", "new.py", "touched.py"]
+
+
+def test_read_manifest_invalid(tmp_path: Path):
+    """Tests that invalid manifests raise ValueError."""
+    path = tmp_path / "manifest.json"
+    for text in ("[]", '{"version": 99, "files": {}}', "not json"):
+        path.write_text(text)
+        with pytest.raises(ValueError, match="not a valid manifest"):
+            changes.read_manifest(path)
+
+
+@pytest.mark.parametrize("output_format", ["markdown", "jsonl"])
+def test_builder_since_manifest(tmp_path: Path, output_format: str):
+    """Tests a changed-only report against a manifest of an earlier run."""
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "a.py").write_text("a = 1\n")
+    (root / "b.py").write_text("b = 2\n")
+    (root / "c.py").write_text("c = 3\n")
+    manifest_path = tmp_path / "manifest.json"
+    config = ProjectConfig(
+        project_root=root,
+        output_path=tmp_path / "out.txt",
+        ignored_dirs=set(),
+        include_exts={".py"},
+        output_format=output_format,
+        since_manifest=manifest_path,
+    )
+    # Without a manifest, every file is changed.
+    builder = TextProjectBuilder(config)
+    assert "b = 2" in builder.generate_report()
+    builder.write_manifest(manifest_path)
+
+    (root / "b.py").write_text("b = 22\n")
+    (root / "c.py").unlink()
+    report = TextProjectBuilder(config).generate_report()
+    if output_format == "markdown":
+        assert "### `b.py`\n\n```python\nb = 22\n" in report
+        assert "### `a.py`" not in report
+        assert report.endswith(
+            f"## Unchanged Files (since `{manifest_path}`)\n\n- `a.py`\n\n"
+            f"## Removed Files (since `{manifest_path}`)\n\n- `c.py`\n"
+        )
+    else:
+        records = [json.loads(line) for line in report.splitlines()]
+        assert records[0]["files"] == records[-1]["files"] == 3
+        by_path = {r["path"]: r for r in records[1:-1]}
+        assert by_path["b.py"]["content"] == "b = 22\n"
+        assert by_path["a.py"]["content"] is None
+        assert by_path["a.py"]["skipped"] == (
+            f"Unchanged since `{manifest_path}`"
+        )
+        assert by_path["c.py"]["skipped"] == f"Removed since `{manifest_path}`"
+
+
+def test_sharded_since_manifest_long_listing(tmp_path: Path):
+    """Tests that long change listings are split between their lines."""
+    root = tmp_path / "project"
+    root.mkdir()
+    for i in range(60):
+        (root / f"file{i:02}.py").write_text(f"x = {i}\n")
+    manifest_path = tmp_path / "manifest.json"
+    config = ProjectConfig(
+        project_root=root,
+        output_path=tmp_path / "out.txt",
+        ignored_dirs=set(),
+        include_exts={".py"},
+        since_manifest=manifest_path,
+    )
+    TextProjectBuilder(config).write_manifest(manifest_path)
+    (root / "file00.py").write_text("x = -1\n")
+    (root / "file58.py").unlink()
+    (root / "file59.py").unlink()
+
+    writer = ShardWriter(tmp_path / "report.txt", "project", 400)
+    parts = TextProjectBuilder(config).write_sharded_report(writer)
+    texts = [part.read_text(encoding="utf-8") for part in parts]
+
+    assert len(parts) > 3
+    assert all(utf8_size(text) <= 400 for text in texts)
+    bodies = "".join(text.split("\n---\n\n", 1)[1] for text in texts)
+    unchanged = [f"file{i:02}.py" for i in range(1, 58)]
+    listed = re.findall(r"^- `(file\d+\.py)`$", bodies, re.MULTILINE)
+    assert listed == unchanged + ["file58.py", "file59.py"]
+    assert "```" not in bodies.split("## Unchanged Files", 1)[1]
+    assert "## Unchanged Files (since" in bodies
+    assert "## Removed Files (since" in bodies
+    assert any("- Removed Files\n" in text for text in texts)
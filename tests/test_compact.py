@@ -0,0 +1,128 @@
+"""Tests for the txt2llm.compact module."""
+
+import pytest
+
+from txt2llm.compact import compact
+
+
+def test_python_comments_and_docstrings():
+    """Tests that Python comments and docstrings are removed."""
+    text = (
+        "#!/usr/bin/env python\n"
+        "# Copyright 2024 Example. Licensed under MIT.\n"
+        '"""Module docstring."""\n'
+        "\n"
+        "import os  # stdlib\n"
+        "\n"
+        "\n"
+        "\n"
+        "class Empty:\n"
+        '    """Only a docstring."""\n'
+        "\n"
+        "\n"
+        "def f(x):\n"
+        '    """Docstring\n'
+        '    on two lines."""\n'
+        "    # comment\n"
+        '    s = "# not a comment"   \n'
+        '    "not a docstring"\n'
+        "    return x\n"
+    )
+    assert compact(text, "python") == (
+        "#!/usr/bin/env python\n"
+        "\n"
+        "import os\n"
+        "\n"
+        "class Empty:\n"
+        "    ...\n"
+        "\n"
+        "def f(x):\n"
+        '    s = "# not a comment"\n'
+        '    "not a docstring"\n'
+        "    return x\n"
+    )
+
+
+def test_python_that_does_not_tokenize():
+    """Tests that invalid Python only has its whitespace compacted."""
+    text = 'x = """never closed  \n\n\n# not a comment\n'
+    assert compact(text, "python") == (
+        'x = """never closed\n\n# not a comment\n'
+    )
+
+
+@pytest.mark.parametrize("language", ["c", "javascript", "go"])
+def test_c_family_comments(language: str):
+    """Tests that comments are removed but string contents are kept."""
+    text = (
+        "/* License: MIT\n"
+        " * Copyright 2024 */\n"
+        "int main() { // trailing\n"
+        '    s = "http://x/* y */"; c = \'"\'; /* inline */ d = 1;\n'
+        "}\n"
+    )
+    assert compact(text, language) == (
+        "int main() {\n"
+        '    s = "http://x/* y */"; c = \'"\';  d = 1;\n'
+        "}\n"
+    )
+
+
+def test_rust_lifetimes_and_chars():
+    """Tests that a Rust lifetime does not open a character literal."""
+    text = (
+        "fn f<'a>(x: &'a str) -> char { // comment\n"
+        "    let q = '\"'; let s = \"a // b\"; q }\n"
+    )
+    assert compact(text, "rust") == (
+        "fn f<'a>(x: &'a str) -> char {\n"
+        "    let q = '\"'; let s = \"a // b\"; q }\n"
+    )
+
+
+def test_shell_comments():
+    """Tests that shell comments are removed outside quotes and heredocs."""
+    text = (
+        "#!/bin/bash\n"
+        "# header\n"
+        'echo "a # b" # comment\n'
+        "echo ${#x} $# 'it' # comment\n"
+        "cat <<EOF\n"
+        "# kept in the here-document\n"
+        "EOF\n"
+        "x=1 # comment\n"
+    )
+    assert compact(text, "shell") == (
+        "#!/bin/bash\n"
+        'echo "a # b"\n'
+        "echo ${#x} $# 'it'\n"
+        "cat <<EOF\n"
+        "# kept in the here-document\n"
+        "EOF\n"
+        "x=1\n"
+    )
+
+
+def test_license_header_and_whitespace():
+    """Tests that only a license comment block is dropped."""
+    text = "# SPDX-License-Identifier: MIT\n# x\nkey: 1\n\n\n\nb: 2  \n"
+    assert compact(text, "yaml") == "key: 1\n\nb: 2\n"
+    text = "# Settings\nkey: 1\n"
+    assert compact(text, "yaml") == text
+    assert compact("\n\nA  \n\n\n\nB", "markdown") == "A\n\nB"
+
+
+def test_multi_line_strings_are_kept():
+    """Tests that whitespace inside multi-line strings is not compacted."""
+    python = 'X = """a  \n\n\n\nb"""  \n\n\n\ny = f"""c  \n\n\n{y}"""\n'
+    assert compact(python, "python") == (
+        'X = """a  \n\n\n\nb"""\n\ny = f"""c  \n\n\n{y}"""\n'
+    )
+    javascript = "const t = `a  \n\n\n\nb`;  // comment\n"
+    assert compact(javascript, "javascript") == "const t = `a  \n\n\n\nb`;\n"
+    rust = 'let s = "a  \n\n\nb"; // comment\n'
+    assert compact(rust, "rust") == 'let s = "a  \n\n\nb";\n'
+    shell = 'cat <<EOF\na  \n\n\nEOF\necho "b  \n\n\nc" # comment\n'
+    assert compact(shell, "shell") == (
+        'cat <<EOF\na  \n\n\nEOF\necho "b  \n\n\nc"\n'
+    )
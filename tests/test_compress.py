@@ -0,0 +1,84 @@
+"""Tests for the txt2llm.compress module."""
+
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+import pytest
+
+from txt2llm import compress
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+
+
+def test_codec_for():
+    """Tests that codecs are chosen by the last suffix only."""
+    assert compress.codec_for(Path("report.txt.gz")) == "gzip"
+    assert compress.codec_for(Path("report.XZ")) == "xz"
+    assert compress.codec_for(Path("report.txt.bz2")) == "bz2"
+    assert compress.codec_for(Path("report.gz.txt")) is None
+    assert compress.plain_name(Path("a/report.txt.gz")) == Path(
+        "a/report.txt"
+    )
+    assert compress.plain_name(Path("report.txt")) == Path("report.txt")
+
+
+@pytest.mark.parametrize(
+    "suffix, module",
+    [(".gz", gzip), (".xz", lzma), (".bz2", bz2), (".txt", None)],
+)
+def test_open_text_roundtrip(tmp_path: Path, suffix: str, module):
+    """Tests that streamed text reads back through each codec."""
+    path = tmp_path / f"report{suffix}"
+    text = "".join(f"line {i} é\n" for i in range(5000))
+    with compress.open_text(path, level=1, buffering=4096) as fp:
+        for line in text.splitlines(keepends=True):
+            fp.write(line)
+
+    data = path.read_bytes()
+    if module is not None:
+        assert len(data) < len(text) // 2
+        data = module.decompress(data)
+    assert data.decode("utf-8") == text
+
+
+def test_open_text_explicit_codec(tmp_path: Path):
+    """Tests that an explicit codec overrides the path's suffix."""
+    path = tmp_path / ".report.txt.gz.tmp"
+    with compress.open_text(path, codec="gzip") as fp:
+        fp.write("hello\n")
+    assert gzip.decompress(path.read_bytes()) == b"hello\n"
+
+    with pytest.raises(ValueError):
+        compress.open_text(path, codec="zstd")
+
+
+@pytest.mark.parametrize(
+    "suffix, module", [(".gz", gzip), (".xz", lzma), (".bz2", bz2)]
+)
+def test_token_total_in_compressed_report(
+    tmp_path: Path, suffix: str, module
+):
+    """Tests that compressed reports end with the correct token total."""
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "main.py").write_text("print('Hello')\n")
+    config = ProjectConfig(
+        project_root=root,
+        output_path=tmp_path / f"report.txt{suffix}",
+        ignored_dirs=set(),
+        include_exts={".py"},
+        count_tokens=True,
+    )
+    builder = TextProjectBuilder(config)
+    with compress.open_text(config.output_path) as fp:
+        assert not fp.seekable()
+        builder.write_report(fp)
+
+    report = module.decompress(config.output_path.read_bytes()).decode()
+    assert "- Estimated Tokens: `pending`" in report
+    assert report.endswith(
+        f"\n---\n\n- Estimated Tokens: `{builder.total_tokens:,}`\n"
+    )
+    assert builder.total_tokens > 0
@@ -1,10 +1,18 @@
 "Tests for the txt2llm.core module."
 
+import dataclasses
+import io
+import json
+import os
+
 import pytest
 from pathlib import Path
 
+from txt2llm import index
 from txt2llm.config import ProjectConfig
 from txt2llm.core import TextProjectBuilder
+from txt2llm.shard import ShardWriter
+from txt2llm.stats import Stats
 
 
 @pytest.fixture
@@ -86,25 +94,27 @@ def test_read_file_content_text(mock_config: ProjectConfig):
     """Tests _read_file_content with a text file."""
     builder = TextProjectBuilder(mock_config)
     file_path = Path("README.md")
-    content, warning = builder._read_file_content(file_path)
+    content, warning, encoding = builder._read_file_content(file_path)
     assert content == "Project README"
     assert warning is None
+    assert encoding == "ascii"
 
 
 def test_read_file_content_binary(mock_config: ProjectConfig):
     """Tests _read_file_content with a binary file."""
     builder = TextProjectBuilder(mock_config)
     file_path = Path("src/binary.bin")
-    content, warning = builder._read_file_content(file_path)
+    content, warning, encoding = builder._read_file_content(file_path)
     assert content == ""
     assert warning == "[SKIP] Binary file"
+    assert encoding is None
 
 
 def test_read_file_content_non_existent(mock_config: ProjectConfig):
     """Tests _read_file_content with a non-existent file."""
     builder = TextProjectBuilder(mock_config)
     file_path = Path("non_existent.txt")
-    content, warning = builder._read_file_content(file_path)
+    content, warning, encoding = builder._read_file_content(file_path)
     assert content == ""
     assert "Could not read file" in warning
 
@@ -194,4 +204,277 @@ def test_generate_report(mock_config: ProjectConfig):
     ]
     expected_report = "\n".join(expected_report_parts)
 
-    assert generated_report == expected_report
\ No newline at end of file
+    assert generated_report == expected_report
+
+def test_write_report_streams_full_report(mock_config: ProjectConfig):
+    """Tests that write_report streams the same report generate_report returns."""
+    builder = TextProjectBuilder(mock_config)
+    chunks = list(builder.iter_report())
+    assert len(chunks) > 1
+
+    stream = io.StringIO()
+    TextProjectBuilder(mock_config).write_report(stream)
+    assert stream.getvalue() == "".join(chunks)
+    assert stream.getvalue() == TextProjectBuilder(mock_config).generate_report()
+
+
+def test_generate_report_parallel_matches_sequential(mock_config: ProjectConfig):
+    """Tests that threaded reads keep the sequential output order."""
+    sequential = TextProjectBuilder(mock_config).generate_report()
+    parallel_config = dataclasses.replace(mock_config, jobs=4)
+    assert TextProjectBuilder(parallel_config).generate_report() == sequential
+
+
+class _WordTokenizer:
+    """Counts whitespace-separated words, for predictable test totals."""
+
+    def count(self, text: str) -> int:
+        return len(text.split())
+
+
+def test_generate_report_token_counts(mock_config: ProjectConfig):
+    """Tests per-file token counts and the backfilled header total."""
+    config = dataclasses.replace(mock_config, count_tokens=True)
+    builder = TextProjectBuilder(config, tokenizer=_WordTokenizer())
+    report = builder.generate_report()
+
+    assert "### `README.md` (2 tokens)\n\n```markdown\nProject README\n```" in report
+    assert "### `src/module_a/component.py` (3 tokens)" in report
+    assert f"- Estimated Tokens: `{builder.total_tokens:,}`" in report
+    assert "`pending`" not in report
+    assert builder.total_tokens == len(report.split())
+
+
+@pytest.mark.parametrize("fd_append", [False, True])
+def test_write_report_appended_token_total(
+    mock_config: ProjectConfig, tmp_path: Path, fd_append: bool
+):
+    """Tests that a report appended to a file gets a token total trailer."""
+    config = dataclasses.replace(mock_config, count_tokens=True)
+    builder = TextProjectBuilder(config, tokenizer=_WordTokenizer())
+    output = tmp_path / "appended.md"
+    output.write_text("Earlier content\n")
+    if fd_append:
+        # Like ``sys.stdout`` redirected with ``>>``.
+        fd = os.open(output, os.O_WRONLY | os.O_APPEND)
+        fp = open(fd, "w", encoding="utf-8")
+    else:
+        fp = output.open("a", encoding="utf-8")
+    with fp:
+        builder.write_report(fp)
+
+    report = output.read_text(encoding="utf-8")
+    assert report.startswith("Earlier content\n# Project Overview")
+    assert "- Estimated Tokens: `pending`" in report
+    assert report.endswith(
+        f"\n---\n\n- Estimated Tokens: `{builder.total_tokens:,}`\n"
+    )
+
+
+def test_generate_report_token_budget(mock_config: ProjectConfig):
+    """Tests that files past the token budget are listed as omitted."""
+    config = dataclasses.replace(mock_config, max_tokens=120)
+    builder = TextProjectBuilder(config, tokenizer=_WordTokenizer())
+    report = builder.generate_report()
+
+    assert "- Token Budget: `120`" in report
+    assert "Project README" in report
+    assert "### `test.txt`\n\n```text\n[SKIP] Token budget exceeded\n```" in report
+    omitted = report.split("[SKIP] Token budget exceeded")
+    assert len(omitted) > 1
+    # Everything after the first omitted file is omitted too.
+    assert "A simple text file" not in report
+
+
+def test_write_sharded_report(mock_config: ProjectConfig, tmp_path: Path):
+    """Tests that the sharded report holds the tree and every file once."""
+    writer = ShardWriter(tmp_path / "report.txt", "demo", 250)
+    parts = TextProjectBuilder(mock_config).write_sharded_report(writer)
+
+    assert len(parts) > 1
+    texts = [p.read_text(encoding="utf-8") for p in parts]
+    assert "## Directory Tree" in texts[0]
+    joined = "".join(texts)
+    for name in ["README.md", "src/main.py", "test.txt"]:
+        assert joined.count(f"### `{name}`") == 1
+
+
+def test_write_report_records_stats(mock_config: ProjectConfig):
+    """Tests that run statistics leave the report unchanged."""
+    stats = Stats()
+    buffer = io.StringIO()
+    TextProjectBuilder(mock_config, stats=stats).write_report(buffer)
+    report = buffer.getvalue()
+
+    assert report == TextProjectBuilder(mock_config).generate_report()
+    assert stats.counters["files_opened"] == 7
+    assert stats.counters["binary_files"] == 0
+    assert stats.counters["dirs_visited"] == 6
+    assert stats.counters["bytes_emitted"] == len(report.encode("utf-8"))
+    assert {"scan", "render_tree", "collect_files", "read", "write",
+            "report"} <= stats.phases.keys()
+    assert len(stats.to_dict()["slowest_files"]) == 7
+
+
+def test_generate_report_dedup(mock_config: ProjectConfig):
+    """Tests that identical and near-identical files are replaced."""
+    root = mock_config.project_root
+    body = "".join(f"line {i} of the license\n" for i in range(40))
+    (root / "docs" / "LICENSE.txt").write_text(body)
+    (root / "src" / "LICENSE.txt").write_text(body)
+    (root / "temp" / "LICENSE.txt").write_text(
+        body.replace("line 20 ", "changed line ")
+    )
+    config = dataclasses.replace(mock_config, near_dup_threshold=0.5)
+    stats = Stats()
+    report = TextProjectBuilder(config, stats=stats).generate_report()
+
+    assert report.count("line 0 of the license") == 1
+    assert "[SAME] Identical to `docs/LICENSE.txt`" in report
+    assert "### `temp/LICENSE.txt` (diff against `docs/LICENSE.txt`)" in report
+    assert "+changed line of the license" in report
+    assert stats.counters["duplicates"] == 1
+    assert stats.counters["near_duplicates"] == 1
+
+    plain = TextProjectBuilder(mock_config).generate_report()
+    assert plain.count("line 0 of the license") == 3
+
+
+def test_generate_report_excerpts_large_files(mock_config: ProjectConfig):
+    """Tests that files over their size limit are shown as excerpts."""
+    root = mock_config.project_root
+    (root / "data.txt").write_text("".join(f"row {i}\n" for i in range(999)))
+    config = dataclasses.replace(
+        mock_config,
+        max_file_bytes=200,
+        ext_max_file_bytes={".md": None},
+        excerpt_lines=2,
+    )
+    (root / "docs" / "guide.md").write_text("guide\n" * 100)
+    report = TextProjectBuilder(config).generate_report()
+
+    assert "```text\nrow 0\nrow 1\n[... " in report
+    assert " bytes elided ...]\nrow 997\nrow 998\n\n```" in report
+    assert "row 2\n" not in report
+    assert "guide\n" * 100 in report
+
+
+def test_generate_report_jsonl(mock_config: ProjectConfig):
+    """Tests that the jsonl format streams one record per file."""
+    config = dataclasses.replace(
+        mock_config, output_format="jsonl", count_tokens=True, dedup=True
+    )
+    root = mock_config.project_root
+    body = "print('Hello')\n" * 20
+    (root / "src" / "main.py").write_text(body)
+    (root / "src" / "main_copy.py").write_text(body)
+    (root / "blob.txt").write_bytes(b"\x00\x01")
+    chunks = list(TextProjectBuilder(config).iter_report())
+    records = [json.loads(chunk) for chunk in chunks]
+
+    summary, files, end = records[0], records[1:-1], records[-1]
+    assert summary["type"] == "summary"
+    assert summary["project"] == root.name
+    assert "├── src/" in summary["tree"]
+    assert summary["config"]["output_format"] == "jsonl"
+    assert summary["files"] == len(files) == end["files"] == 9
+    assert end["tokens"] == sum(r["tokens"] or 0 for r in files)
+
+    by_path = {r["path"]: r for r in files}
+    main = by_path["src/main.py"]
+    assert main["language"] == "python"
+    assert main["content"] == body
+    assert main["size"] == len(body)
+    assert main["skipped"] is None
+    assert main["tokens"] > 0
+    assert len(main["hash"]) == 32
+    assert main["encoding"] == "ascii"
+
+    copy = by_path["src/main_copy.py"]
+    assert copy["duplicate_of"] == "src/main.py"
+    assert copy["skipped"] == "Identical to `src/main.py`"
+    assert copy["content"] is None
+    assert copy["hash"] == main["hash"]
+
+    assert by_path["blob.txt"]["skipped"] == "Binary file"
+    assert by_path["blob.txt"]["content"] is None
+    assert by_path["blob.txt"]["encoding"] is None
+
+
+@pytest.mark.parametrize("output_format", ["markdown", "jsonl"])
+def test_write_indexed_report(mock_config: ProjectConfig, output_format: str):
+    """Tests that the section index points at each rendered section."""
+    root = mock_config.project_root
+    (root / "docs" / "guide.md").write_text("Guide ✓ ünïcode")
+    output_path = root / "output" / "report.txt"
+    config = dataclasses.replace(
+        mock_config,
+        output_path=output_path,
+        output_format=output_format,
+        count_tokens=True,
+    )
+    builder = TextProjectBuilder(config)
+    index_file = builder.write_indexed_report(output_path)
+    assert index_file == root / "output" / "report.txt.idx"
+
+    report = output_path.read_bytes()
+    with index.ReportIndex(index_file) as report_index:
+        assert report_index.report_size == len(report)
+        assert len(report_index) == builder.file_count + 1
+        offset, length = report_index.lookup(index.TREE_KEY)
+        tree = report[offset : offset + length].decode("utf-8")
+        guide = index.extract(output_path, report_index, "docs/guide.md")
+    guide = guide.decode("utf-8")
+
+    if output_format == "jsonl":
+        assert json.loads(tree)["type"] == "summary"
+        assert json.loads(guide)["content"] == "Guide ✓ ünïcode"
+    else:
+        assert tree.startswith("## Directory Tree\n")
+        assert tree.endswith("```\n")
+        assert guide.startswith("### `docs/guide.md`")
+        assert guide.endswith("Guide ✓ ünïcode\n```\n")
+        # The filled-in token total does not move any section.
+        assert "`pending`" not in report.decode("utf-8")
+
+
+def test_write_indexed_report_compressed(mock_config: ProjectConfig):
+    """Tests that compressed outputs cannot be indexed."""
+    builder = TextProjectBuilder(mock_config)
+    with pytest.raises(ValueError, match="uncompressed"):
+        builder.write_indexed_report(
+            mock_config.project_root / "report.txt.gz"
+        )
+
+
+def test_generate_report_compact(mock_config: ProjectConfig):
+    """Tests that compaction is applied and its savings are counted."""
+    root = mock_config.project_root
+    (root / "src" / "main.py").write_text(
+        '"""Entry point."""\n\n\n\n# Say hello.\nprint("Hello")  # greet\n'
+    )
+    stats = Stats()
+    config = dataclasses.replace(mock_config, compact=True)
+    report = TextProjectBuilder(config, stats=stats).generate_report()
+
+    assert '```python\nprint("Hello")\n\n```' in report
+    assert "Say hello" not in report
+    assert stats.counters["compact_bytes_saved.python"] == 44
+    assert stats.counters["compact_tokens_saved.python"] > 0
+    assert stats.phases["compact"].calls == 7
+
+
+def test_generate_report_legacy_encoding(mock_config: ProjectConfig):
+    """Tests that non-UTF-8 files are decoded and their encoding noted."""
+    root = mock_config.project_root
+    (root / "src" / "main.py").write_bytes(
+        "# 打印问候语\nprint('你好，世界')\n".encode("gbk")
+    )
+    stats = Stats()
+    report = TextProjectBuilder(mock_config, stats=stats).generate_report()
+
+    assert "### `src/main.py` (encoding: gb18030)" in report
+    assert "print('你好，世界')" in report
+    assert "### `README.md`\n" in report
+    assert stats.counters["files_by_encoding.gb18030"] == 1
+    assert stats.counters["files_by_encoding.ascii"] == 6
@@ -0,0 +1,49 @@
+"Tests for the txt2llm.dedup module."
+
+from txt2llm import dedup
+
+
+def _lines(count: int, changed: int | None = None) -> str:
+    """Returns a text of distinct lines, optionally with one changed."""
+    return "\n".join(
+        f"changed {i}" if i == changed else f"line {i}" for i in range(count)
+    )
+
+
+def test_sketch_ignores_blank_lines_and_indentation():
+    """Tests that sketches only depend on the stripped non-blank lines."""
+    text = _lines(50)
+    reformatted = "\n\n".join(f"    {line}" for line in text.splitlines())
+    assert dedup.sketch(text) == dedup.sketch(reformatted)
+    assert len(dedup.sketch(text)) == dedup.SKETCH_SIZE
+    assert dedup.sketch("a\nb") == ()
+
+
+def test_similarity():
+    """Tests the similarity estimate of identical and unrelated texts."""
+    a = dedup.sketch(_lines(200))
+    assert dedup.similarity(a, a) == 1.0
+    assert dedup.similarity(a, dedup.sketch(_lines(200, changed=100))) > 0.8
+    unrelated = dedup.sketch("\n".join(f"other {i}" for i in range(200)))
+    assert dedup.similarity(a, unrelated) == 0.0
+    assert dedup.similarity((), ()) == 0.0
+
+
+def test_deduplicator_identical_to():
+    """Tests that the first file with a digest is the reference."""
+    deduplicator = dedup.Deduplicator()
+    assert deduplicator.identical_to("a.py", "d1") is None
+    assert deduplicator.identical_to("b.py", "d2") is None
+    assert deduplicator.identical_to("c.py", "d1") == "a.py"
+    assert deduplicator.similar_to("c.py", dedup.sketch(_lines(50))) is None
+
+
+def test_deduplicator_similar_to_compares_with_originals():
+    """Tests that near duplicates always point at an original file."""
+    deduplicator = dedup.Deduplicator(near_threshold=0.5)
+    assert deduplicator.similar_to("a.py", dedup.sketch(_lines(60))) is None
+    for i, changed in enumerate((10, 30, 50)):
+        file_sketch = dedup.sketch(_lines(60, changed=changed))
+        assert deduplicator.similar_to(f"copy{i}.py", file_sketch) == "a.py"
+    small = dedup.sketch(_lines(5))
+    assert deduplicator.similar_to("small.py", small) is None
@@ -0,0 +1,79 @@
+"""Tests for the txt2llm.encoding module."""
+
+import pytest
+
+from txt2llm import encoding
+
+_CHINESE = "# 这是一个测试文件，用于检查编码。\nprint('中文字符串和注释')\n"
+_TRADITIONAL = "# 這是一個測試檔案，用於檢查編碼。\nprint('繁體中文字串與註解')\n"
+_JAPANESE = "# これはテストファイルです。文字コードを確認します。\nprint('日本語')\n"
+_GERMAN = "# Überprüfung der Größe für Straße und café\nx = 'naïve'\n"
+
+
+def _read(data: bytes) -> tuple[str, str] | None:
+    """Decodes data the way `utils.read_text_file` does."""
+    binary, codec = encoding.sniff(data)
+    return None if binary else encoding.decode(data, codec)
+
+
+def test_ascii_and_utf8_fast_path():
+    """Tests that ASCII and UTF-8 content is decoded strictly."""
+    assert _read(b"x = 1\n") == ("x = 1\n", "ascii")
+    assert _read(_CHINESE.encode("utf-8")) == (_CHINESE, "utf-8")
+    assert _read(b"") == ("", "ascii")
+
+
+@pytest.mark.parametrize(
+    "text, codec, detected",
+    [
+        (_CHINESE, "gbk", "gb18030"),
+        (_TRADITIONAL, "big5", "big5"),
+        (_JAPANESE, "shift_jis", "shift_jis"),
+        (_GERMAN, "cp1252", "cp1252"),
+    ],
+)
+def test_legacy_encodings(text: str, codec: str, detected: str):
+    """Tests that common legacy encodings are detected."""
+    data = (text * 3).encode(codec)
+    assert _read(data) == (text * 3, detected)
+    assert encoding.detect(data) == detected
+
+
+@pytest.mark.parametrize(
+    "codec", ["utf-8-sig", "utf-16", "utf-32", "utf-16-le", "utf-16-be"]
+)
+def test_unicode_encodings(codec: str):
+    """Tests byte order marks and UTF-16 without a byte order mark."""
+    data = _CHINESE.encode(codec)
+    assert encoding.sniff(data) == (False, codec)
+    # The byte order mark is not part of the text.
+    assert _read(data) == (_CHINESE, codec)
+
+
+def test_binary_content():
+    """Tests that null bytes outside UTF-16 text mark content as binary."""
+    assert _read(b"\x00\xDE\xAD\xBE\xEF") is None
+    assert _read(b"A" * 64 + b"\x00" + b"A" * 64) is None
+    assert _read(b"\x00\x01\x02\xff" * 10) is None
+    assert encoding.detect(b"\x7fELF\x02\x01\x01\x00") is None
+
+
+def test_mostly_utf8():
+    """Tests that a few invalid bytes do not change UTF-8 detection."""
+    data = "héllo wörld\n".encode("utf-8") * 100 + b"\xff"
+    text, codec = _read(data)
+    assert codec == "utf-8"
+    assert text == "héllo wörld\n" * 100 + "�"
+
+
+def test_fixed_width():
+    """Tests the code unit sizes of UTF-16 and UTF-32 codecs."""
+    data = "x".encode("utf-16")
+    assert encoding.fixed_width("utf-16", data) == ("utf-16-le", 2)
+    assert encoding.fixed_width("utf-16-be", b"") == ("utf-16-be", 2)
+    assert encoding.fixed_width("utf-32", "x".encode("utf-32")) == (
+        "utf-32-le",
+        4,
+    )
+    assert encoding.fixed_width("utf-8-sig", b"") is None
+    assert encoding.fixed_width(None, b"") is None
@@ -0,0 +1,150 @@
+"Tests for the txt2llm.fs module."
+
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from txt2llm import fs
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+from txt2llm.stats import Stats
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    """Creates a small project directory named ``proj``."""
+    root = tmp_path / "proj"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "build").mkdir()
+    (root / ".gitignore").write_text("*.log\ngenerated/\n")
+    (root / "README.md").write_text("# Project\n")
+    (root / "src" / "main.py").write_text("print('main')\n")
+    (root / "src" / "pkg" / "util.py").write_text("def util(): pass\n")
+    (root / "src" / "pkg" / "data.bin").write_bytes(b"\x00\x01\x02")
+    (root / "src" / "debug.log").write_text("ignored\n")
+    (root / "src" / "generated").mkdir()
+    (root / "src" / "generated" / "out.py").write_text("ignored = 1\n")
+    (root / "build" / "cache.py").write_text("ignored = 2\n")
+    (root / "big.txt").write_text("".join(f"line {i}\n" for i in range(500)))
+    return root
+
+
+def _archive(project: Path, suffix: str, prefix: str = "proj/") -> Path:
+    """Packs a project directory into an archive."""
+    path = project.with_name(f"proj{suffix}")
+    files = sorted(p for p in project.rglob("*") if p.is_file())
+    if suffix == ".zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for file in files:
+                name = prefix + file.relative_to(project).as_posix()
+                archive.write(file, name)
+    else:
+        with tarfile.open(path, "w:gz") as archive:
+            for file in files:
+                name = prefix + file.relative_to(project).as_posix()
+                archive.add(file, name)
+    return path
+
+
+def _config(root: Path) -> ProjectConfig:
+    """Returns a report configuration for a project root."""
+    return ProjectConfig(
+        project_root=root,
+        output_path=root.parent / "output.txt",
+        ignored_dirs={".git", "build"},
+        include_exts={".py", ".md", ".txt", ".bin"},
+        max_file_bytes=1024,
+        excerpt_lines=3,
+    )
+
+
+@pytest.mark.parametrize("suffix", [".tar.gz", ".zip"])
+def test_archive_report_matches_directory(project: Path, suffix: str):
+    """An archive yields the same report as its extracted directory."""
+    archive = _archive(project, suffix)
+    expected = TextProjectBuilder(_config(project)).generate_report()
+    report = TextProjectBuilder(_config(archive)).generate_report()
+
+    assert report.replace(str(archive), str(project)) == expected
+    assert "# Project Overview: proj\n" in report
+    assert "[SKIP] Binary file" in report
+    assert "bytes elided" in report
+    assert "generated" not in report
+    assert "cache.py" not in report
+
+
+def test_tar_keeps_only_requested_members(project: Path):
+    """A tar archive is read once, keeping only the requested members."""
+    archive = _archive(project, ".tar.gz")
+    tar_fs = fs.TarFS(archive, keep=lambda rel_path: rel_path.endswith(".py"))
+
+    assert tar_fs.name == "proj"
+    assert tar_fs.stat(Path("README.md")).st_size == len("# Project\n")
+    text = tar_fs.read_text(Path("src/main.py"))
+    assert text == ("print('main')\n", "ascii")
+    with pytest.raises(OSError):
+        tar_fs.read_text(Path("README.md"))
+    with pytest.raises(FileNotFoundError):
+        tar_fs.stat(Path("missing.py"))
+
+
+def test_archive_without_top_level_directory(project: Path):
+    """Without a single top-level directory, the archive name is the root."""
+    archive = _archive(project, ".zip", prefix="")
+    zip_fs = fs.open_project(archive)
+
+    assert isinstance(zip_fs, fs.ZipFS)
+    assert zip_fs.name == "proj"
+    tree = zip_fs.scan({"build"})
+    assert [child.name for child in tree.children] == [
+        "src",
+        ".gitignore",
+        "big.txt",
+        "README.md",
+    ]
+
+
+def test_open_project_rejects_invalid_archive(tmp_path: Path):
+    """A file with an archive suffix but no archive content is an error."""
+    path = tmp_path / "broken.tar.gz"
+    path.write_bytes(b"not an archive")
+
+    assert fs.is_archive(path)
+    assert isinstance(fs.open_project(tmp_path), fs.DirectoryFS)
+    with pytest.raises(ValueError, match="not a valid archive"):
+        fs.open_project(path)
+
+
+def test_tar_keeps_only_ends_of_oversized_member(project: Path):
+    """Of a member over its size limit, only the excerpt's ends are kept."""
+    lines = [f"línea {i}\n" for i in range(300_000)]
+    (project / "huge.txt").write_text("".join(lines), encoding="utf-8")
+    size = (project / "huge.txt").stat().st_size
+    archive = _archive(project, ".tar.gz")
+    expected = TextProjectBuilder(_config(project)).generate_report()
+    stats = Stats()
+    report = TextProjectBuilder(
+        _config(archive), stats=stats
+    ).generate_report()
+
+    assert report.replace(str(archive), str(project)) == expected
+    assert "línea 0\n" in report
+    assert "línea 299999\n" in report
+    assert "bytes elided" in report
+    assert stats.counters["archive_bytes_kept"] < size // 100
+    tar_fs = fs.TarFS(
+        archive, keep=lambda rel_path: True, size_limit=lambda rel_path: 1024
+    )
+    with pytest.raises(OSError):
+        tar_fs.read_text(Path("huge.txt"))
+
+
+def test_zip_close(project: Path):
+    """Closing a zip filesystem closes its archive."""
+    zip_fs = fs.open_project(_archive(project, ".zip"))
+    zip_fs.close()
+
+    with pytest.raises(ValueError):
+        zip_fs.read_text(Path("README.md"))
@@ -0,0 +1,131 @@
+"""Tests for the txt2llm.git module."""
+
+import dataclasses
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from txt2llm import git
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("git") is None, reason="git is not installed"
+)
+
+
+@pytest.fixture
+def git_project(tmp_path: Path) -> Path:
+    """Creates a git work tree with tracked, untracked and ignored files."""
+    root = tmp_path / "repo"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('Hello')")
+    (root / ".gitignore").write_text("build/\n")
+    (root / "build").mkdir()
+    (root / "build" / "generated.py").write_text("junk = 1")
+    subprocess.run(["git", "init", "-q"], cwd=root, check=True)
+    subprocess.run(["git", "add", "."], cwd=root, check=True)
+    (root / "notes.md").write_text("untracked")
+    return root
+
+
+def test_ls_files(git_project: Path):
+    """Tests listing tracked and untracked files from the index."""
+    assert sorted(git.ls_files(git_project)) == [".gitignore", "src/main.py"]
+    assert sorted(git.ls_files(git_project, untracked=True)) == [
+        ".gitignore",
+        "notes.md",
+        "src/main.py",
+    ]
+
+
+def test_ls_files_skips_deleted_files(git_project: Path):
+    """Tests that tracked files deleted from the work tree are skipped."""
+    (git_project / "src" / "main.py").unlink()
+    assert git.ls_files(git_project) == [".gitignore"]
+
+
+def test_ls_files_outside_work_tree(tmp_path: Path):
+    """Tests that a directory outside a work tree raises GitError."""
+    with pytest.raises(git.GitError):
+        git.ls_files(tmp_path)
+
+
+def test_builder_git_source(git_project: Path):
+    """Tests that the git source skips ignored build output."""
+    config = ProjectConfig(
+        project_root=git_project,
+        output_path=git_project / "out.txt",
+        ignored_dirs={".git"},
+        include_exts={".py", ".md"},
+        source="git",
+    )
+    builder = TextProjectBuilder(config)
+    assert builder._find_files() == [Path("src/main.py")]
+    assert builder._generate_tree() == (
+        "repo/\n├── src/\n│   └── main.py\n└── .gitignore"
+    )
+
+    untracked = dataclasses.replace(config, git_untracked=True)
+    assert TextProjectBuilder(untracked)._find_files() == [
+        Path("notes.md"),
+        Path("src/main.py"),
+    ]
+
+
+def _commit(root: Path) -> None:
+    """Commits everything staged in a test work tree."""
+    identity = ["-c", "user.name=t", "-c", "user.email=t@t"]
+    subprocess.run(
+        ["git", *identity, "commit", "-q", "-m", "base"], cwd=root, check=True
+    )
+
+
+def test_changed_files_and_diff(git_project: Path):
+    """Tests listing and diffing the files changed since a commit."""
+    (git_project / "src" / "old.py").write_text("gone = True\n")
+    subprocess.run(["git", "add", "."], cwd=git_project, check=True)
+    _commit(git_project)
+    (git_project / "src" / "main.py").write_text("print('Bye')")
+    (git_project / "src" / "old.py").unlink()
+    (git_project / "new.md").write_text("untracked")
+
+    changed, deleted = git.changed_files(git_project, "HEAD")
+    assert sorted(changed) == ["new.md", "src/main.py"]
+    assert deleted == ["src/old.py"]
+    diff = git.diff(git_project, "HEAD", "src/main.py")
+    assert diff.startswith("--- a/src/main.py\n+++ b/src/main.py\n@@")
+    assert "\n-print('Hello')\n" in diff and "\n+print('Bye')" in diff
+    assert git.diff(git_project, "HEAD", "new.md") == ""
+
+    with pytest.raises(git.GitError):
+        git.changed_files(git_project, "no-such-ref")
+
+
+def test_builder_since(git_project: Path):
+    """Tests that only files changed since a commit are shown in full."""
+    (git_project / "src" / "util.py").write_text("x = 1\n")
+    subprocess.run(["git", "add", "."], cwd=git_project, check=True)
+    _commit(git_project)
+    (git_project / "src" / "main.py").write_text("print('Bye')\n")
+    config = ProjectConfig(
+        project_root=git_project,
+        output_path=git_project / "out.txt",
+        ignored_dirs={".git", "build"},
+        include_exts={".py"},
+        since="HEAD",
+    )
+    report = TextProjectBuilder(config).generate_report()
+    assert "- Changes Since: `HEAD`" in report
+    assert "### `src/main.py`\n\n```python\nprint('Bye')\n" in report
+    assert "### `src/util.py`" not in report
+    assert report.endswith(
+        "## Unchanged Files (since `HEAD`)\n\n- `src/util.py`\n"
+    )
+
+    diffs = dataclasses.replace(config, since_diff=True)
+    report = TextProjectBuilder(diffs).generate_report()
+    assert "### `src/main.py` (diff against `HEAD`)\n\n```diff\n" in report
+    assert "+print('Bye')\n```\n" in report
@@ -0,0 +1,72 @@
+"""Tests for the txt2llm.ignore module."""
+
+from pathlib import Path
+
+import pytest
+
+from txt2llm.ignore import IgnoreMatcher, RuleSet, parse_pattern
+
+
+def _rule_set(*lines: str) -> RuleSet:
+    """Compiles the given pattern lines into a root rule set."""
+    return RuleSet("", [r for r in map(parse_pattern, lines) if r])
+
+
+@pytest.mark.parametrize(
+    "pattern, path, is_dir, expected",
+    [
+        ("*.min.js", "static/app.min.js", False, True),
+        ("*.min.js", "static/app.js", False, None),
+        ("build/", "build", True, True),
+        ("build/", "pkg/build", True, True),
+        ("build/", "build", False, None),
+        ("/build", "build", True, True),
+        ("/build", "pkg/build", True, None),
+        ("docs/**/generated", "docs/generated", True, True),
+        ("docs/**/generated", "docs/a/b/generated", True, True),
+        ("docs/**/generated", "src/docs/generated", True, None),
+        ("**/tmp", "a/b/tmp", False, True),
+        ("logs/**", "logs/a/b.txt", False, True),
+        ("file?.[ch]", "src/file1.c", False, True),
+        ("file[!0-9].c", "file1.c", False, None),
+        ("a/*.py", "a/b/c.py", False, None),
+        ("\\#notes", "#notes", False, True),
+        ("# comment", "# comment", False, None),
+    ],
+)
+def test_pattern_semantics(pattern, path, is_dir, expected):
+    """Tests gitignore pattern semantics on single rules."""
+    assert _rule_set(pattern).match(path, is_dir) is expected
+
+
+def test_later_rules_and_negation_take_precedence():
+    """Tests that the last matching rule decides."""
+    rules = _rule_set("*.log", "!keep.log", "keep.log.d/", "important/*.log")
+
+    assert rules.match("debug.log", False) is True
+    assert rules.match("keep.log", False) is False
+    assert rules.match("important/keep.log", False) is True
+    assert rules.match("notes.txt", False) is None
+
+
+def test_nested_ignore_files_override_parents(tmp_path: Path):
+    """Tests that deeper ignore files take precedence over parents."""
+    (tmp_path / ".gitignore").write_text("*.gen.py\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / ".txt2llmignore").write_text(
+        "!keep.gen.py\n/local/\n"
+    )
+
+    matcher = IgnoreMatcher(tmp_path, extra_patterns=["*.min.js"])
+    root = matcher.root_level({".gitignore", "pkg"})
+    pkg = matcher.child_level(root, "pkg", {".txt2llmignore"})
+
+    assert root.is_ignored("a.gen.py", False)
+    assert root.is_ignored("web/app.min.js", False)
+    assert pkg.is_ignored("pkg/other.gen.py", False)
+    assert not pkg.is_ignored("pkg/keep.gen.py", False)
+    assert pkg.is_ignored("pkg/local", True)
+    assert not pkg.is_ignored("pkg/sub/local", True)
+    assert matcher.ignore_file_paths("pkg", {".txt2llmignore"}) == [
+        "pkg/.txt2llmignore"
+    ]
@@ -0,0 +1,68 @@
+"""Tests for the txt2llm.index module."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from txt2llm import index
+
+
+def test_lookup_roundtrip(tmp_path: Path):
+    """Tests that every key is found at its offset and others are not."""
+    writer = index.IndexWriter()
+    keys = [index.TREE_KEY] + [f"src/módulo_{i}.py" for i in range(1000)]
+    for i, key in enumerate(keys):
+        writer.add(key, i * 100, i + 1)
+    path = tmp_path / "report.txt.idx"
+    writer.save(path, 123456)
+
+    with index.ReportIndex(path) as report_index:
+        assert len(report_index) == len(keys)
+        assert report_index.report_size == 123456
+        for i, key in enumerate(keys):
+            assert report_index.lookup(key) == (i * 100, i + 1)
+        assert report_index.lookup("src/missing.py") is None
+        assert report_index.lookup("src/módulo_1.pyc") is None
+
+
+def test_empty_index(tmp_path: Path):
+    """Tests that an index without sections finds nothing."""
+    path = tmp_path / "report.txt.idx"
+    index.IndexWriter().save(path, 0)
+    with index.ReportIndex(path) as report_index:
+        assert len(report_index) == 0
+        assert report_index.lookup("a.py") is None
+
+
+def test_invalid_index(tmp_path: Path):
+    """Tests that files other than indexes are rejected."""
+    empty = tmp_path / "empty.idx"
+    empty.write_bytes(b"")
+    other = tmp_path / "other.idx"
+    other.write_bytes(b"not an index, but long enough for a header")
+    for path in (empty, other):
+        with pytest.raises(ValueError, match="not a report index"):
+            index.ReportIndex(path)
+
+
+def test_extract(tmp_path: Path):
+    """Tests that sections are read back and stale indexes rejected."""
+    report = tmp_path / "report.txt"
+    report.write_bytes("head\nñ section\ntail\n".encode("utf-8"))
+    writer = index.IndexWriter()
+    writer.add("a.py", 5, len("ñ section\n".encode("utf-8")))
+    buffer = io.BytesIO()
+    writer.write(buffer, report.stat().st_size)
+    path = index.index_path(report)
+    assert path == tmp_path / "report.txt.idx"
+    path.write_bytes(buffer.getvalue())
+
+    with index.ReportIndex(path) as report_index:
+        assert index.extract(report, report_index, "a.py") == (
+            "ñ section\n".encode("utf-8")
+        )
+        assert index.extract(report, report_index, "b.py") is None
+        report.write_text("changed")
+        with pytest.raises(ValueError, match="regenerate"):
+            index.extract(report, report_index, "a.py")
@@ -1,10 +1,11 @@
 """Tests for the txt2llm.main module."""
 
 import argparse
+import logging
 import sys
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, mock_open
 
 import pytest
 
@@ -19,6 +20,12 @@ def mock_project_root(tmp_path: Path) -> Path:
     (tmp_path / "my_test_project" / "file.txt").write_text("content")
     return tmp_path / "my_test_project"
 
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keeps the persistent caches of the tests in a temporary directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
 @pytest.fixture
 def mock_datetime_now():
     """Mocks datetime.now() to return a fixed datetime and its strftime method."""
@@ -36,10 +43,8 @@ def mock_sys_exit():
 
 @pytest.fixture
 def mock_text_project_builder():
-    """Mocks TextProjectBuilder and its generate_report method."""
+    """Mocks TextProjectBuilder and its report methods."""
     with patch("txt2llm.main.TextProjectBuilder") as MockBuilder:
-        mock_instance = MockBuilder.return_value
-        mock_instance.generate_report.return_value = "Mock Report Content"
         yield MockBuilder
 
 @pytest.fixture
@@ -55,10 +60,10 @@ def mock_path_mkdir():
         yield mock_mkdir
 
 @pytest.fixture
-def mock_path_write_text():
-    """Mocks Path.write_text to capture content and prevent actual file writing."""
-    with patch("pathlib.Path.write_text") as mock_write:
-        yield mock_write
+def mock_path_open():
+    """Mocks Path.open to capture the output stream and prevent actual file writing."""
+    with patch("pathlib.Path.open", mock_open()) as mock_file:
+        yield mock_file
 
 def test_default_output_path_generation(
     mock_project_root: Path,
@@ -67,7 +72,7 @@ def test_default_output_path_generation(
     mock_text_project_builder,
     mock_project_config,
     mock_path_mkdir,
-    mock_path_write_text,
+    mock_path_open,
 ):
     """
     Tests that the default output path is correctly generated
@@ -75,12 +80,7 @@ def test_default_output_path_generation(
     """
     test_args = ["--path", str(mock_project_root)]
     with patch.object(sys, "argv", ["main.py"] + test_args):
-        with patch("argparse.ArgumentParser.parse_args") as mock_parse_args:
-            mock_args = MagicMock()
-            mock_args.path = mock_project_root
-            mock_args.output = None
-            mock_parse_args.return_value = mock_args
-
+        with patch("txt2llm.main.ReportCache") as mock_report_cache:
             main()
 
             # Determine the txt2llm project root based on the test file's location.
@@ -98,26 +98,36 @@ def test_default_output_path_generation(
             config_call_args = mock_project_config.call_args[1]
             assert config_call_args["output_path"] == expected_output_path
 
-            # Verify mkdir was called for the output directory
-            mock_path_mkdir.assert_called_once_with(parents=True, exist_ok=True)
+            # Verify mkdir was called for the output and cache directories
+            assert mock_path_mkdir.call_count == 2
+            mock_path_mkdir.assert_called_with(parents=True, exist_ok=True)
 
-            # Verify TextProjectBuilder was instantiated and generate_report called
-            mock_text_project_builder.assert_called_once_with(mock_project_config.return_value)
-            mock_text_project_builder.return_value.generate_report.assert_called_once()
+            # Verify TextProjectBuilder was instantiated and write_report called
+            mock_text_project_builder.assert_called_once_with(
+                mock_project_config.return_value,
+                cache=mock_report_cache.return_value,
+                tokenizer=None,
+                stats=None,
+            )
 
-            # Verify write_text was called with the correct path and content
-            mock_path_write_text.assert_called_once_with(
-                "Mock Report Content", encoding="utf-8"
+            # Verify the report was streamed into the opened output file
+            mock_path_open.assert_called_once_with(
+                "w", encoding="utf-8", buffering=1024 * 1024
+            )
+            mock_text_project_builder.return_value.write_report.assert_called_once_with(
+                mock_path_open.return_value
             )
-            
+            mock_report_cache.return_value.close.assert_called_once()
+
 
 def test_explicit_output_path(
     mock_project_root: Path,
+    cache_home: Path,
     mock_sys_exit,
     mock_text_project_builder,
     mock_project_config,
     mock_path_mkdir,
-    mock_path_write_text,
+    mock_path_open,
 ):
     """
     Tests that the explicit output path is used when --output is provided.
@@ -125,31 +135,44 @@ def test_explicit_output_path(
     explicit_output = mock_project_root.parent / "custom_report.txt"
     test_args = ["--path", str(mock_project_root), "--output", str(explicit_output)]
     with patch.object(sys, "argv", ["main.py"] + test_args):
-        with patch("argparse.ArgumentParser.parse_args") as mock_parse_args:
-            mock_args = MagicMock()
-            mock_args.path = mock_project_root
-            mock_args.output = explicit_output
-            mock_parse_args.return_value = mock_args
-
+        with patch("txt2llm.main.ReportCache") as mock_report_cache:
             main()
 
             # Verify ProjectConfig was called with the explicit output_path
             mock_project_config.assert_called_once()
             config_call_args = mock_project_config.call_args[1]
             assert config_call_args["output_path"] == explicit_output
+            # Files are shown in full unless a size limit is given
+            assert config_call_args["max_file_bytes"] is None
+            assert config_call_args["ext_max_file_bytes"] == {}
 
-            # Verify mkdir was NOT called for the default output path
-            mock_path_mkdir.assert_not_called()
+            # Verify mkdir was only called for the cache directory, not
+            # for the default output path
+            mock_path_mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
-            # Verify TextProjectBuilder was instantiated and generate_report called
-            mock_text_project_builder.assert_called_once_with(mock_project_config.return_value)
-            mock_text_project_builder.return_value.generate_report.assert_called_once()
+            # Verify the cache is kept in the user cache directory, not
+            # next to the explicit output file
+            cache_path = mock_report_cache.call_args[0][0]
+            assert cache_path.parent == cache_home / "txt2llm"
+            assert cache_path.name.startswith("my_test_project_")
+
+            # Verify TextProjectBuilder was instantiated and write_report called
+            mock_text_project_builder.assert_called_once_with(
+                mock_project_config.return_value,
+                cache=mock_report_cache.return_value,
+                tokenizer=None,
+                stats=None,
+            )
 
-            # Verify write_text was called with the correct path and content
-            mock_path_write_text.assert_called_once_with(
-                "Mock Report Content", encoding="utf-8"
+            # Verify the report was streamed into the opened output file
+            mock_path_open.assert_called_once_with(
+                "w", encoding="utf-8", buffering=1024 * 1024
+            )
+            mock_text_project_builder.return_value.write_report.assert_called_once_with(
+                mock_path_open.return_value
             )
-            
+            mock_report_cache.return_value.close.assert_called_once()
+
 
 def test_invalid_project_path(
     tmp_path: Path,
@@ -159,18 +182,56 @@ def test_invalid_project_path(
     invalid_path = tmp_path / "non_existent_dir"
     test_args = ["--path", str(invalid_path)]
     with patch.object(sys, "argv", ["main.py"] + test_args):
-        with patch("argparse.ArgumentParser.parse_args") as mock_parse_args, patch("txt2llm.main.ProjectConfig") as MockProjectConfig, patch("txt2llm.main.TextProjectBuilder") as MockTextProjectBuilder, patch("pathlib.Path.mkdir") as mock_mkdir, patch("pathlib.Path.write_text") as mock_write_text:
+        with patch("argparse.ArgumentParser.parse_args") as mock_parse_args, patch("txt2llm.main.ProjectConfig") as MockProjectConfig, patch("txt2llm.main.TextProjectBuilder") as MockTextProjectBuilder, patch("pathlib.Path.mkdir") as mock_mkdir, patch("pathlib.Path.open") as mock_open_file:
 
             mock_args = MagicMock()
-            mock_args.path = invalid_path
+            mock_args.path = [invalid_path]
+            mock_args.manifest = None
             mock_args.output = None
             mock_parse_args.return_value = mock_args
 
             main()
             mock_sys_exit.assert_called_once_with(1)
 
-            # Verify that ProjectConfig, TextProjectBuilder, mkdir, and write_text were NOT called
+            # Verify that ProjectConfig, TextProjectBuilder, mkdir, and open were NOT called
             MockProjectConfig.assert_not_called()
             MockTextProjectBuilder.assert_not_called()
             mock_mkdir.assert_not_called()
-            mock_write_text.assert_not_called()
+            mock_open_file.assert_not_called()
+
+
+def test_stdout_output(
+    mock_project_root: Path, capsys: pytest.CaptureFixture[str]
+):
+    """Tests that '--output -' streams only the report to stdout."""
+    # Log to the captured stdout, as the module does on import.
+    logging.basicConfig(level=logging.INFO, stream=sys.stdout, force=True)
+    test_args = ["--path", str(mock_project_root), "--output", "-", "--no-cache"]
+    with patch.object(sys, "argv", ["main.py"] + test_args):
+        main()
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith("# Project Overview: my_test_project\n")
+    assert "```text\ncontent\n```" in captured.out
+    assert "Starting project overview generation" in captured.err
+
+
+def test_token_budget_after_warm_cache(tmp_path: Path):
+    """A cache warmed without token counting does not defeat a budget."""
+    root = tmp_path / "proj"
+    root.mkdir()
+    for i in range(5):
+        (root / f"file{i}.txt").write_text(f"word{i} " * 100)
+    output = tmp_path / "report.md"
+    args = ["main.py", "--path", str(root), "--output", str(output)]
+    with patch.object(sys, "argv", args):
+        main()
+    with patch.object(sys, "argv", args + ["--max-tokens", "500"]):
+        main()
+    report = output.read_text(encoding="utf-8")
+    with patch.object(sys, "argv", args + ["--max-tokens", "500", "--no-cache"]):
+        main()
+
+    assert "### `file0.txt` (" in report
+    assert "[SKIP] Token budget exceeded" in report
+    assert report == output.read_text(encoding="utf-8")
@@ -0,0 +1,179 @@
+"Tests for the txt2llm.order module."
+
+from pathlib import Path
+
+import pytest
+
+from txt2llm import core, order
+from txt2llm.cache import ReportCache
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+from txt2llm.stats import Stats
+
+
+def test_extract_imports():
+    """Imports are found in each supported language."""
+    python = (
+        "import os, pkg.models\n"
+        "from . import util\n"
+        "from ..core import engine as e\n"
+        "from .helpers import *\n"
+        "def f():\n"
+        "    import json\n"
+    )
+    assert order.extract_imports(python, "python") == (
+        "os",
+        "pkg.models",
+        ".util",
+        "..core.engine",
+        ".helpers",
+        "json",
+    )
+    assert order.extract_imports("def broken(:\n", "python") == ()
+
+    javascript = (
+        "import React from 'react';\n"
+        "import { a } from './a';\n"
+        "export * from \"../b/index.js\";\n"
+        "const c = require('./c');\n"
+        "import('./d').then(run);\n"
+    )
+    assert order.extract_imports(javascript, "javascript") == (
+        "./a",
+        "../b/index.js",
+        "./c",
+        "./d",
+    )
+
+    go = (
+        'package main\n\nimport "fmt"\n\n'
+        'import (\n\t"example.com/app/internal/db"\n\tlog "example.com/x"\n)\n'
+    )
+    assert order.extract_imports(go, "go") == (
+        "fmt",
+        "example.com/app/internal/db",
+        "example.com/x",
+    )
+
+    c = '#include <stdio.h>\n#include "util.h"\n  # include "lib/io.h"\n'
+    assert order.extract_imports(c, "c") == ("util.h", "lib/io.h")
+
+
+def test_build_graph_resolves_project_files():
+    """Only imports of files in the report become edges."""
+    files = [
+        "src/app/__init__.py",
+        "src/app/main.py",
+        "src/app/models.py",
+        "src/app/sub/__init__.py",
+        "src/app/sub/views.py",
+        "scripts/run.py",
+        "scripts/helper.py",
+        "web/index.ts",
+        "web/lib/index.ts",
+        "web/util.js",
+        "cmd/main.go",
+        "internal/db/db.go",
+        "internal/db/db_test.go",
+        "native/main.c",
+        "native/include/util.h",
+    ]
+    imports = {
+        "src/app/main.py": ("os", "app.models", ".sub.views"),
+        # A name imported from a package resolves to its __init__.py.
+        "src/app/sub/views.py": ("..models", "..settings"),
+        "scripts/run.py": ("helper", "app"),
+        "web/index.ts": ("./lib", "./util.js"),
+        "cmd/main.go": ("example.com/proj/internal/db", "fmt"),
+        "native/main.c": ("include/util.h", "util.h"),
+    }
+
+    assert order.build_graph(files, imports) == {
+        "src/app/main.py": {"src/app/models.py", "src/app/sub/views.py"},
+        "src/app/sub/views.py": {"src/app/models.py", "src/app/__init__.py"},
+        "scripts/run.py": {"scripts/helper.py", "src/app/__init__.py"},
+        "web/index.ts": {"web/lib/index.ts", "web/util.js"},
+        "cmd/main.go": {"internal/db/db.go"},
+        "native/main.c": {"native/include/util.h"},
+    }
+
+
+def test_rank_by_centrality_and_entry_points():
+    """Imported files rank first, or files near the entry points."""
+    files = ["a.py", "b.py", "core.py", "main.py", "tests.py", "util.py"]
+    graph = {
+        "main.py": {"a.py", "b.py"},
+        "a.py": {"core.py"},
+        "b.py": {"core.py", "util.py"},
+        "tests.py": {"core.py"},
+    }
+
+    ranked = order.rank(files, graph)
+    assert ranked[0] == "core.py"
+    assert ranked.index("util.py") < ranked.index("main.py")
+    assert ranked[-2:] == ["main.py", "tests.py"]
+
+    assert order.rank(files, graph, ["main.py", "missing.py"]) == [
+        "main.py",
+        "a.py",
+        "b.py",
+        "core.py",
+        "util.py",
+        "tests.py",
+    ]
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> ProjectConfig:
+    """Creates a small Python project ordered by its imports."""
+    root = tmp_path / "proj"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "__init__.py").write_text("")
+    (root / "app" / "main.py").write_text("from app import service\n")
+    (root / "app" / "service.py").write_text("from . import store\n")
+    (root / "app" / "store.py").write_text("DATA = {}\n")
+    (root / "README.md").write_text("# Project\n")
+    return ProjectConfig(
+        project_root=root,
+        output_path=tmp_path / "output.txt",
+        ignored_dirs=set(),
+        include_exts={".py", ".md"},
+        order="imports",
+        entry_points=("app/main.py",),
+    )
+
+
+def test_builder_orders_by_imports(config: ProjectConfig, tmp_path: Path):
+    """The report follows the import order; imports are cached."""
+    expected = [
+        Path("app/main.py"),
+        Path("app/service.py"),
+        Path("app/store.py"),
+        Path("README.md"),
+        Path("app/__init__.py"),
+    ]
+    cache_path = tmp_path / "cache.sqlite3"
+    stats = Stats()
+    with ReportCache(cache_path, config) as cache:
+        builder = TextProjectBuilder(config, cache=cache, stats=stats)
+        assert builder._find_files() == expected
+        report = builder.generate_report()
+    assert report.index("app/main.py`") < report.index("app/store.py`")
+    assert stats.counters["imports_parsed"] == 4
+
+    stats = Stats()
+    with ReportCache(cache_path, config) as cache:
+        builder = TextProjectBuilder(config, cache=cache, stats=stats)
+        assert builder._find_files() == expected
+    assert stats.counters["imports_cached"] == 4
+
+
+def test_builder_parses_imports_in_processes(
+    config: ProjectConfig, monkeypatch: pytest.MonkeyPatch
+):
+    """Imports parsed by a process pool give the same order."""
+    sequential = TextProjectBuilder(config)._find_files()
+    monkeypatch.setattr(core, "_PARALLEL_IMPORTS_MIN", 1)
+    parallel_config = ProjectConfig(**{**vars(config), "jobs": 2})
+
+    assert TextProjectBuilder(parallel_config)._find_files() == sequential
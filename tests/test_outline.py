@@ -0,0 +1,252 @@
+"""Tests for the txt2llm.outline module."""
+
+import dataclasses
+import json
+from pathlib import Path
+
+import pytest
+
+from txt2llm import core
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+from txt2llm.outline import has_outline, outline
+from txt2llm.stats import Stats
+
+_PYTHON = '''\
+"""Module docstring."""
+
+import os
+
+MAX_SIZE = 10
+counter = 0
+__all__ = [
+    "a",
+    "b",
+    "c",
+    "d",
+    "e",
+    "f",
+    "g",
+    "h",
+    "i",
+]
+
+
+@dataclasses.dataclass
+class Point(Base):
+    """A point."""
+
+    # The coordinates.
+    x: int
+    y: int = 0
+    ORIGIN = None
+
+    def norm(
+        self, p: int = 2
+    ) -> float:
+        # Compute the norm.
+        return (self.x**p + self.y**p) ** (1 / p)
+
+
+class Error(Exception): pass
+
+
+class Empty:
+    pass
+
+
+async def fetch(url: str) -> bytes:
+    """Fetches a URL."""
+    return b""
+'''
+
+
+def test_python_outline():
+    """Signatures, docstring and constants are kept; bodies elided."""
+    assert outline(_PYTHON, "python") == (
+        '"""Module docstring."""\n'
+        "MAX_SIZE = 10\n"
+        "__all__ = ...\n"
+        "\n"
+        "@dataclasses.dataclass\n"
+        "class Point(Base):\n"
+        "    x: int\n"
+        "    y: int = 0\n"
+        "    ORIGIN = None\n"
+        "    def norm(\n"
+        "        self, p: int = 2\n"
+        "    ) -> float:\n"
+        "        ...\n"
+        "\n"
+        "class Error(Exception): pass\n"
+        "\n"
+        "class Empty:\n"
+        "    ...\n"
+        "\n"
+        "async def fetch(url: str) -> bytes:\n"
+        "    ...\n"
+    )
+    assert outline("def broken(:\n", "python") is None
+
+
+def test_brace_outline():
+    """Bodies are elided; the members of type blocks are kept."""
+    c = (
+        "/* License. */\n"
+        "#include <stdio.h>\n"
+        "\n"
+        "typedef struct {\n"
+        "    int x; /* { */\n"
+        "} point;\n"
+        'static const char *NAME = "a { b";\n'
+        "struct node *make(struct node *next,\n"
+        "                  int value) {\n"
+        "    if (next) {\n"
+        "        return next;\n"
+        "    }\n"
+        "}\n"
+    )
+    assert outline(c, "c") == (
+        "#include <stdio.h>\n"
+        "\n"
+        "typedef struct {\n"
+        "    int x;\n"
+        "} point;\n"
+        'static const char *NAME = "a { b";\n'
+        "struct node *make(struct node *next,\n"
+        "                  int value) { ... }\n"
+    )
+
+    typescript = (
+        "export class Widget extends Base {\n"
+        "  private size = 3;\n"
+        "  render(): string {\n"
+        "    return `${this.size} }`;\n"
+        "  }\n"
+        "}\n"
+        "export const DEFAULTS = {\n"
+        "  name: 'w',\n"
+        "};\n"
+    )
+    assert outline(typescript, "typescript") == (
+        "export class Widget extends Base {\n"
+        "  private size = 3;\n"
+        "  render(): string { ... }\n"
+        "}\n"
+        "export const DEFAULTS = { ... }\n"
+    )
+    assert outline("a: 1\n", "yaml") is None
+
+
+def test_brace_outline_one_line_bodies():
+    """Bodies closed in the line that opens them are elided as well."""
+    c = (
+        "int add(int a, int b) { return a + b; }\n"
+        "static void noop(void) {}\n"
+        "struct point { int x; int y; };\n"
+        "int primes[] = {2, 3, 5};\n"
+    )
+    assert outline(c, "c") == (
+        "int add(int a, int b) { ... }\n"
+        "static void noop(void) {}\n"
+        "struct point { int x; int y; };\n"
+        "int primes[] = { ... };\n"
+    )
+
+    javascript = (
+        "class Counter {\n"
+        "  get value() { return this.count; }\n"
+        "}\n"
+        "function f() { return { a: '}' }; }\n"
+    )
+    assert outline(javascript, "javascript") == (
+        "class Counter {\n"
+        "  get value() { ... }\n"
+        "}\n"
+        "function f() { ... }\n"
+    )
+
+
+def test_has_outline():
+    """Only extensions of supported languages have an outline."""
+    assert has_outline(".py")
+    assert has_outline(".h")
+    assert not has_outline(".md")
+    assert not has_outline(".unknown")
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> ProjectConfig:
+    """Creates a small project with Python files outlined."""
+    root = tmp_path / "proj"
+    root.mkdir()
+    (root / "app.py").write_text(_PYTHON)
+    (root / "broken.py").write_text("def broken(:\n")
+    (root / "README.md").write_text("# Project\n")
+    return ProjectConfig(
+        project_root=root,
+        output_path=tmp_path / "output.txt",
+        ignored_dirs=set(),
+        include_exts={".py", ".md"},
+        outline_exts=frozenset({".py"}),
+    )
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_builder_outlines_files(config: ProjectConfig, jobs: int):
+    """Outlined files are noted, and their savings counted."""
+    stats = Stats()
+    config = dataclasses.replace(config, jobs=jobs)
+    report = TextProjectBuilder(config, stats=stats).generate_report()
+
+    assert "### `app.py` (outline)" in report
+    assert "        ...\n" in report
+    assert "(self.x**p" not in report
+    assert "### `broken.py`\n\n```python\ndef broken(:\n" in report
+    assert "### `README.md`\n\n```markdown\n# Project\n" in report
+    assert stats.counters["outline_bytes_saved.python"] > 0
+    assert stats.counters["outline_tokens_saved.python"] > 0
+    assert stats.phases["outline"].calls == 1
+
+
+@pytest.mark.parametrize(
+    "jobs, outline_min, pools",
+    [(1, 1, []), (2, 64, []), (2, 1, [2])],
+)
+def test_builder_outline_pool(
+    config: ProjectConfig,
+    monkeypatch: pytest.MonkeyPatch,
+    jobs: int,
+    outline_min: int,
+    pools: list[int],
+):
+    """A process pool of ``jobs`` workers is only started for many files."""
+    started = []
+
+    class RecordingPool(core.ProcessPoolExecutor):
+        def __init__(self, max_workers: int):
+            super().__init__(max_workers)
+            started.append(max_workers)
+
+    monkeypatch.setattr(core, "ProcessPoolExecutor", RecordingPool)
+    monkeypatch.setattr(core, "_PARALLEL_OUTLINE_MIN", outline_min)
+    stats = Stats()
+    config = dataclasses.replace(config, jobs=jobs)
+    report = TextProjectBuilder(config, stats=stats).generate_report()
+
+    assert "### `app.py` (outline)" in report
+    assert started == pools
+    assert stats.phases["outline"].calls == 1
+
+
+def test_builder_outline_records(config: ProjectConfig):
+    """jsonl records tell whether their content is an outline."""
+    config = dataclasses.replace(config, output_format="jsonl")
+    report = TextProjectBuilder(config).generate_report()
+    records = [json.loads(line) for line in report.splitlines()]
+    by_path = {r["path"]: r for r in records if r["type"] == "file"}
+
+    assert by_path["app.py"]["outline"] is True
+    assert by_path["app.py"]["content"].startswith('"""Module docstring')
+    assert by_path["broken.py"]["outline"] is False
+    assert by_path["README.md"]["outline"] is False
@@ -0,0 +1,80 @@
+"""Tests for the txt2llm.shard module."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from txt2llm.shard import ShardWriter, utf8_size
+
+
+def _section(name: str, body: str) -> str:
+    return f"### `{name}`\n\n```python\n{body}\n```\n"
+
+
+def test_sections_are_packed_without_splitting(tmp_path: Path):
+    """Tests that whole sections are packed into parts within the limit."""
+    writer = ShardWriter(tmp_path / "report.txt", "demo", 200)
+    for i in range(4):
+        writer.add(f"`f{i}.py`", _section(f"f{i}.py", f"x = {i}\n" * 5))
+    parts = writer.close()
+
+    assert [p.name for p in parts] == [
+        "report_part001.txt",
+        "report_part002.txt",
+    ]
+    first = parts[0].read_text(encoding="utf-8")
+    assert first.startswith(
+        "# Project Overview: demo (part 001)\n\n## Contents\n\n"
+        "- `f0.py`\n- `f1.py`\n\n---\n\n"
+    )
+    assert first.count("```python") == 2
+    for part in parts:
+        assert utf8_size(part.read_text(encoding="utf-8")) <= 200
+
+
+def test_oversized_section_is_split_with_closed_fences(tmp_path: Path):
+    """Tests that a section larger than a part is split across parts."""
+    body = "\n".join(f"line {i}" for i in range(100))
+    writer = ShardWriter(tmp_path / "report.txt", "demo", 300)
+    writer.add("`big.py`", _section("big.py", body))
+    writer.add("`small.py`", _section("small.py", "pass"))
+    parts = writer.close()
+
+    assert len(parts) > 2
+    texts = [p.read_text(encoding="utf-8") for p in parts]
+    for text in texts:
+        assert utf8_size(text) <= 300
+        assert text.count("```") % 2 == 0
+    assert "- `big.py` (continued)" in texts[1]
+    assert "### `small.py`" in texts[-1]
+
+    rejoined = "".join(
+        text.split("```python\n", 1)[1].split("```\n", 1)[0]
+        for text in texts
+        if "big.py" in text.split("---\n", 1)[1]
+    )
+    assert rejoined == body + "\n"
+
+
+def test_compressed_parts(tmp_path: Path):
+    """Tests that a compressed output name compresses every part."""
+    writer = ShardWriter(tmp_path / "report.txt.gz", "demo", 200)
+    for i in range(4):
+        writer.add(f"`f{i}.py`", _section(f"f{i}.py", f"x = {i}\n" * 5))
+    parts = writer.close()
+
+    assert [p.name for p in parts] == [
+        "report_part001.txt.gz",
+        "report_part002.txt.gz",
+    ]
+    first = gzip.decompress(parts[0].read_bytes()).decode("utf-8")
+    assert first.startswith("# Project Overview: demo (part 001)\n")
+    assert utf8_size(first) <= 200
+
+
+def test_limit_too_small(tmp_path: Path):
+    """Tests that a limit below the part header size is rejected."""
+    writer = ShardWriter(tmp_path / "report.txt", "demo", 10)
+    with pytest.raises(ValueError):
+        writer.add("`a.py`", _section("a.py", "pass"))
@@ -0,0 +1,38 @@
+"""Tests for the txt2llm.stats module."""
+
+import json
+import pstats
+from pathlib import Path
+
+from txt2llm.stats import Stats, profiled
+
+
+def test_stats_record_and_serialize(tmp_path: Path):
+    """Tests phases, counters and the slowest files list."""
+    stats = Stats(slowest=2)
+    with stats.phase("scan"):
+        pass
+    stats.add_time("read", 0.5, 0.25)
+    stats.add_time("read", 0.5)
+    stats.count("files_opened")
+    stats.count("bytes_read", 100)
+    for seconds, path in [(0.1, "a"), (0.3, "b"), (0.2, "c")]:
+        stats.record_file(path, seconds, 10)
+
+    stats.write(tmp_path / "stats.json")
+    data = json.loads((tmp_path / "stats.json").read_text())
+
+    assert data["phases"]["read"] == {"wall": 1.0, "cpu": 0.25, "calls": 2}
+    assert data["phases"]["scan"]["calls"] == 1
+    assert data["counters"] == {"bytes_read": 100, "files_opened": 1}
+    assert [f["path"] for f in data["slowest_files"]] == ["b", "c"]
+
+
+def test_profiled_dumps_profile(tmp_path: Path):
+    """Tests that the profiling hook writes a pstats file."""
+    with profiled(None):
+        pass
+    with profiled(tmp_path / "run.prof"):
+        sum(range(1000))
+
+    assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
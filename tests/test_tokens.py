@@ -0,0 +1,33 @@
+"""Tests for the txt2llm.tokens module."""
+
+import pytest
+
+from txt2llm import tokens
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", 0),
+        ("abcd", 1),
+        ("abcde", 2),
+        ("你好世界", 4),
+        ("ab你好", 3),
+    ],
+)
+def test_heuristic_tokenizer(text: str, expected: int):
+    """Tests the heuristic token estimates."""
+    assert tokens.HeuristicTokenizer().count(text) == expected
+
+
+def test_get_tokenizer_heuristic():
+    """Tests that the default specification returns the heuristic."""
+    assert isinstance(
+        tokens.get_tokenizer("heuristic"), tokens.HeuristicTokenizer
+    )
+
+
+def test_get_tokenizer_unknown():
+    """Tests that an unknown specification is rejected."""
+    with pytest.raises(ValueError):
+        tokens.get_tokenizer("bogus")
@@ -50,3 +50,108 @@ def test_is_binary_file_non_existent():
     """Tests is_binary_file with a non-existent file."""
     non_existent_file = Path("non_existent_file.bin")
     assert not utils.is_binary_file(non_existent_file)
+
+
+def test_read_text_file_text(tmp_path: Path):
+    """Tests read_text_file with a text file using CRLF line endings."""
+    text_file = tmp_path / "test.txt"
+    text_file.write_bytes(b"line 1\r\nline 2\rline 3\n")
+    assert utils.read_text_file(text_file) == (
+        "line 1\nline 2\nline 3\n",
+        "ascii",
+    )
+
+
+def test_read_text_file_binary(tmp_path: Path):
+    """Tests that read_text_file returns None for a binary file."""
+    binary_file = tmp_path / "test.bin"
+    binary_file.write_bytes(b"\x00\xDE\xAD\xBE\xEF")
+    assert utils.read_text_file(binary_file) is None
+
+
+def test_read_text_file_mmap(tmp_path: Path, monkeypatch):
+    """Tests read_text_file on files large enough to be memory-mapped."""
+    monkeypatch.setattr(utils, "_MMAP_THRESHOLD", 16)
+    text_file = tmp_path / "large.txt"
+    text_file.write_bytes("héllo wörld\n".encode("utf-8") * 100 + b"\xff")
+    # A stray invalid byte in UTF-8 content is replaced, not dropped.
+    assert utils.read_text_file(text_file) == (
+        "héllo wörld\n" * 100 + "\ufffd",
+        "utf-8",
+    )
+
+    binary_file = tmp_path / "large.bin"
+    binary_file.write_bytes(b"A" * 64 + b"\x00" + b"A" * 64)
+    assert utils.read_text_file(binary_file) is None
+
+
+def test_read_text_file_opens_once(tmp_path: Path, monkeypatch):
+    """Tests that read_text_file opens the file a single time."""
+    text_file = tmp_path / "test.py"
+    text_file.write_text("x = 1\n")
+    opened = []
+    real_open = open
+
+    def recording_open(*args, **kwargs):
+        opened.append(args[0])
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", recording_open)
+    assert utils.read_text_file(text_file) == ("x = 1\n", "ascii")
+    assert opened == [text_file]
+
+
+def test_read_text_file_non_existent():
+    """Tests that read_text_file raises for a non-existent file."""
+    with pytest.raises(OSError):
+        utils.read_text_file(Path("non_existent_file.txt"))
+
+
+def test_read_text_excerpt(tmp_path: Path):
+    """Tests that excerpts keep whole lines from both ends of a file."""
+    text_file = tmp_path / "data.txt"
+    text_file.write_text("".join(f"line {i}\n" for i in range(1000)))
+    head, tail, elided, codec = utils.read_text_excerpt(text_file, 100, 3)
+    assert codec == "ascii"
+    assert head == "line 0\nline 1\nline 2\n"
+    assert tail == "line 997\nline 998\nline 999\n"
+    assert elided == text_file.stat().st_size - len(head) - len(tail)
+
+    # Partial lines at the edges of the read windows are dropped.
+    head, tail, _, _ = utils.read_text_excerpt(text_file, 20, 50)
+    assert head == "line 0\n"
+    assert tail == "line 999\n"
+
+
+def test_read_text_excerpt_long_line_and_binary(tmp_path: Path):
+    """Tests excerpts of a single long line and of a binary file."""
+    text_file = tmp_path / "data.json"
+    text_file.write_text("[" + "1," * 1000 + "1]")
+    excerpt = utils.read_text_excerpt(text_file, 10, 3)
+    assert excerpt == ("[1,1,", ",1,1]", 1993, "ascii")
+
+    binary_file = tmp_path / "data.bin"
+    binary_file.write_bytes(b"\x00" * 1000)
+    assert utils.read_text_excerpt(binary_file, 100, 3) is None
+
+
+@pytest.mark.parametrize(
+    "codec, units",
+    [
+        ("utf-16", "utf-16-le"),
+        ("utf-16-be", "utf-16-be"),
+        ("utf-32", "utf-32-le"),
+    ],
+)
+def test_read_text_excerpt_wide_encodings(
+    tmp_path: Path, codec: str, units: str
+):
+    """Tests that UTF-16 and UTF-32 excerpts are cut at whole lines."""
+    text_file = tmp_path / "data.txt"
+    lines = [f"línea {i}\r\n" for i in range(1000)]
+    text_file.write_bytes("".join(lines).encode(codec))
+    head, tail, elided, detected = utils.read_text_excerpt(text_file, 400, 2)
+    assert detected == codec
+    assert head == "línea 0\nlínea 1\n"
+    assert tail == "línea 998\nlínea 999\n"
+    assert elided == len("".join(lines[2:998]).encode(units))
@@ -0,0 +1,163 @@
+"""Tests for the txt2llm.walker module."""
+
+import os
+from pathlib import Path
+
+from txt2llm import walker
+from txt2llm.ignore import IgnoreMatcher
+
+
+def test_scan_tree_prunes_ignored_dirs(tmp_path: Path, monkeypatch):
+    """Tests that ignored directories are never entered."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("x = 1")
+    (tmp_path / ".venv" / "lib").mkdir(parents=True)
+    (tmp_path / ".venv" / "lib" / "dep.py").write_text("y = 2")
+
+    scanned = []
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned.append(Path(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    root = walker.scan_tree(tmp_path, {".venv"})
+
+    assert sorted(scanned) == [tmp_path, tmp_path / "src"]
+    assert [child.name for child in root.children] == ["src"]
+
+
+def test_render_tree_and_collect_files(tmp_path: Path):
+    """Tests rendering the tree text and file list from one model."""
+    (tmp_path / "b").mkdir()
+    (tmp_path / "b" / "z.py").write_text("")
+    (tmp_path / "A.md").write_text("")
+    (tmp_path / "c.log").write_text("")
+
+    root = walker.scan_tree(tmp_path, set())
+
+    assert walker.render_tree(root) == (
+        f"{tmp_path.name}/\n├── b/\n│   └── z.py\n├── A.md\n└── c.log"
+    )
+    assert walker.collect_files(root, {".py", ".md"}) == [
+        Path("A.md"),
+        Path("b/z.py"),
+    ]
+
+
+def test_scan_tree_does_not_follow_dir_symlinks(tmp_path: Path):
+    """Tests that symlinked directories are listed but not descended."""
+    (tmp_path / "real").mkdir()
+    (tmp_path / "real" / "file.py").write_text("")
+    (tmp_path / "link").symlink_to(tmp_path / "real")
+
+    root = walker.scan_tree(tmp_path, set())
+
+    link = next(c for c in root.children if c.name == "link")
+    assert link.is_dir
+    assert link.children == []
+    assert walker.collect_files(root, {".py"}) == [Path("real/file.py")]
+
+
+def test_build_tree_from_paths():
+    """Tests building a tree model from a list of file paths."""
+    root = walker.build_tree(
+        "repo", ["b/z.py", "A.md", "b/c/d.py", ".venv/x.py"], {".venv"}
+    )
+
+    assert walker.render_tree(root) == (
+        "repo/\n├── b/\n│   ├── c/\n│   │   └── d.py\n│   └── z.py\n└── A.md"
+    )
+    assert walker.collect_files(root, {".py"}) == [
+        Path("b/c/d.py"),
+        Path("b/z.py"),
+    ]
+
+
+def test_scan_tree_applies_ignore_files(tmp_path: Path, monkeypatch):
+    """Tests that subtrees excluded by ignore files are never entered."""
+    (tmp_path / ".gitignore").write_text("build/\n*.min.js\n")
+    (tmp_path / "build" / "lib").mkdir(parents=True)
+    (tmp_path / "web").mkdir()
+    (tmp_path / "web" / "app.js").write_text("")
+    (tmp_path / "web" / "app.min.js").write_text("")
+    (tmp_path / "web" / ".txt2llmignore").write_text("!app.min.js\n")
+
+    scanned = []
+    real_scandir = os.scandir
+
+    def recording_scandir(path):
+        scanned.append(Path(path))
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", recording_scandir)
+    dir_mtimes: dict[str, int] = {}
+    root = walker.scan_tree(
+        tmp_path, set(), dir_mtimes, IgnoreMatcher(tmp_path)
+    )
+
+    assert sorted(scanned) == [tmp_path, tmp_path / "web"]
+    assert walker.collect_files(root, {".js"}) == [
+        Path("web/app.js"),
+        Path("web/app.min.js"),
+    ]
+    assert set(dir_mtimes) == {"", ".gitignore", "web", "web/.txt2llmignore"}
+
+
+def test_build_tree_applies_ignore_files(tmp_path: Path):
+    """Tests that ignore files drop paths and emptied directories."""
+    (tmp_path / ".txt2llmignore").write_text("docs/**/generated\n")
+
+    root = walker.build_tree(
+        "repo",
+        [".txt2llmignore", "docs/a/generated/x.md", "docs/b.md"],
+        set(),
+        IgnoreMatcher(tmp_path, [".txt2llmignore"]),
+    )
+
+    assert walker.render_tree(root) == (
+        "repo/\n├── docs/\n│   └── b.md\n└── .txt2llmignore"
+    )
+
+
+def test_render_tree_depth_and_collapse():
+    """Tests summarizing directories that are too deep or too crowded."""
+    paths = ["a/b/c.py", "a/b/d.json", "a/e.json", "x.md"]
+    paths += [f"data/{i}.json" for i in range(1200)] + ["data/r.txt"]
+    root = walker.build_tree("repo", paths, set())
+
+    assert walker.render_tree(root, max_depth=1) == (
+        "repo/\n"
+        "├── a/\n"
+        "│   └── … 3 files (2 .json)\n"
+        "├── data/\n"
+        "│   └── … 1,201 files (1,200 .json)\n"
+        "└── x.md"
+    )
+    assert walker.render_tree(root, collapse_threshold=3) == (
+        "repo/\n"
+        "├── a/\n"
+        "│   ├── b/\n"
+        "│   │   ├── c.py\n"
+        "│   │   └── d.json\n"
+        "│   └── e.json\n"
+        "├── data/\n"
+        "│   └── … 1,201 files (1,200 .json)\n"
+        "└── x.md"
+    )
+
+
+def test_prune_tree_and_deep_trees():
+    """Tests pruning to included files and rendering a very deep tree."""
+    root = walker.build_tree("repo", ["a/b.py", "a/c.log", "d/e.log"], set())
+    assert walker.render_tree(walker.prune_tree(root, {".py"})) == (
+        "repo/\n└── a/\n    └── b.py"
+    )
+    # The original tree is left unchanged.
+    assert [child.name for child in root.children] == ["a", "d"]
+
+    deep = walker.build_tree("repo", ["d/" * 5000 + "f.py"], set())
+    lines = walker.render_tree(deep).splitlines()
+    assert len(lines) == 5002
+    assert lines[-1] == " " * 4 * 5000 + "└── f.py"
@@ -0,0 +1,136 @@
+"""Tests for the txt2llm.watch module."""
+
+import dataclasses
+import os
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from txt2llm import index
+from txt2llm.config import ProjectConfig
+from txt2llm.core import TextProjectBuilder
+from txt2llm.watch import InotifyBackend, PollingBackend, ProjectWatcher
+
+
+@pytest.fixture
+def project_config(tmp_path: Path) -> ProjectConfig:
+    """Creates a small project whose report is written inside it."""
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('Hello')")
+    (root / "README.md").write_text("Project README")
+    return ProjectConfig(
+        project_root=root,
+        output_path=root / "overview.txt",
+        ignored_dirs={".git"},
+        include_exts={".py", ".md"},
+    )
+
+
+def test_rebuild_reads_only_changed_files(project_config: ProjectConfig):
+    """Tests that a rebuild after an edit only re-reads that file."""
+    watcher = ProjectWatcher(
+        project_config, backend=PollingBackend(project_config.project_root)
+    )
+    watcher.rebuild()
+    output = project_config.output_path
+    assert output.read_text() == TextProjectBuilder(
+        watcher.config
+    ).generate_report()
+    assert "── overview.txt" not in output.read_text()
+
+    main_py = project_config.project_root / "src" / "main.py"
+    main_py.write_text("print('Changed')")
+    os.utime(main_py, ns=(1, 1))
+    (project_config.project_root / "src" / "new.py").write_text("x = 1")
+
+    read = TextProjectBuilder._read_file_content
+    with patch.object(
+        TextProjectBuilder, "_read_file_content", autospec=True,
+        side_effect=read,
+    ) as mock_read:
+        watcher.rebuild()
+
+    assert sorted(c.args[1] for c in mock_read.call_args_list) == [
+        Path("src/main.py"),
+        Path("src/new.py"),
+    ]
+    assert output.read_text() == TextProjectBuilder(
+        watcher.config
+    ).generate_report()
+    assert watcher.rebuilds == 2
+
+
+def test_burst_is_debounced_and_own_output_ignored(
+    project_config: ProjectConfig,
+):
+    """Tests that a burst of changes ends in a single change set."""
+    backend = PollingBackend(project_config.project_root, interval=0.01)
+    watcher = ProjectWatcher(project_config, backend=backend, debounce=0.05)
+    watcher.rebuild()
+    assert watcher.wait_for_changes(timeout=0.05) == set()
+
+    main_py = project_config.project_root / "src" / "main.py"
+
+    def save_storm():
+        for i in range(5):
+            main_py.write_text(f"print({i})")
+            os.utime(main_py, ns=(i + 1, i + 1))
+            threading.Event().wait(0.02)
+
+    thread = threading.Thread(target=save_storm)
+    thread.start()
+    changed = watcher.wait_for_changes(timeout=1.0)
+    thread.join()
+
+    assert changed == {"src/main.py"}
+    assert watcher.wait_for_changes(timeout=0.05) == set()
+
+
+def test_rebuild_rewrites_index(project_config: ProjectConfig):
+    """Tests that each rebuild writes an index matching the report."""
+    watcher = ProjectWatcher(
+        project_config,
+        backend=PollingBackend(project_config.project_root),
+        write_index=True,
+    )
+    watcher.rebuild()
+    output = project_config.output_path
+    assert "── overview.txt.idx" not in output.read_text()
+
+    (project_config.project_root / "src" / "main.py").write_text("x = 2")
+    watcher.rebuild()
+    with index.ReportIndex(index.index_path(output)) as report_index:
+        section = index.extract(output, report_index, "src/main.py")
+    assert section.decode().endswith("x = 2\n```\n")
+
+
+def test_watcher_rejects_git_source(project_config: ProjectConfig):
+    """Tests that watch mode needs a filesystem walk."""
+    config = dataclasses.replace(project_config, source="git")
+    with pytest.raises(ValueError):
+        ProjectWatcher(config, backend=PollingBackend(config.project_root))
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux-only"
+)
+def test_inotify_backend_reports_changes(tmp_path: Path):
+    """Tests that inotify reports created and modified entries."""
+    (tmp_path / "sub").mkdir()
+    backend = InotifyBackend(tmp_path)
+    try:
+        backend.sync(["", "sub"], [])
+        assert backend.wait(0.01) == set()
+        (tmp_path / "sub" / "a.py").write_text("x = 1")
+        (tmp_path / "b.py").write_text("y = 2")
+        assert backend.wait(1.0) == {"sub/a.py", "b.py"}
+
+        backend.sync([""], [])
+        (tmp_path / "sub" / "c.py").write_text("z = 3")
+        assert backend.wait(0.05) == set()
+    finally:
+        backend.close()